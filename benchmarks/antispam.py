@@ -0,0 +1,123 @@
+"""Replays a synthetic message stream with planted spammers through the spam detector and
+reports the cost per message, how many spammers were caught, how many ordinary members were
+flagged by mistake, and the memory held after seeing every distinct user.
+
+  python benchmarks/antispam.py --messages 1000000 --users 1000000 --spammers 200
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from cogs import antispam as antispam_cog
+
+
+def build_stream(count, users, guilds, channels, rate, spammers, burst, seed):
+    """Return [(now, guild_id, channel_id, user_id, content, mentions)] and the spammer IDs.
+
+    Ordinary members post at random at `rate` messages per second overall; each spammer sends
+    `burst` copies of one message two to the second at a random point in the stream.
+    """
+    rng = random.Random(seed)
+    stream = []
+    for i in range(count):
+        guild_id = rng.randrange(guilds)
+        stream.append((i / rate, guild_id, guild_id * channels + rng.randrange(channels),
+                       rng.randrange(users), f"message {rng.randrange(1000)}", 0))
+    spammer_ids = set()
+    duration = count / rate
+    for spammer in range(spammers):
+        user_id = users + spammer  # never collides with an ordinary member
+        spammer_ids.add(user_id)
+        guild_id = rng.randrange(guilds)
+        start = rng.uniform(0, max(0.0, duration - burst / 2))
+        for n in range(burst):
+            stream.append((start + n / 2, guild_id, guild_id * channels, user_id, "free nitro", 0))
+    stream.sort(key=lambda message: message[0])
+    return stream, spammer_ids
+
+
+def replay(detector, stream):
+    flagged = set()
+    check = detector.check_message
+    start = time.perf_counter()
+    for now, guild_id, channel_id, user_id, content, mentions in stream:
+        checks = check(guild_id, channel_id, user_id, content, mentions, now)
+        if checks and checks != ["channel_messages"]:
+            flagged.add(user_id)
+    return (time.perf_counter() - start) / len(stream), flagged
+
+
+async def replay_listener(messages):
+    # The whole listener as the AntiSpam cog runs it, including instrument_event's timing
+    listener = antispam_cog.AntiSpam(None).detect_spam
+    start = time.perf_counter()
+    for message in messages:
+        await listener(message)
+    return (time.perf_counter() - start) / len(messages)
+
+
+async def run(args):
+    stream, spammer_ids = build_stream(
+        args.messages, args.users, args.guilds, args.channels, args.rate, args.spammers, args.burst, args.seed
+    )
+
+    detector = main.SpamDetector(main.DEFAULT_SPAM_LIMITS, width=args.width)
+    per_message, flagged = replay(detector, stream)
+
+    # Memory is measured on a second pass, since tracing allocations slows everything down
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    traced = main.SpamDetector(main.DEFAULT_SPAM_LIMITS, width=args.width)
+    built = tracemalloc.get_traced_memory()[0]
+    replay(traced, stream)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    caught = len(flagged & spammer_ids)
+    false_positives = len(flagged - spammer_ids)
+
+    # Listener overhead on the common path, where nothing is over a limit
+    quiet = {check: [10 ** 9, per] for check, (_, per) in main.DEFAULT_SPAM_LIMITS.items()}
+    antispam_cog.spam_detector = main.SpamDetector(quiet, width=args.width)
+    antispam_cog.ANTISPAM_MODE = "detect"
+    messages = [
+        SimpleNamespace(
+            guild=SimpleNamespace(id=guild_id), channel=SimpleNamespace(id=channel_id),
+            author=SimpleNamespace(id=user_id, bot=False), content=content, mentions=()
+        )
+        for _, guild_id, channel_id, user_id, content, _ in stream[:args.listener_messages]
+    ]
+    with contextlib.redirect_stdout(io.StringIO()):
+        listener = await replay_listener(messages)
+
+    distinct_users = len({message[3] for message in stream})
+    print(f"messages:          {len(stream)} from {distinct_users} users over {stream[-1][0]:.0f}s simulated")
+    print(f"check per msg:     {per_message * 1e9:8.0f} ns")
+    print(f"listener per msg:  {listener * 1e9:8.0f} ns")
+    print(f"spammers caught:   {caught}/{len(spammer_ids)}")
+    print(f"false positives:   {false_positives}")
+    print(f"detector memory:   {(built - before) / 1024 / 1024:.1f} MiB at start, {(after - before) / 1024 / 1024:.1f} MiB after the stream")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--guilds", type=int, default=500)
+    parser.add_argument("--channels", type=int, default=5, help="channels per guild")
+    parser.add_argument("--rate", type=float, default=500, help="messages per simulated second")
+    parser.add_argument("--spammers", type=int, default=200)
+    parser.add_argument("--burst", type=int, default=20, help="messages per spammer, two a second")
+    parser.add_argument("--width", type=int, default=32768)
+    parser.add_argument("--listener-messages", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
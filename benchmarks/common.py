@@ -0,0 +1,52 @@
+# Helpers shared by the benchmarks: latency summaries, peak RSS, and pointing a bot from
+# main.py at benchmarks/fake_discord.py. Only the standard library is imported here, so a
+# benchmark can set up its environment before aiohttp or main are loaded.
+import importlib
+import os
+import resource
+import sys
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(count, seconds, latencies):
+    return {
+        "count": count,
+        "seconds": round(seconds, 4),
+        "throughput_per_s": round(count / seconds, 1) if seconds else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+    }
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1)
+
+
+def bot_environment(fake, workdir):
+    """Settings that point main.py at `fake` and keep its database and sync state in `workdir`."""
+    return {
+        "DISCORD_API_BASE": fake.api_base,
+        "DISCORD_GATEWAY_URL": fake.gateway_url,
+        "BOT_DATABASE": os.path.join(workdir, "bot.db"),
+        "COMMAND_SYNC_STATE": os.path.join(workdir, "sync.json"),
+        "METRICS_PORT": "0",
+        "SCRIPTBLOX_SEARCH_URL": fake.scriptblox_url,
+    }
+
+
+def import_bot(fake, workdir):
+    """Import main.py in this process, configured by bot_environment(), for in-process runs."""
+    os.environ.update(bot_environment(fake, workdir))
+    main = importlib.import_module("main")
+    main.discord.utils.setup_logging(level=30)
+    main.rate_limiter.limits = {}  # a handful of synthetic users would otherwise be throttled
+    return main
@@ -0,0 +1,464 @@
+# A local stand-in for Discord's REST API and gateway, good enough to boot main.py (single
+# process, cluster or HTTP interactions mode) and push events and interactions at it without a
+# network. Interactions for the HTTP endpoint are signed with a key generated per instance,
+# whose public half is reported as the application's verify_key (needs PyNaCl).
+#
+#   python benchmarks/fake_discord.py --port 8800 --guilds 50 --shards 4
+#   DISCORD_API_BASE=http://127.0.0.1:8800/api/v10 DISCORD_GATEWAY_URL=ws://127.0.0.1:8800/gateway \
+#       python main.py --cluster --workers 2 --shards 4
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import time
+
+from aiohttp import web, WSMsgType
+
+try:
+    import nacl.signing
+except ImportError:
+    nacl = None
+
+DISCORD_EPOCH = 1420070400000
+BOT_ID = 100000000000000001
+APPLICATION_ID = BOT_ID
+OWNER_ID = 100000000000000002
+LARGE_THRESHOLD = 250  # discord.py's default; larger guilds only send members when chunked
+CHUNK_SIZE = 1000
+
+
+def json_response(data, status=200):
+    # discord.py only decodes bodies whose content type is exactly application/json (no charset)
+    return web.Response(body=json.dumps(data).encode(), status=status, content_type="application/json")
+
+
+def make_snowflake(counter=itertools.count(1)):
+    return ((int(time.time() * 1000) - DISCORD_EPOCH) << 22) | (next(counter) & 0x3FFFFF)
+
+
+def user_payload(user_id, name=None, bot=False):
+    return {
+        "id": str(user_id),
+        "username": name or f"user{user_id % 100000}",
+        "discriminator": "0",
+        "global_name": None,
+        "avatar": None,
+        "bot": bot,
+    }
+
+
+def member_payload(user_id, name=None, bot=False, roles=()):
+    return {
+        "user": user_payload(user_id, name, bot),
+        "roles": [str(role) for role in roles],
+        "joined_at": "2024-01-01T00:00:00+00:00",
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+    }
+
+
+class FakeGuild:
+    def __init__(self, guild_id, members=10):
+        self.id = guild_id
+        self.channel_id = guild_id + 1
+        self.bot_role_id = guild_id + 2
+        self.member_ids = [OWNER_ID] + [guild_id + 10 + i for i in range(members - 1)]
+
+    def payload(self):
+        everyone = {
+            "id": str(self.id), "name": "@everyone", "permissions": "1071698660929", "position": 0,
+            "color": 0, "hoist": False, "managed": False, "mentionable": False, "flags": 0,
+        }
+        bot_role = dict(everyone, id=str(self.bot_role_id), name="Bot", permissions="8", position=1)
+        members = [member_payload(BOT_ID, "fake-bot", bot=True, roles=[self.bot_role_id])]
+        large = len(self.member_ids) + 1 > LARGE_THRESHOLD
+        if not large:
+            members += [member_payload(user_id) for user_id in self.member_ids]
+        return {
+            "id": str(self.id),
+            "name": f"Guild {self.id}",
+            "icon": None,
+            "owner_id": str(OWNER_ID),
+            "roles": [everyone, bot_role],
+            "channels": [{
+                "id": str(self.channel_id), "type": 0, "name": "general", "position": 0,
+                "permission_overwrites": [], "guild_id": str(self.id), "nsfw": False,
+                "parent_id": None, "topic": None, "rate_limit_per_user": 0, "last_message_id": None,
+            }],
+            "members": members,
+            "member_count": len(self.member_ids) + 1,
+            "emojis": [], "stickers": [], "features": [], "presences": [], "voice_states": [],
+            "threads": [], "stage_instances": [], "guild_scheduled_events": [],
+            "verification_level": 0, "default_message_notifications": 0, "explicit_content_filter": 0,
+            "mfa_level": 0, "premium_tier": 0, "nsfw_level": 0, "system_channel_flags": 0,
+            "preferred_locale": "en-US", "afk_timeout": 300, "large": large, "unavailable": False,
+            "joined_at": "2024-01-01T00:00:00+00:00",
+        }
+
+
+class FakeDiscord:
+    def __init__(self, guilds=10, members=10, shards=1, latency=0.0):
+        self.guilds = {}
+        for _ in range(guilds):
+            guild_id = make_snowflake()
+            self.guilds[guild_id] = FakeGuild(guild_id, members)
+        self.shard_count = shards
+        self.latency = latency
+        self.sessions = {}  # shard_id -> websocket
+        self.ready = collections.Counter()
+        self.requests = collections.Counter()  # "METHOD route" -> count
+        self.interaction_responses = {}  # interaction token -> Future resolved by the first non-deferred reply
+        self.base_url = None
+        self._sequence = itertools.count(1)
+        self.signing_key = nacl.signing.SigningKey.generate() if nacl is not None else None
+
+    # Sharding
+
+    def shard_for(self, guild_id):
+        return (guild_id >> 22) % self.shard_count
+
+    def guilds_for_shard(self, shard_id, shard_count):
+        return [guild for guild in self.guilds.values() if (guild.id >> 22) % shard_count == shard_id]
+
+    async def dispatch(self, event, data, guild_id=None):
+        """Send a gateway DISPATCH to the shard owning `guild_id` (or shard 0)."""
+        shard_id = self.shard_for(guild_id) if guild_id is not None else 0
+        ws = self.sessions.get(shard_id)
+        if ws is None:
+            raise RuntimeError(f"shard {shard_id} is not connected")
+        await ws.send_str(json.dumps({"op": 0, "t": event, "s": next(self._sequence), "d": data}))
+
+    # Event builders
+
+    def message(self, guild, author_id, content="hello", mentions=()):
+        return {
+            "id": str(make_snowflake()),
+            "channel_id": str(guild.channel_id),
+            "guild_id": str(guild.id),
+            "author": user_payload(author_id),
+            "member": {"roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0},
+            "content": content,
+            "timestamp": "2024-01-01T00:00:00+00:00",
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [dict(user_payload(user_id), member=member_payload(user_id)) for user_id in mentions],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": [],
+            "pinned": False,
+            "type": 0,
+        }
+
+    def interaction(self, guild, user_id, name, options=(), resolved=None):
+        interaction_id = make_snowflake()
+        data = {"id": str(make_snowflake()), "name": name, "type": 1, "options": list(options)}
+        if resolved:
+            data["resolved"] = resolved
+        return {
+            "id": str(interaction_id),
+            "application_id": str(APPLICATION_ID),
+            "type": 2,
+            "data": data,
+            "guild_id": str(guild.id),
+            "channel_id": str(guild.channel_id),
+            "channel": {"id": str(guild.channel_id), "type": 0, "guild_id": str(guild.id), "name": "general", "position": 0, "permission_overwrites": []},
+            "member": dict(member_payload(user_id), permissions="1099511627775"),
+            "token": f"token-{interaction_id}",
+            "version": 1,
+            "locale": "en-US",
+            "guild_locale": "en-US",
+            "app_permissions": "1099511627775",
+            "attachment_size_limit": 10 * 1024 * 1024,
+            "entitlements": [],
+            "authorizing_integration_owners": {},
+            "context": 0,
+        }
+
+    def sign(self, body, timestamp=None):
+        """Return the headers Discord sends with an interaction POST carrying `body` (bytes)."""
+        timestamp = str(int(time.time()) if timestamp is None else timestamp)
+        signature = self.signing_key.sign(timestamp.encode() + body).signature
+        return {"X-Signature-Ed25519": signature.hex(), "X-Signature-Timestamp": timestamp, "Content-Type": "application/json"}
+
+    def expect_response(self, interaction):
+        """Return a future resolved with the first visible reply to `interaction`.
+
+        A deferral is not a reply: for deferred interactions the future resolves on the followup.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.interaction_responses[interaction["token"]] = future
+        return future
+
+    def _resolve_interaction(self, token, body):
+        future = self.interaction_responses.pop(token, None)
+        if future is not None and not future.done():
+            future.set_result(body)
+
+    # Gateway
+
+    async def gateway(self, request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        await ws.send_str(json.dumps({"op": 10, "d": {"heartbeat_interval": 41250}}))
+        shard_id = None
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                continue
+            payload = json.loads(message.data)
+            op = payload.get("op")
+            if op == 1:
+                await ws.send_str(json.dumps({"op": 11}))
+            elif op == 2:
+                shard_id, shard_count = payload["d"].get("shard", [0, 1])
+                self.sessions[shard_id] = ws
+                guilds = self.guilds_for_shard(shard_id, shard_count)
+                await ws.send_str(json.dumps({"op": 0, "t": "READY", "s": next(self._sequence), "d": {
+                    "v": 10,
+                    "user": user_payload(BOT_ID, "fake-bot", bot=True),
+                    "guilds": [{"id": str(guild.id), "unavailable": True} for guild in guilds],
+                    "session_id": f"session-{shard_id}",
+                    "resume_gateway_url": str(request.url.with_query(None)),
+                    "shard": [shard_id, shard_count],
+                    "application": {"id": str(APPLICATION_ID), "flags": 0},
+                }}))
+                for guild in guilds:
+                    await ws.send_str(json.dumps({"op": 0, "t": "GUILD_CREATE", "s": next(self._sequence), "d": guild.payload()}))
+                self.ready[shard_id] += 1
+            elif op == 8:
+                await self.send_member_chunks(ws, payload["d"])
+        if shard_id is not None and self.sessions.get(shard_id) is ws:
+            del self.sessions[shard_id]
+        return ws
+
+    async def send_member_chunks(self, ws, request):
+        guild = self.guilds.get(int(request["guild_id"]))
+        member_ids = [BOT_ID] + guild.member_ids if guild is not None else []
+        if request.get("user_ids"):
+            wanted = {int(user_id) for user_id in request["user_ids"]}
+            member_ids = [user_id for user_id in member_ids if user_id in wanted]
+        chunks = [member_ids[i:i + CHUNK_SIZE] for i in range(0, len(member_ids), CHUNK_SIZE)] or [[]]
+        for index, chunk in enumerate(chunks):
+            await ws.send_str(json.dumps({"op": 0, "t": "GUILD_MEMBERS_CHUNK", "s": next(self._sequence), "d": {
+                "guild_id": request["guild_id"],
+                "members": [
+                    member_payload(BOT_ID, "fake-bot", bot=True, roles=[guild.bot_role_id]) if user_id == BOT_ID
+                    else member_payload(user_id)
+                    for user_id in chunk
+                ],
+                "chunk_index": index, "chunk_count": len(chunks), "nonce": request.get("nonce"),
+            }}))
+
+    # REST
+
+    @web.middleware
+    async def count_requests(self, request, handler):
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        self.requests[f"{request.method} {route}"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await handler(request)
+
+    async def me(self, request):
+        return json_response(user_payload(BOT_ID, "fake-bot", bot=True))
+
+    async def application(self, request):
+        return json_response({
+            "id": str(APPLICATION_ID), "name": "fake-bot", "icon": None, "description": "",
+            "bot_public": True, "bot_require_code_grant": False, "verify_key": self.verify_key,
+            "owner": user_payload(OWNER_ID, "owner"), "flags": 0, "summary": "",
+        })
+
+    async def gateway_bot(self, request):
+        return json_response({
+            "url": str(request.url.with_path("/gateway").with_query(None)),
+            "shards": self.shard_count,
+            "session_start_limit": {"total": 1000, "remaining": 1000, "reset_after": 0, "max_concurrency": 16},
+        })
+
+    async def sync_commands(self, request):
+        commands = await request.json()
+        return json_response([
+            dict(command, id=str(make_snowflake()), application_id=str(APPLICATION_ID), version="1")
+            for command in commands
+        ])
+
+    def message_response(self, channel_id, body):
+        return {
+            "id": str(make_snowflake()), "channel_id": str(channel_id), "author": user_payload(BOT_ID, "fake-bot", bot=True),
+            "content": body.get("content") or "", "timestamp": "2024-01-01T00:00:00+00:00", "edited_timestamp": None,
+            "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [],
+            "embeds": body.get("embeds") or [], "components": body.get("components") or [], "pinned": False,
+            "type": 0, "flags": body.get("flags", 0), "webhook_id": None,
+        }
+
+    async def _body(self, request):
+        if request.content_type == "multipart/form-data":
+            form = await request.post()
+            return json.loads(form.get("payload_json", "{}"))
+        if request.can_read_body:
+            return await request.json()
+        return {}
+
+    async def interaction_callback(self, request):
+        body = await self._body(request)
+        if body.get("type") not in (5, 6):  # deferred channel message / deferred update
+            self._resolve_interaction(request.match_info["token"], body)
+        return json_response({"interaction": {"id": request.match_info["interaction_id"], "type": 2}})
+
+    async def channel_message(self, request):
+        body = await self._body(request)
+        return json_response(self.message_response(request.match_info["channel_id"], body))
+
+    async def webhook_message(self, request):
+        if request.method == "DELETE":
+            return web.Response(status=204)
+        body = await self._body(request)
+        self._resolve_interaction(request.match_info["token"], body)
+        return json_response(self.message_response(0, body))
+
+    async def guild(self, request):
+        guild = self.guilds.get(int(request.match_info["guild_id"]))
+        if guild is None:
+            return json_response({"message": "Unknown Guild", "code": 10004}, status=404)
+        # The REST guild object has no channels, members or other gateway-only state
+        data = {key: value for key, value in guild.payload().items()
+                if key not in ("channels", "members", "presences", "voice_states", "threads")}
+        return json_response(dict(data, approximate_member_count=data.pop("member_count")))
+
+    async def guild_channels(self, request):
+        guild = self.guilds.get(int(request.match_info["guild_id"]))
+        if guild is None:
+            return json_response({"message": "Unknown Guild", "code": 10004}, status=404)
+        return json_response(guild.payload()["channels"])
+
+    async def guild_member(self, request):
+        guild = self.guilds.get(int(request.match_info["guild_id"]))
+        user_id = int(request.match_info["user_id"])
+        if guild is not None and user_id == BOT_ID:
+            return json_response(member_payload(BOT_ID, "fake-bot", bot=True, roles=[guild.bot_role_id]))
+        if guild is None or user_id not in guild.member_ids:
+            return json_response({"message": "Unknown Member", "code": 10007}, status=404)
+        return json_response(member_payload(user_id))
+
+    async def guild_members(self, request):
+        # Paged by user ID like the real endpoint: up to `limit` members with IDs above `after`
+        guild = self.guilds.get(int(request.match_info["guild_id"]))
+        if guild is None:
+            return json_response({"message": "Unknown Guild", "code": 10004}, status=404)
+        after = int(request.query.get("after", 0))
+        limit = int(request.query.get("limit", 1))
+        page = sorted(user_id for user_id in guild.member_ids + [BOT_ID] if user_id > after)[:limit]
+        return json_response([
+            member_payload(BOT_ID, "fake-bot", bot=True, roles=[guild.bot_role_id]) if user_id == BOT_ID else member_payload(user_id)
+            for user_id in page
+        ])
+
+    async def edit_member(self, request):
+        # Timeouts and other member edits answer with the updated member; members who joined
+        # through a dispatched GUILD_MEMBER_ADD aren't in member_ids, so any ID is accepted
+        body = await self._body(request)
+        member = member_payload(int(request.match_info["user_id"]))
+        if body.get("communication_disabled_until"):
+            member["communication_disabled_until"] = body["communication_disabled_until"]
+        return json_response(member)
+
+    async def dm_channel(self, request):
+        body = await self._body(request)
+        recipient = int(body["recipient_id"])
+        return json_response({"id": str(recipient + 1), "type": 1, "recipients": [user_payload(recipient)]})
+
+    async def scriptblox_search(self, request):
+        # Mimics https://scriptblox.com/api/script/search with deterministic results
+        query = request.query.get("q", "")
+        page = int(request.query.get("page", 1))
+        per_page = int(request.query.get("max", 20))
+        total = 3 * per_page
+        start = (page - 1) * per_page
+        scripts = [
+            {"title": f"{query} script {i}", "game": {"name": f"{query} game"}, "views": 1000 - i, "isVerified": i % 2 == 0}
+            for i in range(start, min(start + per_page, total))
+        ]
+        return json_response({"result": {"totalPages": 3, "scripts": scripts}})
+
+    async def no_content(self, request):
+        return web.Response(status=204)
+
+    def app(self):
+        app = web.Application(middlewares=[self.count_requests])
+        api = "/api/v10"
+        app.router.add_get("/gateway", self.gateway)
+        app.router.add_get(f"{api}/users/@me", self.me)
+        app.router.add_get(f"{api}/oauth2/applications/@me", self.application)
+        app.router.add_get(f"{api}/gateway/bot", self.gateway_bot)
+        app.router.add_put(f"{api}/applications/{{app_id}}/commands", self.sync_commands)
+        app.router.add_put(f"{api}/applications/{{app_id}}/guilds/{{guild_id}}/commands", self.sync_commands)
+        app.router.add_post(f"{api}/interactions/{{interaction_id}}/{{token}}/callback", self.interaction_callback)
+        app.router.add_post(f"{api}/channels/{{channel_id}}/messages", self.channel_message)
+        app.router.add_post(f"{api}/users/@me/channels", self.dm_channel)
+        app.router.add_get(f"{api}/guilds/{{guild_id}}", self.guild)
+        app.router.add_get(f"{api}/guilds/{{guild_id}}/channels", self.guild_channels)
+        app.router.add_get(f"{api}/guilds/{{guild_id}}/members", self.guild_members)
+        app.router.add_get(f"{api}/guilds/{{guild_id}}/members/{{user_id}}", self.guild_member)
+        app.router.add_patch(f"{api}/guilds/{{guild_id}}/members/{{user_id}}", self.edit_member)
+        app.router.add_get("/scriptblox/api/script/search", self.scriptblox_search)
+        app.router.add_route("*", f"{api}/webhooks/{{app_id}}/{{token}}", self.webhook_message)
+        app.router.add_route("*", f"{api}/webhooks/{{app_id}}/{{token}}/messages/{{message_id}}", self.webhook_message)
+        app.router.add_route("*", f"{api}/{{tail:.*}}", self.no_content)
+        return app
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+        return self.base_url
+
+    async def close(self):
+        for ws in list(self.sessions.values()):
+            await ws.close()
+        await self._runner.cleanup()
+
+    @property
+    def api_base(self):
+        return f"{self.base_url}/api/v10"
+
+    @property
+    def verify_key(self):
+        return self.signing_key.verify_key.encode().hex() if self.signing_key is not None else "00" * 32
+
+    @property
+    def scriptblox_url(self):
+        return f"{self.base_url}/scriptblox/api/script/search"
+
+    @property
+    def gateway_url(self):
+        return f"{self.base_url.replace('http', 'ws', 1)}/gateway"
+
+
+async def serve(args):
+    fake = FakeDiscord(guilds=args.guilds, members=args.members, shards=args.shards, latency=args.latency)
+    await fake.start(args.host, args.port)
+    print(f"DISCORD_API_BASE={fake.api_base}")
+    print(f"DISCORD_GATEWAY_URL={fake.gateway_url}")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(f"connected shards: {sorted(fake.sessions)}  identifies: {dict(fake.ready)}")
+    finally:
+        await fake.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for Discord's REST API and gateway")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--guilds", type=int, default=10)
+    parser.add_argument("--members", type=int, default=10)
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated REST latency in seconds")
+    asyncio.run(serve(parser.parse_args()))
@@ -0,0 +1,106 @@
+# Boots main.py in HTTP interactions mode against benchmarks/fake_discord.py and measures how
+# many signed interaction POSTs per second the endpoint accepts: PINGs (signature check and
+# routing only), requests with bad signatures, and slash commands, for which the time until
+# the command's reply reaches the fake is reported as well.
+#
+#   python benchmarks/http_interactions.py --requests 2000 --concurrency 50 --output http.json
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import import_bot, peak_rss_mb, summarize
+from fake_discord import FakeDiscord
+from loadtest import command_interaction
+
+
+async def post_burst(session, url, fake, payloads, concurrency, sign=True, wait_for_reply=False):
+    semaphore = asyncio.Semaphore(concurrency)
+    ack_latencies = []
+    reply_latencies = []
+    statuses = {}
+
+    async def one(payload):
+        body = json.dumps(payload).encode()
+        headers = fake.sign(body)
+        if not sign:
+            headers["X-Signature-Ed25519"] = "00" * 64
+        async with semaphore:
+            reply = fake.expect_response(payload) if wait_for_reply else None
+            started = time.perf_counter()
+            async with session.post(url, data=body, headers=headers) as response:
+                await response.read()
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+            ack_latencies.append(time.perf_counter() - started)
+            if reply is not None:
+                try:
+                    await asyncio.wait_for(reply, timeout=30)
+                    reply_latencies.append(time.perf_counter() - started)
+                except asyncio.TimeoutError:
+                    pass
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(payload) for payload in payloads))
+    result = summarize(len(payloads), time.perf_counter() - start, ack_latencies)
+    result["statuses"] = statuses
+    if wait_for_reply:
+        result["replies"] = summarize(len(reply_latencies), time.perf_counter() - start, reply_latencies)
+        result["replies"]["missing"] = len(payloads) - len(reply_latencies)
+    return result
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    fake = FakeDiscord(guilds=args.guilds, members=args.members)
+    await fake.start()
+
+    main = import_bot(fake, tempfile.mkdtemp(prefix="bot-http-"))
+    await main.bot.login(main.TOKEN)
+    runner = await main.start_interactions_server(main.bot, "127.0.0.1", 0)
+    url = f"http://127.0.0.1:{runner.addresses[0][1]}/interactions"
+
+    guilds = list(fake.guilds.values())
+    ping = {"id": "1", "application_id": "1", "type": 1, "token": "ping", "version": 1}
+    results = {}
+    try:
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=args.concurrency)) as session:
+            results["ping"] = await post_burst(session, url, fake, [ping] * args.requests, args.concurrency)
+            results["bad_signature"] = await post_burst(session, url, fake, [ping] * args.requests, args.concurrency, sign=False)
+            names = ["warn", "warnings", "ping", "search-scripts"]
+            payloads = [command_interaction(fake, rng.choice(guilds), rng.choice(names), rng) for _ in range(args.requests)]
+            results["commands"] = await post_burst(session, url, fake, payloads, args.concurrency, wait_for_reply=True)
+    finally:
+        await runner.cleanup()
+        await main.bot.close()
+        await fake.close()
+
+    results["guild_fetches"] = fake.requests["GET /api/v10/guilds/{guild_id}"]
+    results["peak_rss_mb"] = peak_rss_mb()
+    results["config"] = vars(args)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP interactions endpoint throughput against a fake Discord")
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--members", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
@@ -0,0 +1,128 @@
+"""Offline comparison of main.HTTPClient's pooled session against a new aiohttp session per call.
+
+Runs a local stub server (HTTPS with a throwaway self-signed certificate unless --plain is
+given) and fires the same JSON GETs through both clients, reporting throughput, latency and
+how many new connections, i.e. TCP + TLS handshakes, each one opened.
+
+  python benchmarks/http_pool.py --requests 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from common import summarize
+
+
+def make_certificate(workdir):
+    cert = os.path.join(workdir, "cert.pem")
+    key = os.path.join(workdir, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=localhost",
+         "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1", "-keyout", key, "-out", cert],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return cert, key
+
+
+async def start_stub(web, ssl_context):
+    connections = set()
+
+    async def search(request):
+        connections.add(request.transport.get_extra_info("peername"))
+        return web.json_response({"result": {"scripts": [], "totalPages": 1}})
+
+    app = web.Application()
+    app.router.add_get("/search", search)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0, ssl_context=ssl_context).start()
+    return runner, connections
+
+
+async def burst(call, count, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            status = await call()
+            assert status == 200, status
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(count)))
+    return summarize(count, time.perf_counter() - started, latencies)
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="bot-http-pool-")
+    ssl_context = None
+    scheme = "http"
+    if not args.plain:
+        cert, key = make_certificate(workdir)
+        ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        ssl_context.load_cert_chain(cert, key)
+        scheme = "https"
+        # aiohttp builds its verifying context on import, so aiohttp and main are only imported
+        # once the stub's certificate is trusted
+        os.environ["SSL_CERT_FILE"] = cert
+
+    import aiohttp
+    from aiohttp import web
+    import main
+
+    runner, connections = await start_stub(web, ssl_context)
+    url = f"{scheme}://127.0.0.1:{runner.addresses[0][1]}/search"
+    params = {"q": "bench", "page": 1, "max": 20}
+    results = {}
+
+    client = main.HTTPClient(limit_per_host=args.concurrency)
+    await client.start()
+
+    async def pooled():
+        status, _ = await client.get_json(url, params=params, max_retries=0)
+        return status
+
+    async def per_call():
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, params=params) as response:
+                await response.json(content_type=None)
+                return response.status
+
+    for name, call in (("pooled", pooled), ("per_call", per_call)):
+        await burst(call, min(args.requests, 50), args.concurrency)  # warm up imports and the pool
+        seen = len(connections)
+        results[name] = await burst(call, args.requests, args.concurrency)
+        results[name]["new_connections"] = len(connections) - seen
+
+    await client.close()
+    await runner.cleanup()
+
+    pooled_ms, per_call_ms = results["pooled"]["p50_ms"], results["per_call"]["p50_ms"]
+    results["p50_speedup"] = round(per_call_ms / pooled_ms, 2) if pooled_ms else None
+    results["config"] = dict(vars(args), scheme=scheme)
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--plain", action="store_true", help="plain HTTP instead of HTTPS, to isolate TCP setup")
+    parser.add_argument("--output", default=None)
+    asyncio.run(run(parser.parse_args()))
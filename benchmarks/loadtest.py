@@ -0,0 +1,161 @@
+"""Offline load test: boots main.py against benchmarks/fake_discord.py and replays scripted workloads.
+
+The workloads are a message flood through on_message, concurrent slash commands (warn,
+warnings, stats, search-scripts) and mass mentions of AFK users. Results are printed as JSON
+so runs can be diffed against each other.
+
+  python benchmarks/loadtest.py --messages 5000 --interactions 400 --concurrency 50 --output run.json
+
+The fake runs in the same process and event loop as the bot, so absolute numbers include its
+cost too; compare runs made with the same arguments.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import import_bot, peak_rss_mb, summarize
+from fake_discord import FakeDiscord, member_payload, user_payload
+
+
+async def wait_for_events(main, name, target, timeout=120):
+    deadline = time.monotonic() + timeout
+    while main.metrics.event_latency[name].count < target:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"only {main.metrics.event_latency[name].count}/{target} {name} events handled")
+        await asyncio.sleep(0.01)
+
+
+async def message_flood(main, fake, count, rng, mentions=0, afk_members=()):
+    # Handler latency comes from the metrics histogram, widened so it keeps every sample
+    main.metrics.event_latency["on_message"] = main.Histogram(window=count)
+    guilds = list(fake.guilds.values())
+    start = time.perf_counter()
+    for _ in range(count):
+        guild = rng.choice(guilds)
+        author = rng.choice(guild.member_ids[len(afk_members):] or guild.member_ids)
+        mentioned = rng.sample(afk_members, min(mentions, len(afk_members))) if mentions else ()
+        data = fake.message(guild, author, "load test message", [guild.member_ids[i] for i in mentioned])
+        await fake.dispatch("MESSAGE_CREATE", data, guild.id)
+    await wait_for_events(main, "on_message", count)
+    elapsed = time.perf_counter() - start
+    return summarize(count, elapsed, list(main.metrics.event_latency["on_message"].recent))
+
+
+def command_interaction(fake, guild, name, rng):
+    moderator = guild.member_ids[0]  # the guild owner
+    if name in ("warn", "warnings"):
+        target = rng.choice(guild.member_ids[1:])
+        options = [{"name": "member", "type": 6, "value": str(target)}]
+        if name == "warn":
+            options.append({"name": "reason", "type": 3, "value": "load test"})
+        member = member_payload(target)
+        resolved = {"users": {str(target): user_payload(target)}, "members": {str(target): dict(member, permissions="0")}}
+        del resolved["members"][str(target)]["user"]
+        return fake.interaction(guild, moderator, name, options, resolved)
+    if name == "search-scripts":
+        query = rng.choice(["arsenal", "blox fruits", "doors", "pet sim", "bedwars"])
+        return fake.interaction(guild, moderator, name, [{"name": "query", "type": 3, "value": query}])
+    return fake.interaction(guild, moderator, name)
+
+
+async def interaction_burst(fake, names, count, concurrency, rng):
+    guilds = list(fake.guilds.values())
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            guild = rng.choice(guilds)
+            payload = command_interaction(fake, guild, rng.choice(names), rng)
+            response = fake.expect_response(payload)
+            started = time.perf_counter()
+            await fake.dispatch("INTERACTION_CREATE", payload, guild.id)
+            try:
+                await asyncio.wait_for(response, timeout=30)
+                latencies.append(time.perf_counter() - started)
+            except asyncio.TimeoutError:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(count)))
+    result = summarize(count, time.perf_counter() - start, latencies)
+    result["failures"] = failures
+    return result
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    fake = FakeDiscord(guilds=args.guilds, members=args.members, shards=args.shards)
+    await fake.start()
+
+    boot_started = time.perf_counter()
+    main = import_bot(fake, tempfile.mkdtemp(prefix="bot-loadtest-"))
+    bot_task = asyncio.create_task(main.bot.start(main.TOKEN))
+    await asyncio.wait_for(main.bot.wait_until_ready(), timeout=60)
+    results = {"boot_seconds": round(time.perf_counter() - boot_started, 3)}
+    results["startup"] = {phase: round(seconds, 3) for phase, seconds in main.startup_timings.items()}
+    results["extensions"] = {name: round(seconds, 4) for name, seconds in main.extension_load_times.items()}
+
+    try:
+        results["message_flood"] = await message_flood(main, fake, args.messages, rng)
+        results["interactions"] = await interaction_burst(
+            fake, ["warn", "warnings", "stats", "search-scripts"], args.interactions, args.concurrency, rng
+        )
+        for name in ("warn", "warnings", "stats", "search-scripts"):
+            results[f"interactions_{name}"] = await interaction_burst(
+                fake, [name], max(1, args.interactions // 4), args.concurrency, rng
+            )
+
+        afk_members = list(range(1, min(args.members, args.afk_per_guild + 1)))
+        for guild in fake.guilds.values():
+            for index in afk_members:
+                main.afk_registry.set(guild.id, guild.member_ids[index], "load test")
+        sends_before = fake.requests["POST /api/v10/channels/{channel_id}/messages"]
+        results["afk_mentions"] = await message_flood(
+            main, fake, args.afk_messages, rng, mentions=args.mentions_per_message, afk_members=afk_members
+        )
+        await asyncio.sleep(0.5)  # let the background sender drain
+        results["afk_mentions"]["notices_sent"] = fake.requests["POST /api/v10/channels/{channel_id}/messages"] - sends_before
+    finally:
+        await main.bot.close()
+        bot_task.cancel()
+        await asyncio.gather(bot_task, return_exceptions=True)
+        await fake.close()
+
+    results["moderation_dms"] = main.dm_dispatcher.stats()
+    results["peak_rss_mb"] = peak_rss_mb()
+    results["rest_requests"] = sum(fake.requests.values())
+    results["config"] = vars(args)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--members", type=int, default=50)
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--interactions", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--afk-messages", type=int, default=2000)
+    parser.add_argument("--afk-per-guild", type=int, default=10)
+    parser.add_argument("--mentions-per-message", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
@@ -0,0 +1,84 @@
+"""Mass-moderation throughput of run_bulk_actions against a local stand-in for Discord's REST API.
+
+Runs the same bulk ban at several worker-pool sizes.
+
+  python benchmarks/mass_moderation.py --targets 500 --latency 0.02 --ratelimit-every 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+from cogs import moderation
+
+
+def make_app(latency, ratelimit_every):
+    requests = {"count": 0, "limited": 0}
+
+    async def me(request):
+        return web.json_response({"id": "1", "username": "bench", "discriminator": "0", "avatar": None})
+
+    async def ban(request):
+        requests["count"] += 1
+        await asyncio.sleep(latency)
+        if ratelimit_every and requests["count"] % ratelimit_every == 0:
+            requests["limited"] += 1
+            return web.json_response(
+                {"message": "You are being rate limited.", "retry_after": 0.05, "global": False},
+                status=429, headers={"Retry-After": "0.05", "X-RateLimit-Scope": "user"}
+            )
+        # Generous bucket headers so discord.py's own limiter lets requests run concurrently
+        return web.Response(status=204, headers={
+            "X-RateLimit-Bucket": "bench-bans",
+            "X-RateLimit-Limit": "1000",
+            "X-RateLimit-Remaining": "999",
+            "X-RateLimit-Reset-After": "1",
+        })
+
+    app = web.Application()
+    app.router.add_get("/api/v10/users/@me", me)
+    app.router.add_put("/api/v10/guilds/{guild_id}/bans/{user_id}", ban)
+    return app, requests
+
+
+async def run(args):
+    app, requests = make_app(args.latency, args.ratelimit_every)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    discord.http.Route.BASE = f"http://127.0.0.1:{port}/api/v10"
+
+    http = discord.http.HTTPClient(asyncio.get_running_loop())
+    await http.static_login("bench-token")
+    try:
+        targets = [(user_id, None) for user_id in range(1000, 1000 + args.targets)]
+        print(f"{'workers':>8} {'seconds':>8} {'actions/s':>10} {'failed':>7}")
+        for concurrency in args.concurrency:
+            async def action(target):
+                await http.ban(target[0], 42, reason="bench")
+
+            start = time.perf_counter()
+            totals = await moderation.run_bulk_actions(targets, action, concurrency=concurrency)
+            elapsed = time.perf_counter() - start
+            print(f"{concurrency:>8} {elapsed:>8.2f} {len(targets) / elapsed:>10.1f} {totals['failed']:>7}")
+        print(f"requests: {requests['count']}  rate limited: {requests['limited']}")
+    finally:
+        await http.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated REST latency in seconds")
+    parser.add_argument("--ratelimit-every", type=int, default=0, help="answer every Nth request with a 429")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    asyncio.run(run(parser.parse_args()))
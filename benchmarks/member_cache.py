@@ -0,0 +1,77 @@
+"""Startup time and peak RSS of the "full" and "lean" member cache profiles (BOT_MEMBER_CACHE).
+
+Boots main.py in a fresh process per run against benchmarks/fake_discord.py, with guilds
+large enough that full mode has to chunk them.
+
+  python benchmarks/member_cache.py --guilds 10 --members 20000 --runs 3
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from common import bot_environment, peak_rss_mb
+from fake_discord import FakeDiscord
+
+
+async def child():
+    # Runs inside the spawned process; the environment already points main.py at the fake
+    started = time.perf_counter()
+    import main
+    task = asyncio.create_task(main.bot.start(main.TOKEN))
+    await asyncio.wait_for(main.bot.wait_until_ready(), timeout=600)
+    ready = time.perf_counter() - started
+    cached = sum(len(guild.members) for guild in main.bot.guilds)
+    await main.bot.close()
+    await asyncio.gather(task, return_exceptions=True)
+    print(json.dumps({"ready_seconds": round(ready, 3), "peak_rss_mb": peak_rss_mb(), "cached_members": cached}))
+
+
+async def boot(fake, mode):
+    env = dict(os.environ, BOT_MEMBER_CACHE=mode, **bot_environment(fake, tempfile.mkdtemp(prefix="bot-member-cache-")))
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.abspath(__file__), "--child",
+        env=env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+    )
+    stdout, _ = await process.communicate()
+    return json.loads(stdout.decode().strip().splitlines()[-1])
+
+
+async def run(args):
+    fake = FakeDiscord(guilds=args.guilds, members=args.members)
+    await fake.start()
+    results = {}
+    try:
+        for mode in ("full", "lean"):
+            runs = [await boot(fake, mode) for _ in range(args.runs)]
+            results[mode] = {
+                "ready_seconds": statistics.median(run["ready_seconds"] for run in runs),
+                "peak_rss_mb": statistics.median(run["peak_rss_mb"] for run in runs),
+                "cached_members": runs[-1]["cached_members"],
+            }
+    finally:
+        await fake.close()
+    results["config"] = {"guilds": args.guilds, "members": args.members, "runs": args.runs}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=10)
+    parser.add_argument("--members", type=int, default=20000, help="members per guild")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(child())
+    else:
+        print(json.dumps(asyncio.run(run(args)), indent=2))
@@ -0,0 +1,84 @@
+# AFK status: /afk and the on_message listener that clears it and answers mentions.
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from main import (
+    afk_notice_debouncer,
+    afk_registry,
+    clear_afk,
+    instrument_event,
+    notification_sender,
+    reply,
+    set_afk,
+)
+
+def format_time_away(since):
+    seconds = int(time.time() - since)
+    return f"{seconds // 3600}h {(seconds // 60) % 60}m"
+
+# AFK check on message
+async def handle_afk(message):
+    guild_id = message.guild.id
+    # Fast path: nobody in this guild is AFK
+    if not afk_registry.has_guild(guild_id):
+        return
+    
+    # Check if user was AFK and remove them
+    entry = await clear_afk(guild_id, message.author.id)
+    if entry is not None:
+        embed = discord.Embed(title="👋 Welcome Back!", color=0x00ff00)
+        embed.add_field(name="Time Away", value=format_time_away(entry[1]), inline=False)
+        
+        notification_sender.enqueue(message.channel, embed=embed, delete_after=10)
+    
+    # Check for mentions of AFK users, merged into a single notice per message
+    afk_mentions = []
+    for mention in message.mentions:
+        afk_data = afk_registry.get(guild_id, mention.id)
+        if afk_data is not None and afk_notice_debouncer.should_notify(message.channel.id, mention.id):
+            afk_mentions.append((mention, afk_data))
+    
+    if afk_mentions:
+        title = "💤 User is AFK" if len(afk_mentions) == 1 else "💤 Users are AFK"
+        embed = discord.Embed(title=title, color=0x808080)
+        for mention, (reason, since) in afk_mentions[:25]:  # Embed field limit
+            embed.add_field(
+                name=mention.display_name,
+                value=f"{mention.mention}\n**Reason:** {reason}\n**Time Away:** {format_time_away(since)}",
+                inline=False
+            )
+        
+        notification_sender.enqueue(message.channel, embed=embed, delete_after=15)
+
+
+class AFK(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.Cog.listener()
+    @instrument_event
+    async def on_message(self, message):
+        if message.author.bot or message.guild is None:
+            return
+
+        await handle_afk(message)
+
+    # AFK command
+    @app_commands.command(name="afk", description="Set your AFK status")
+    @app_commands.describe(reason="Reason for being AFK")
+    async def afk(self, interaction: discord.Interaction, reason: str = "No reason provided"):
+        await set_afk(interaction.guild.id, interaction.user.id, reason)
+
+        embed = discord.Embed(title="💤 AFK Status Set", color=0x808080)
+        embed.add_field(name="User", value=interaction.user.mention, inline=False)
+        embed.add_field(name="Reason", value=reason, inline=False)
+        embed.set_footer(text="You will be marked as back when you send a message!")
+
+        await reply(interaction, embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(AFK(bot))
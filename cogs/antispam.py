@@ -0,0 +1,143 @@
+# Automatic spam and raid handling: detects spammers, raids and flooded channels and, in
+# enforce mode, times out spammers and raiders and locks flooded channels.
+import datetime
+
+import discord
+from discord.ext import commands
+
+from main import (
+    bot_outranks,
+    bot_store,
+    get_member,
+    guild_counters,
+    instrument_event,
+    notification_sender,
+    setting,
+    spam_detector,
+)
+from cogs.moderation import lock_channel, run_bulk_actions, snapshot_overwrite
+
+# "detect" (the default) only logs and counts detections, so SPAM_LIMITS can be tuned against
+# a server's real traffic before "enforce" lets them time members out and lock channels
+ANTISPAM_MODE = setting("ANTISPAM_MODE", "detect")
+
+SPAM_TIMEOUT_MINUTES = int(setting("SPAM_TIMEOUT_MINUTES", 10))
+
+RAID_TIMEOUT_MINUTES = int(setting("RAID_TIMEOUT_MINUTES", 60))
+
+CHECK_REASONS = {
+    "member_messages": "Sending messages too fast",
+    "duplicates": "Repeating the same message",
+    "mentions": "Mass mentions",
+    "channel_messages": "Channel flood",
+    "joins": "Join raid",
+}
+
+def exempt(member):
+    # Moderators are trusted, and anyone above the bot could not be timed out anyway
+    return member.guild_permissions.manage_messages or not bot_outranks(member, "moderate_members")
+
+async def timeout_spammer(message, checks):
+    member = message.author
+    if not isinstance(member, discord.Member) or exempt(member):
+        return
+    reason = ", ".join(CHECK_REASONS[check] for check in checks)
+    try:
+        await member.timeout(datetime.timedelta(minutes=SPAM_TIMEOUT_MINUTES), reason=f"Auto-moderation: {reason}")
+    except discord.HTTPException as e:
+        print(f"Failed to time out spammer {member.id} in guild {member.guild.id}: {e}")
+        return
+    await guild_counters.incr(member.guild.id, "timeouts")
+
+    embed = discord.Embed(title="🛡️ Spam Detected", color=0x808080)
+    embed.add_field(name="Member", value=f"{member.mention} ({member})", inline=False)
+    embed.add_field(name="Action", value=f"Timed out for {SPAM_TIMEOUT_MINUTES} minutes", inline=False)
+    embed.add_field(name="Reason", value=reason, inline=False)
+    notification_sender.enqueue(message.channel, embed=embed)
+
+async def lock_flooded_channel(channel):
+    # Threads inherit their parent's permissions and have no overwrites of their own
+    if not isinstance(channel, discord.TextChannel) or not channel.permissions_for(channel.guild.me).manage_roles:
+        return
+    try:
+        # Snapshot first so /unlock restores the channel exactly as it was
+        await bot_store.save_overwrites(channel.guild.id, [snapshot_overwrite(channel)])
+        await lock_channel(channel, reason=f"Auto-moderation: {CHECK_REASONS['channel_messages']}")
+    except discord.HTTPException as e:
+        print(f"Failed to lock flooded channel {channel.id}: {e}")
+        return
+
+    embed = discord.Embed(title="🔒 Channel Locked", color=0xff0000)
+    embed.add_field(name="Channel", value=channel.mention, inline=False)
+    embed.add_field(name="Reason", value=f"{CHECK_REASONS['channel_messages']}; use /unlock once it has calmed down", inline=False)
+    notification_sender.enqueue(channel, embed=embed)
+
+async def timeout_raiders(guild, user_ids):
+    duration = datetime.timedelta(minutes=RAID_TIMEOUT_MINUTES)
+
+    async def action(user_id):
+        member = await get_member(guild, user_id)
+        if member is None or exempt(member):
+            return
+        await member.timeout(duration, reason=f"Auto-moderation: {CHECK_REASONS['joins']}")
+
+    totals = await run_bulk_actions(user_ids, action)
+    if totals["succeeded"]:
+        await guild_counters.incr(guild.id, "timeouts", totals["succeeded"])
+    return totals
+
+
+class AntiSpam(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # Named apart from the AFK cog's on_message so each keeps its own event metrics
+    @commands.Cog.listener("on_message")
+    @instrument_event
+    async def detect_spam(self, message):
+        if message.author.bot or message.guild is None:
+            return
+
+        checks = spam_detector.check_message(
+            message.guild.id, message.channel.id, message.author.id, message.content, len(message.mentions)
+        )
+        if not checks:
+            return
+        print(f"Spam in guild {message.guild.id}, channel {message.channel.id} by {message.author.id}: {', '.join(checks)}")
+        if ANTISPAM_MODE != "enforce":
+            return
+
+        member_checks = [check for check in checks if check != "channel_messages"]
+        if member_checks:
+            await timeout_spammer(message, member_checks)
+        if "channel_messages" in checks:
+            await lock_flooded_channel(message.channel)
+
+    @commands.Cog.listener()
+    @instrument_event
+    async def on_member_join(self, member):
+        if member.bot:
+            return
+
+        raiders = spam_detector.check_join(member.guild.id, member.id)
+        if not raiders:
+            return
+        # The whole burst comes back once, when the raid is detected; later joiners one at a time
+        detected = len(raiders) > 1
+        if detected:
+            print(f"Join raid in guild {member.guild.id}: {len(raiders)} members")
+        if ANTISPAM_MODE != "enforce":
+            return
+
+        totals = await timeout_raiders(member.guild, raiders)
+        channel = member.guild.system_channel
+        if detected and channel is not None and channel.permissions_for(member.guild.me).send_messages:
+            embed = discord.Embed(title="🚨 Raid Detected", color=0xff0000)
+            embed.add_field(name="Joins", value=f"{len(raiders)} within {spam_detector.limits['joins'][1]} seconds", inline=False)
+            embed.add_field(name="Action", value=f"Timed out {totals['succeeded']} for {RAID_TIMEOUT_MINUTES} minutes, "
+                                                 "along with anyone else who joins while the raid lasts", inline=False)
+            notification_sender.enqueue(channel, embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(AntiSpam(bot))
@@ -0,0 +1,223 @@
+# Owner-only diagnostics: /debug profile, /debug tasks and /debug slow-callbacks.
+import asyncio
+import cProfile
+import collections
+import io
+import os
+import pstats
+import signal
+import threading
+from typing import Literal, Optional
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from main import (
+    BOT_SOURCE_DIR,
+    code_name,
+    defer,
+    profile_lock,
+    reply,
+    slow_callbacks,
+)
+
+
+PROFILE_MAX_SECONDS = 300
+
+PROFILE_TOP_FUNCTIONS = 40  # rows per table in the attached report
+
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+
+SAMPLE_MAX_STACKS = 500  # distinct stacks written to the report, most frequent first
+
+def short_path(filename):
+    if filename.startswith(BOT_SOURCE_DIR):
+        return os.path.relpath(filename, BOT_SOURCE_DIR)
+    return os.path.join(*filename.split(os.sep)[-2:]) if os.sep in filename else filename
+
+def text_file(interaction, text, filename):
+    # Keep the report inside the upload limit rather than failing the whole reply
+    data = text.encode()[:interaction.filesize_limit]
+    return discord.File(io.BytesIO(data), filename=filename)
+
+# Sampling profiler
+# SIGALRM fires every SAMPLE_INTERVAL of wall time and its handler records the stack it
+# interrupted. Python runs signal handlers in the main thread, which is the event loop's, so
+# samples land wherever the loop actually is, including waiting in the selector, rather than
+# wherever it last released the GIL as a sampling thread would see it. The timer and handler
+# only exist while a profile runs.
+def can_sample_stacks():
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+async def sample_stacks(seconds, interval=SAMPLE_INTERVAL):
+    stacks = collections.Counter()  # (outermost, ..., innermost) frames -> samples
+
+    def sample(signum, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_filename, code.co_firstlineno, code_name(code)))
+            frame = frame.f_back
+        stacks[tuple(reversed(stack))] += 1
+
+    previous = signal.signal(signal.SIGALRM, sample)
+    signal.setitimer(signal.ITIMER_REAL, interval, interval)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+    return stacks
+
+def format_stack_samples(stacks):
+    """Return (embed fields, report text) for the samples from sample_stacks()."""
+    total = sum(stacks.values()) or 1
+    own = collections.Counter()
+    inclusive = collections.Counter()
+    idle = 0
+    for stack, count in stacks.items():
+        own[stack[-1]] += count
+        for frame in set(stack):
+            inclusive[frame] += count
+        if stack[-1][0].endswith("selectors.py"):
+            idle += count
+
+    def label(frame):
+        filename, lineno, name = frame
+        return f"{name} ({short_path(filename)}:{lineno})"
+
+    lines = [f"{total} samples every {SAMPLE_INTERVAL * 1000:g}ms, {idle / total:.0%} idle in the selector", ""]
+    for title, counter in (("Own samples", own), ("Inclusive samples", inclusive)):
+        lines.append(f"{title}:")
+        for frame, count in counter.most_common(PROFILE_TOP_FUNCTIONS):
+            lines.append(f"{count:8d} {count / total:6.1%}  {label(frame)}")
+        lines.append("")
+    # Collapsed stacks, one per line, as read by flamegraph.pl and speedscope
+    lines.append("Stacks:")
+    for stack, count in stacks.most_common(SAMPLE_MAX_STACKS):
+        lines.append(f"{';'.join(name for _, _, name in stack)} {count}")
+
+    busy = [(label(frame), count / total) for frame, count in own.most_common() if not frame[0].endswith("selectors.py")][:5]
+    fields = {
+        "Event Loop": f"{1 - idle / total:.0%} busy over {total} samples",
+        "Top Functions": "\n".join(f"`{share:.0%}` {name}" for name, share in busy) or "Idle the whole time",
+    }
+    return fields, "\n".join(lines) + "\n"
+
+def format_profile(profiler):
+    """Return (embed fields, report text) for a finished cProfile run."""
+    buffer = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buffer).strip_dirs()
+    stats.sort_stats("tottime").print_stats(PROFILE_TOP_FUNCTIONS)
+    stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+
+    top = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:5]
+    fields = {
+        "Calls": f"{stats.total_calls:,} in {stats.total_tt:.2f}s of profiled time",
+        "Top Functions": "\n".join(
+            f"`{total_time * 1000:.0f}ms` {name} ({filename}:{lineno})"
+            for (filename, lineno, name), (_, _, total_time, _, _) in top
+        ) or "No calls recorded",
+    }
+    return fields, buffer.getvalue()
+
+def dump_tasks():
+    """Return (task count by coroutine, report text) for every live asyncio task."""
+    tasks = sorted(asyncio.all_tasks(), key=lambda task: task.get_name())
+    by_coroutine = collections.Counter()
+    buffer = io.StringIO()
+    for task in tasks:
+        coro = task.get_coro()
+        by_coroutine[getattr(coro, "__qualname__", repr(coro))] += 1
+        task.print_stack(file=buffer)
+        buffer.write("\n")
+    return by_coroutine, f"{len(tasks)} tasks\n\n" + buffer.getvalue()
+
+
+@app_commands.default_permissions(administrator=True)
+class Debug(commands.GroupCog, group_name="debug", group_description="Diagnostics for the running bot (bot owner only)"):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        if not await self.bot.is_owner(interaction.user):
+            raise app_commands.CheckFailure("Only the bot owner can use /debug.")
+        return True
+
+    @app_commands.command(name="profile", description="Profile the event loop and attach the busiest functions", extras={"ephemeral": True})
+    @app_commands.describe(
+        seconds="How long to profile for",
+        mode="sampling: low overhead stack samples; cprofile: exact call counts, but slows the bot while it runs"
+    )
+    async def profile(self, interaction: discord.Interaction, seconds: app_commands.Range[int, 1, PROFILE_MAX_SECONDS] = 10, mode: Literal["sampling", "cprofile"] = "sampling"):
+        if profile_lock.locked():
+            await reply(interaction, "❌ A profile is already running.", ephemeral=True)
+            return
+        if mode == "sampling" and not can_sample_stacks():
+            await reply(interaction, "❌ Sampling needs SIGALRM and the event loop on the main thread; use cprofile instead.", ephemeral=True)
+            return
+
+        await defer(interaction, ephemeral=True)
+        async with profile_lock:
+            if mode == "cprofile":
+                # cProfile hooks the calling thread, which is the event loop's
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    await asyncio.sleep(seconds)
+                finally:
+                    profiler.disable()
+                fields, report = format_profile(profiler)
+            else:
+                stacks = await sample_stacks(seconds)
+                fields, report = format_stack_samples(stacks)
+
+        embed = discord.Embed(title=f"🧪 Profile ({mode}, {seconds}s)", color=0x0099ff)
+        for name, value in fields.items():
+            embed.add_field(name=name, value=value[:1024], inline=False)
+        await reply(interaction, embed=embed, file=text_file(interaction, report, f"profile-{mode}.txt"), ephemeral=True)
+
+    @app_commands.command(name="tasks", description="Attach the stack of every live asyncio task", extras={"ephemeral": True})
+    async def tasks(self, interaction: discord.Interaction):
+        by_coroutine, report = dump_tasks()
+        embed = discord.Embed(title="📋 Asyncio Tasks", description=f"{sum(by_coroutine.values())} live tasks", color=0x0099ff)
+        embed.add_field(
+            name="Most Common",
+            value="\n".join(f"`{count}` {name}" for name, count in by_coroutine.most_common(10))[:1024] or "None",
+            inline=False
+        )
+        await reply(interaction, embed=embed, file=text_file(interaction, report, "tasks.txt"), ephemeral=True)
+
+    @app_commands.command(name="slow-callbacks", description="Turn the slow callback detector on or off, or show what it caught", extras={"ephemeral": True})
+    @app_commands.describe(
+        enabled="Time every event loop callback (leave empty to only show the status)",
+        threshold_ms="Log callbacks that hold the event loop for longer than this"
+    )
+    async def slow_callbacks_command(self, interaction: discord.Interaction, enabled: Optional[bool] = None, threshold_ms: Optional[app_commands.Range[float, 1, 60000]] = None):
+        if threshold_ms is not None:
+            slow_callbacks.threshold = threshold_ms / 1000
+        if enabled:
+            slow_callbacks.enable()
+        elif enabled is False:
+            slow_callbacks.disable()
+
+        status = "On" if slow_callbacks.enabled else "Off"
+        embed = discord.Embed(title="🐢 Slow Callbacks", color=0x00ff00 if slow_callbacks.enabled else 0x808080)
+        embed.add_field(name="Detector", value=status, inline=True)
+        embed.add_field(name="Threshold", value=f"{slow_callbacks.threshold * 1000:g}ms", inline=True)
+        embed.add_field(
+            name="Worst Offenders",
+            value="\n".join(f"`{count}` {name}" for name, count in slow_callbacks.counts.most_common(10))[:1024] or "None yet",
+            inline=False
+        )
+        recent = [
+            f"<t:{int(when)}:R> `{elapsed * 1000:.0f}ms` {name}{f' ({where})' if where else ''}"
+            for when, elapsed, name, where in reversed(slow_callbacks.recent)
+        ]
+        embed.add_field(name="Most Recent", value="\n".join(recent[:5])[:1024] or "None yet", inline=False)
+        await reply(interaction, embed=embed, ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Debug(bot))
@@ -0,0 +1,118 @@
+# Information commands: /serverinfo, /userinfo and /stats.
+import math
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from main import (
+    afk_registry,
+    dm_dispatcher,
+    fetch_cluster_status,
+    get_member,
+    guild_counters,
+    metrics,
+    reply,
+)
+
+def format_moderation_actions(counts):
+    return f"{counts.get('kicks', 0)} kicks / {counts.get('bans', 0)} bans / {counts.get('timeouts', 0)} timeouts"
+
+def format_latency(seconds):
+    # Gateway latency is NaN in HTTP interactions mode, where there is no gateway connection
+    return "n/a" if seconds is None or math.isnan(seconds) else f"{seconds * 1000:.0f}ms"
+
+
+class Info(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # Server info command
+    @app_commands.command(name="serverinfo", description="Get server information")
+    async def serverinfo(self, interaction: discord.Interaction):
+        guild = interaction.guild
+        owner = await get_member(guild, guild.owner_id) if guild.owner_id else None
+        embed = discord.Embed(title=f"Server Info - {guild.name}", color=0x0099ff)
+
+        embed.add_field(name="Owner", value=owner.mention if owner else "Unknown", inline=True)
+        embed.add_field(name="Members", value=guild.member_count or guild.approximate_member_count, inline=True)
+        embed.add_field(name="Created", value=guild.created_at.strftime("%B %d, %Y"), inline=True)
+        embed.add_field(name="Channels", value=len(guild.channels), inline=True)
+        embed.add_field(name="Roles", value=len(guild.roles), inline=True)
+        embed.add_field(name="Boost Level", value=guild.premium_tier, inline=True)
+        counts = await guild_counters.fetch(guild.id)
+        embed.add_field(name="Warnings Issued", value=counts.get("warnings", 0), inline=True)
+        embed.add_field(name="Moderation Actions", value=format_moderation_actions(counts), inline=True)
+
+        if guild.icon:
+            embed.set_thumbnail(url=guild.icon.url)
+
+        await reply(interaction, embed=embed)
+
+    # User info command
+    @app_commands.command(name="userinfo", description="Get user information")
+    @app_commands.describe(member="The member to get info about")
+    async def userinfo(self, interaction: discord.Interaction, member: discord.Member = None):
+        if member is None:
+            member = interaction.user
+
+        embed = discord.Embed(title=f"User Info - {member.display_name}", color=member.color)
+
+        embed.add_field(name="Username", value=str(member), inline=True)
+        embed.add_field(name="ID", value=member.id, inline=True)
+        embed.add_field(name="Joined Server", value=member.joined_at.strftime("%B %d, %Y") if member.joined_at else "Unknown", inline=True)
+        embed.add_field(name="Account Created", value=member.created_at.strftime("%B %d, %Y"), inline=True)
+        embed.add_field(name="Top Role", value=member.top_role.mention, inline=True)
+        embed.add_field(name="Status", value=str(member.status).title(), inline=True)
+
+        if member.avatar:
+            embed.set_thumbnail(url=member.avatar.url)
+
+        await reply(interaction, embed=embed)
+
+    # Stats command
+    @app_commands.command(name="stats", description="Show bot statistics")
+    async def stats(self, interaction: discord.Interaction):
+        guild = interaction.guild
+        counts = await guild_counters.fetch(guild.id)
+        total_afk = counts["afk"] if guild_counters.shared else afk_registry.count_guild(guild.id)
+
+        embed = discord.Embed(title="📊 Bot Statistics", color=0x0099ff)
+        embed.add_field(name="Server", value=guild.name, inline=False)
+        embed.add_field(name="Total Members", value=guild.member_count or guild.approximate_member_count, inline=True)
+        embed.add_field(name="Bot Uptime", value="Online ✅", inline=True)
+        embed.add_field(name="Commands Available", value=sum(isinstance(command, app_commands.Command) for command in self.bot.tree.walk_commands()), inline=True)
+        embed.add_field(name="Total Warnings Issued", value=counts.get("warnings", 0), inline=True)
+        embed.add_field(name="Currently AFK Users", value=total_afk, inline=True)
+        embed.add_field(name="Moderation Actions", value=format_moderation_actions(counts), inline=True)
+        embed.add_field(name="Messages Purged", value=counts.get("messages_purged", 0), inline=True)
+        embed.add_field(
+            name="Moderation DMs",
+            value=f"{dm_dispatcher.delivered} delivered / {dm_dispatcher.failed} failed / {len(dm_dispatcher)} pending",
+            inline=True
+        )
+        embed.add_field(name="Bot Latency", value=format_latency(self.bot.latency), inline=True)
+        embed.add_field(
+            name="Command Latency",
+            value=f"p50 {format_latency(metrics.all_commands.quantile(0.5))} / p99 {format_latency(metrics.all_commands.quantile(0.99))}",
+            inline=True
+        )
+
+        cluster = await fetch_cluster_status()
+        if cluster:
+            embed.add_field(
+                name="Cluster",
+                value=f"{cluster['workers']} workers · {cluster['shards']} shards · {cluster['guilds']} guilds · "
+                      f"{cluster['commands']} commands handled",
+                inline=False
+            )
+
+        if guild.icon:
+            embed.set_thumbnail(url=guild.icon.url)
+
+        embed.set_footer(text=f"Bot ID: {self.bot.user.id}")
+        await reply(interaction, embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(Info(bot))
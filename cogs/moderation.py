@@ -0,0 +1,847 @@
+# Moderation commands: kick, ban, warn, timeout, temporary roles, purges, mass actions and channel locks.
+import asyncio
+import datetime
+import re
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from main import (
+    bot_outranks,
+    bot_store,
+    defer,
+    dm_dispatcher,
+    get_all_members,
+    get_member,
+    guild_counters,
+    interaction_expires_at,
+    reply,
+    schedule_warning_decay,
+    scheduler,
+    setting,
+)
+
+TEMP_ACTION_MAX_MINUTES = 525600  # longest temporary ban or role: one year
+
+# Mass moderation commands
+MASS_ACTION_MAX_TARGETS = 1000
+
+MASS_ACTION_CONCURRENCY = int(setting("MASS_ACTION_CONCURRENCY", 4))
+
+MASS_ACTION_PROGRESS_INTERVAL = 3.0
+
+async def run_bulk_actions(targets, action, concurrency=MASS_ACTION_CONCURRENCY, progress=None, max_retries=3):
+    """Apply `action` to every target through a pool of `concurrency` workers.
+
+    A 429 from any worker pauses the whole pool for the retry window before the target is
+    retried, so the pool backs off together instead of each worker hammering the limit.
+    Returns totals of succeeded and failed targets.
+    """
+    totals = {"total": len(targets), "succeeded": 0, "failed": 0}
+    pending = iter(targets)
+    pause_until = 0.0
+    
+    async def worker():
+        nonlocal pause_until
+        for target in pending:
+            for attempt in range(max_retries + 1):
+                delay = pause_until - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                try:
+                    await action(target)
+                    totals["succeeded"] += 1
+                    break
+                except discord.HTTPException as e:
+                    if e.status == 429 and attempt < max_retries:
+                        retry_after = getattr(e, "retry_after", None) or 2 ** attempt
+                        pause_until = max(pause_until, time.monotonic() + retry_after)
+                        continue
+                    totals["failed"] += 1
+                    break
+                except Exception:
+                    totals["failed"] += 1
+                    break
+    
+    async def reporter():
+        while True:
+            await asyncio.sleep(MASS_ACTION_PROGRESS_INTERVAL)
+            await progress(totals)
+    
+    reporter_task = asyncio.create_task(reporter()) if progress is not None else None
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    finally:
+        if reporter_task is not None:
+            reporter_task.cancel()
+    return totals
+
+def progress_reporter(interaction, title):
+    """Return a run_bulk_actions progress callback that edits the deferred response."""
+    async def report_progress(totals):
+        embed = discord.Embed(title=f"{title}...", color=0xffa500)
+        embed.add_field(name="Progress", value=f"{totals['succeeded'] + totals['failed']}/{totals['total']}", inline=True)
+        embed.add_field(name="Failed", value=totals["failed"], inline=True)
+        try:
+            await interaction.edit_original_response(embed=embed)
+        except discord.HTTPException:
+            pass
+    return report_progress
+
+async def send_result(interaction, content=None, embed=None):
+    """Replace the deferred response with a long-running command's result.
+
+    Once the interaction token has expired the edit is refused, so the result goes to the
+    moderator by DM instead, or to the channel if their DMs are closed.
+    """
+    if time.time() < interaction_expires_at(interaction):
+        try:
+            await interaction.edit_original_response(content=content, embed=embed)
+            return
+        except discord.HTTPException:
+            pass  # The token expired while the edit was in flight
+    for destination in (interaction.user, interaction.channel):
+        try:
+            await destination.send(content, embed=embed)
+            return
+        except discord.HTTPException:
+            continue
+    print(f"Failed to deliver the result of /{interaction.command.name} in guild {interaction.guild.id}")
+
+async def retract_notice(member, action):
+    # The member was told about an action that then failed, and is still here to be told so
+    embed = discord.Embed(title=f"Your {action} did not go through", color=0x808080)
+    embed.add_field(name="Server", value=member.guild.name, inline=False)
+    embed.add_field(name="Details", value="Please disregard the previous message.", inline=False)
+    await dm_dispatcher.enqueue(member.id, embed=embed)
+
+def parse_user_ids(ids):
+    user_ids = []
+    for token in re.split(r"[\s,]+", ids.strip()):
+        token = token.strip("<@!>")
+        if token.isdigit():
+            user_ids.append(int(token))
+    return user_ids
+
+async def resolve_members(guild, user_ids, concurrency=MASS_ACTION_CONCURRENCY):
+    """Return ([(user_id, member_or_None)], failed) with None only for IDs not in the guild.
+
+    Members missing from the cache (always, in the lean profile) are fetched, a few at a time.
+    IDs whose lookup fails are left out, so nobody in the guild skips the hierarchy check.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def resolve(user_id):
+        async with semaphore:
+            try:
+                return user_id, await get_member(guild, user_id)
+            except discord.HTTPException:
+                return None
+    
+    resolved = await asyncio.gather(*(resolve(user_id) for user_id in user_ids))
+    candidates = [candidate for candidate in resolved if candidate is not None]
+    return candidates, len(resolved) - len(candidates)
+
+async def resolve_mass_targets(interaction, ids=None, joined_within=None, account_age=None):
+    """Return (targets, skipped) where targets is a list of (user_id, member_or_None)."""
+    guild = interaction.guild
+    now = discord.utils.utcnow()
+    skipped = 0
+    
+    if ids:
+        user_ids = list(dict.fromkeys(parse_user_ids(ids)))
+        if len(user_ids) > MASS_ACTION_MAX_TARGETS:
+            # run_mass_action refuses this many targets, so don't look any of them up
+            return [(user_id, None) for user_id in user_ids], 0
+        if any(guild.get_member(user_id) is None for user_id in user_ids):
+            await defer(interaction, ephemeral=True)
+        candidates, skipped = await resolve_members(guild, user_ids)
+    else:
+        if not guild.chunked:
+            # Requesting every member can take a while on large guilds
+            await defer(interaction, ephemeral=True)
+        candidates = [(member.id, member) for member in await get_all_members(guild)]
+    
+    if joined_within or account_age:
+        joined_cutoff = now - datetime.timedelta(minutes=joined_within) if joined_within else None
+        created_cutoff = now - datetime.timedelta(minutes=account_age) if account_age else None
+        filtered = []
+        for user_id, member in candidates:
+            if member is None:
+                continue
+            if joined_cutoff and (member.joined_at is None or member.joined_at < joined_cutoff):
+                continue
+            if created_cutoff and member.created_at < created_cutoff:
+                continue
+            filtered.append((user_id, member))
+        candidates = filtered
+    
+    protected = {interaction.user.id, guild.me.id, guild.owner_id}
+    is_owner = interaction.user.id == guild.owner_id
+    targets = []
+    for user_id, member in candidates:
+        if user_id in protected:
+            skipped += 1
+            continue
+        if member is not None and (
+            member.top_role >= guild.me.top_role or (not is_owner and member.top_role >= interaction.user.top_role)
+        ):
+            skipped += 1
+            continue
+        targets.append((user_id, member))
+    return targets, skipped
+
+async def run_mass_action(interaction, title, targets, skipped, action, dry_run, color, counter):
+    await defer(interaction, ephemeral=True)
+    
+    if len(targets) > MASS_ACTION_MAX_TARGETS:
+        await interaction.edit_original_response(
+            content=f"❌ {len(targets)} members matched; narrow the selection to at most {MASS_ACTION_MAX_TARGETS}!"
+        )
+        return
+    
+    if dry_run or not targets:
+        embed = discord.Embed(title=f"{title} (Dry Run)" if dry_run else title, color=0x808080)
+        embed.add_field(name="Matched", value=len(targets), inline=True)
+        embed.add_field(name="Skipped", value=skipped, inline=True)
+        if targets:
+            preview = "\n".join(f"<@{user_id}>" for user_id, _ in targets[:20])
+            if len(targets) > 20:
+                preview += f"\n...and {len(targets) - 20} more"
+            embed.add_field(name="Targets", value=preview, inline=False)
+        await interaction.edit_original_response(embed=embed)
+        return
+    
+    totals = await run_bulk_actions(targets, action, progress=progress_reporter(interaction, title))
+    await guild_counters.incr(interaction.guild.id, counter, totals["succeeded"])
+    
+    embed = discord.Embed(title=title, color=color)
+    embed.add_field(name="Succeeded", value=totals["succeeded"], inline=True)
+    embed.add_field(name="Failed", value=totals["failed"], inline=True)
+    embed.add_field(name="Skipped", value=skipped, inline=True)
+    embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
+    await send_result(interaction, embed=embed)
+
+# Message purges
+CLEAR_MAX_MESSAGES = 50000
+
+CLEAR_MAX_SCAN = 200000  # history scanned per /clear when filters skip most messages
+
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14, minutes=-5)  # small margin under Discord's 14 day limit
+
+SINGLE_DELETE_DELAY = 1.0  # pacing between deletes of messages too old to bulk delete
+
+CLEAR_PROGRESS_INTERVAL = 3.0
+
+def parse_snowflake(value):
+    if value is None:
+        return None
+    try:
+        return discord.Object(id=int(value))
+    except ValueError:
+        raise ValueError(f"`{value}` is not a valid message ID")
+
+async def stream_purge(channel, amount, check, progress=None):
+    """Delete up to `amount` messages matching `check`, walking history newest first.
+
+    Messages young enough are bulk-deleted 100 at a time; older ones are deleted one by one
+    with pacing. Only one chunk of messages is held in memory at a time. `progress` is an
+    optional coroutine function called with the running totals.
+    """
+    totals = {"scanned": 0, "deleted": 0, "bulk": 0, "single": 0, "failed": 0}
+    bulk_cutoff = discord.utils.time_snowflake(discord.utils.utcnow() - BULK_DELETE_MAX_AGE)
+    chunk = []
+    last_progress = time.monotonic()
+    
+    async def flush_chunk():
+        if not chunk:
+            return
+        try:
+            await channel.delete_messages(chunk)
+            totals["deleted"] += len(chunk)
+            totals["bulk"] += len(chunk)
+        except discord.NotFound:
+            pass  # Another purge already removed some of them
+        except discord.HTTPException:
+            totals["failed"] += len(chunk)
+        chunk.clear()
+    
+    async for message in channel.history(limit=CLEAR_MAX_SCAN, before=check.before, after=check.after, oldest_first=False):
+        totals["scanned"] += 1
+        if not check(message):
+            continue
+        
+        if message.id > bulk_cutoff:
+            chunk.append(message)
+            if len(chunk) == 100:
+                await flush_chunk()
+        else:
+            await flush_chunk()
+            try:
+                await message.delete()
+                totals["deleted"] += 1
+                totals["single"] += 1
+            except discord.NotFound:
+                pass
+            except discord.HTTPException:
+                totals["failed"] += 1
+            await asyncio.sleep(SINGLE_DELETE_DELAY)
+        
+        if totals["deleted"] + len(chunk) >= amount:
+            break
+        
+        if progress is not None and time.monotonic() - last_progress >= CLEAR_PROGRESS_INTERVAL:
+            last_progress = time.monotonic()
+            await progress(totals)
+    
+    await flush_chunk()
+    return totals
+
+class PurgeFilter:
+    def __init__(self, user=None, contains=None, bots_only=False, before=None, after=None):
+        self.user_id = user.id if user else None
+        self.contains = contains.lower() if contains else None
+        self.bots_only = bots_only
+        self.before = before
+        self.after = after
+    
+    def __call__(self, message):
+        if self.user_id is not None and message.author.id != self.user_id:
+            return False
+        if self.bots_only and not message.author.bot:
+            return False
+        if self.contains is not None and self.contains not in message.content.lower():
+            return False
+        return True
+
+class WarningsView(discord.ui.View):
+    warnings_per_page = 10
+
+    def __init__(self, guild_id, member, total_warnings):
+        super().__init__(timeout=300)
+        self.guild_id = guild_id
+        self.member = member
+        self.total_warnings = total_warnings
+        # Keyset cursors for every page visited so far; cursors[0] is None (newest page)
+        self.cursors = [None]
+        self.next_cursor = None
+    
+    async def render_page(self):
+        page = len(self.cursors) - 1
+        warnings_list = await bot_store.list_warnings(
+            self.guild_id, self.member.id, limit=self.warnings_per_page + 1, before=self.cursors[-1]
+        )
+        has_more = len(warnings_list) > self.warnings_per_page
+        warnings_list = warnings_list[:self.warnings_per_page]
+        
+        embed = discord.Embed(title=f"Warnings for {self.member.display_name}", color=0xffa500)
+        number = self.total_warnings - page * self.warnings_per_page
+        for i, warning in enumerate(warnings_list):
+            date = datetime.datetime.fromtimestamp(warning["timestamp"], datetime.timezone.utc).strftime("%Y-%m-%d")
+            embed.add_field(
+                name=f"Warning {number - i}",
+                value=f"**Reason:** {warning['reason']}\n**Moderator:** {warning['moderator']}\n**Date:** {date}",
+                inline=False
+            )
+        
+        embed.add_field(name="Total Warnings", value=self.total_warnings, inline=False)
+        
+        if warnings_list:
+            last = warnings_list[-1]
+            self.next_cursor = (last["timestamp"], last["id"])
+        self.newer_button.disabled = page == 0
+        self.older_button.disabled = not has_more
+        return embed
+    
+    @discord.ui.button(label='◀️ Newer', style=discord.ButtonStyle.secondary)
+    async def newer_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if len(self.cursors) > 1:
+            self.cursors.pop()
+        embed = await self.render_page()
+        await interaction.response.edit_message(embed=embed, view=self)
+    
+    @discord.ui.button(label='Older ▶️', style=discord.ButtonStyle.primary)
+    async def older_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.cursors.append(self.next_cursor)
+        embed = await self.render_page()
+        await interaction.response.edit_message(embed=embed, view=self)
+    
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+
+# Channel locks
+# /lock and /lockdown record each channel's original @everyone overwrite before changing it, and
+# /unlock and /unlockdown put back exactly that overwrite, or remove it if there was none.
+def snapshot_overwrite(channel):
+    """Return (channel_id, allow, deny) for @everyone, with allow/deny None if it has no overwrite."""
+    role = channel.guild.default_role
+    if role not in channel.overwrites:
+        return (channel.id, None, None)
+    allow, deny = channel.overwrites_for(role).pair()
+    return (channel.id, allow.value, deny.value)
+
+async def lock_channel(channel, reason=None):
+    overwrite = channel.overwrites_for(channel.guild.default_role)
+    overwrite.send_messages = False
+    overwrite.send_messages_in_threads = False
+    overwrite.create_public_threads = False
+    overwrite.create_private_threads = False
+    await channel.set_permissions(channel.guild.default_role, overwrite=overwrite, reason=reason)
+
+async def restore_overwrite(channel, allow, deny, reason=None):
+    if allow is None:
+        overwrite = None
+    else:
+        overwrite = discord.PermissionOverwrite.from_pair(discord.Permissions(allow), discord.Permissions(deny))
+    await channel.set_permissions(channel.guild.default_role, overwrite=overwrite, reason=reason)
+
+
+class Moderation(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # Kick command
+    @app_commands.command(name="kick", description="Kick a member from the server")
+    @app_commands.describe(member="The member to kick", reason="Reason for kicking")
+    async def kick(self, interaction: discord.Interaction, member: discord.Member, reason: str = "No reason provided"):
+        if not interaction.user.guild_permissions.kick_members:
+            await reply(interaction, "❌ You don't have permission to kick members!", ephemeral=True)
+            return
+
+        try:
+            # Told before the kick, while they still share a server with the bot
+            notified = bot_outranks(member, "kick_members")
+            if notified:
+                dm_embed = discord.Embed(title="You've been kicked", color=0xff6b6b)
+                dm_embed.add_field(name="Server", value=interaction.guild.name, inline=False)
+                dm_embed.add_field(name="Reason", value=reason, inline=False)
+                await dm_dispatcher.notify_before_action(member.id, embed=dm_embed)
+            try:
+                await member.kick(reason=reason)
+            except discord.HTTPException:
+                if notified:
+                    await retract_notice(member, "kick")
+                raise
+            await guild_counters.incr(interaction.guild.id, "kicks")
+            embed = discord.Embed(title="Member Kicked", color=0xff6b6b)
+            embed.add_field(name="Member", value=f"{member.mention} ({member})", inline=False)
+            embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
+            embed.add_field(name="Reason", value=reason, inline=False)
+            await reply(interaction, embed=embed)
+        except discord.Forbidden:
+            await reply(interaction, "❌ I don't have permission to kick this member!", ephemeral=True)
+        except Exception as e:
+            await reply(interaction, f"❌ An error occurred: {e}", ephemeral=True)
+
+    # Ban command
+    @app_commands.command(name="ban", description="Ban a member from the server")
+    @app_commands.describe(member="The member to ban", reason="Reason for banning", delete_messages="Days of messages to delete (0-7)",
+                           duration="Ban duration in minutes (0 = permanent)")
+    async def ban(self, interaction: discord.Interaction, member: discord.Member, reason: str = "No reason provided", delete_messages: int = 0,
+                  duration: int = 0):
+        if not interaction.user.guild_permissions.ban_members:
+            await reply(interaction, "❌ You don't have permission to ban members!", ephemeral=True)
+            return
+
+        if delete_messages < 0 or delete_messages > 7:
+            await reply(interaction, "❌ Delete messages days must be between 0-7!", ephemeral=True)
+            return
+
+        if duration < 0 or duration > TEMP_ACTION_MAX_MINUTES:
+            await reply(interaction, f"❌ Duration must be between 0 and {TEMP_ACTION_MAX_MINUTES} minutes!", ephemeral=True)
+            return
+
+        try:
+            notified = bot_outranks(member, "ban_members")
+            if notified:
+                dm_embed = discord.Embed(title="You've been banned", color=0xff0000)
+                dm_embed.add_field(name="Server", value=interaction.guild.name, inline=False)
+                dm_embed.add_field(name="Reason", value=reason, inline=False)
+                await dm_dispatcher.notify_before_action(member.id, embed=dm_embed)
+            try:
+                await member.ban(reason=reason, delete_message_days=delete_messages)
+            except discord.HTTPException:
+                if notified:
+                    await retract_notice(member, "ban")
+                raise
+            await guild_counters.incr(interaction.guild.id, "bans")
+            if duration:
+                await scheduler.schedule(
+                    "unban", f"unban:{interaction.guild.id}:{member.id}", time.time() + duration * 60,
+                    guild_id=interaction.guild.id, data={"user_id": member.id}
+                )
+            embed = discord.Embed(title="Member Banned", color=0xff0000)
+            embed.add_field(name="Member", value=f"{member.mention} ({member})", inline=False)
+            embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
+            embed.add_field(name="Reason", value=reason, inline=False)
+            if duration:
+                embed.add_field(name="Duration", value=f"{duration} minutes", inline=False)
+            await reply(interaction, embed=embed)
+        except discord.Forbidden:
+            await reply(interaction, "❌ I don't have permission to ban this member!", ephemeral=True)
+        except Exception as e:
+            await reply(interaction, f"❌ An error occurred: {e}", ephemeral=True)
+
+    # Warn command
+    @app_commands.command(name="warn", description="Warn a member")
+    @app_commands.describe(member="The member to warn", reason="Reason for warning")
+    async def warn(self, interaction: discord.Interaction, member: discord.Member, reason: str = "No reason provided"):
+        if not interaction.user.guild_permissions.moderate_members:
+            await reply(interaction, "❌ You don't have permission to warn members!", ephemeral=True)
+            return
+
+        await bot_store.add_warning(interaction.guild.id, member.id, reason, str(interaction.user))
+        await guild_counters.incr(interaction.guild.id, "warnings")
+        await schedule_warning_decay(time.time())
+        total_warnings = await bot_store.count_warnings(interaction.guild.id, member.id)
+
+        embed = discord.Embed(title="Member Warned", color=0xffa500)
+        embed.add_field(name="Member", value=f"{member.mention} ({member})", inline=False)
+        embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
+        embed.add_field(name="Reason", value=reason, inline=False)
+        embed.add_field(name="Total Warnings", value=total_warnings, inline=False)
+
+        await reply(interaction, embed=embed)
+
+        # DM the warned user in the background
+        dm_embed = discord.Embed(title="You've been warned", color=0xffa500)
+        dm_embed.add_field(name="Server", value=interaction.guild.name, inline=False)
+        dm_embed.add_field(name="Reason", value=reason, inline=False)
+        await dm_dispatcher.enqueue(member.id, embed=dm_embed)
+
+    # Timeout command
+    @app_commands.command(name="timeout", description="Timeout a member")
+    @app_commands.describe(member="The member to timeout", duration="Duration in minutes", reason="Reason for timeout")
+    async def timeout(self, interaction: discord.Interaction, member: discord.Member, duration: int, reason: str = "No reason provided"):
+        if not interaction.user.guild_permissions.moderate_members:
+            await reply(interaction, "❌ You don't have permission to timeout members!", ephemeral=True)
+            return
+
+        if duration <= 0 or duration > 40320:  # Max 28 days
+            await reply(interaction, "❌ Duration must be between 1 minute and 28 days (40320 minutes)!", ephemeral=True)
+            return
+
+        try:
+            until = discord.utils.utcnow() + datetime.timedelta(minutes=duration)
+            await member.timeout(until, reason=reason)
+            await guild_counters.incr(interaction.guild.id, "timeouts")
+
+            embed = discord.Embed(title="Member Timed Out", color=0x808080)
+            embed.add_field(name="Member", value=f"{member.mention} ({member})", inline=False)
+            embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
+            embed.add_field(name="Duration", value=f"{duration} minutes", inline=False)
+            embed.add_field(name="Reason", value=reason, inline=False)
+
+            await reply(interaction, embed=embed)
+        except discord.Forbidden:
+            await reply(interaction, "❌ I don't have permission to timeout this member!", ephemeral=True)
+        except Exception as e:
+            await reply(interaction, f"❌ An error occurred: {e}", ephemeral=True)
+
+    # Temporary role command
+    @app_commands.command(name="temprole", description="Give a member a role for a limited time")
+    @app_commands.describe(member="The member to give the role to", role="The role to give", duration="Duration in minutes")
+    async def temprole(self, interaction: discord.Interaction, member: discord.Member, role: discord.Role, duration: int):
+        if not interaction.user.guild_permissions.manage_roles:
+            await reply(interaction, "❌ You don't have permission to manage roles!", ephemeral=True)
+            return
+
+        if duration <= 0 or duration > TEMP_ACTION_MAX_MINUTES:
+            await reply(interaction, f"❌ Duration must be between 1 and {TEMP_ACTION_MAX_MINUTES} minutes!", ephemeral=True)
+            return
+
+        if role >= interaction.guild.me.top_role or (interaction.user.id != interaction.guild.owner_id and role >= interaction.user.top_role):
+            await reply(interaction, "❌ That role is above the roles you or I can manage!", ephemeral=True)
+            return
+
+        try:
+            await member.add_roles(role, reason=f"Temporary role for {duration} minutes, by {interaction.user}")
+            await scheduler.schedule(
+                "remove_role", f"role:{interaction.guild.id}:{member.id}:{role.id}", time.time() + duration * 60,
+                guild_id=interaction.guild.id, data={"user_id": member.id, "role_id": role.id}
+            )
+
+            embed = discord.Embed(title="Temporary Role Added", color=0x00ff00)
+            embed.add_field(name="Member", value=f"{member.mention} ({member})", inline=False)
+            embed.add_field(name="Role", value=role.mention, inline=False)
+            embed.add_field(name="Duration", value=f"{duration} minutes", inline=False)
+            await reply(interaction, embed=embed)
+        except discord.Forbidden:
+            await reply(interaction, "❌ I don't have permission to give this role!", ephemeral=True)
+        except Exception as e:
+            await reply(interaction, f"❌ An error occurred: {e}", ephemeral=True)
+
+    @app_commands.command(name="massban", description="Ban many members at once", extras={"ephemeral": True})
+    @app_commands.describe(
+        ids="User IDs or mentions separated by spaces or commas",
+        joined_within="Only members who joined in the last N minutes",
+        account_age="Only accounts younger than N minutes",
+        reason="Reason for banning",
+        dry_run="Only list who would be banned"
+    )
+    async def massban(self, interaction: discord.Interaction, ids: str = None, joined_within: int = None, account_age: int = None,
+                      reason: str = "No reason provided", dry_run: bool = False):
+        if not interaction.user.guild_permissions.ban_members:
+            await reply(interaction, "❌ You don't have permission to ban members!", ephemeral=True)
+            return
+        if not (ids or joined_within or account_age):
+            await reply(interaction, "❌ Provide IDs or at least one filter!", ephemeral=True)
+            return
+
+        targets, skipped = await resolve_mass_targets(interaction, ids, joined_within, account_age)
+
+        async def action(target):
+            await interaction.guild.ban(discord.Object(id=target[0]), reason=reason, delete_message_days=0)
+
+        await run_mass_action(interaction, "🔨 Mass Ban", targets, skipped, action, dry_run, 0xff0000, "bans")
+
+    @app_commands.command(name="masskick", description="Kick many members at once", extras={"ephemeral": True})
+    @app_commands.describe(
+        ids="User IDs or mentions separated by spaces or commas",
+        joined_within="Only members who joined in the last N minutes",
+        account_age="Only accounts younger than N minutes",
+        reason="Reason for kicking",
+        dry_run="Only list who would be kicked"
+    )
+    async def masskick(self, interaction: discord.Interaction, ids: str = None, joined_within: int = None, account_age: int = None,
+                       reason: str = "No reason provided", dry_run: bool = False):
+        if not interaction.user.guild_permissions.kick_members:
+            await reply(interaction, "❌ You don't have permission to kick members!", ephemeral=True)
+            return
+        if not (ids or joined_within or account_age):
+            await reply(interaction, "❌ Provide IDs or at least one filter!", ephemeral=True)
+            return
+
+        targets, skipped = await resolve_mass_targets(interaction, ids, joined_within, account_age)
+
+        async def action(target):
+            await interaction.guild.kick(discord.Object(id=target[0]), reason=reason)
+
+        await run_mass_action(interaction, "👢 Mass Kick", targets, skipped, action, dry_run, 0xff6b6b, "kicks")
+
+    @app_commands.command(name="masstimeout", description="Timeout many members at once", extras={"ephemeral": True})
+    @app_commands.describe(
+        duration="Duration in minutes",
+        ids="User IDs or mentions separated by spaces or commas",
+        joined_within="Only members who joined in the last N minutes",
+        account_age="Only accounts younger than N minutes",
+        reason="Reason for timeout",
+        dry_run="Only list who would be timed out"
+    )
+    async def masstimeout(self, interaction: discord.Interaction, duration: int, ids: str = None, joined_within: int = None,
+                          account_age: int = None, reason: str = "No reason provided", dry_run: bool = False):
+        if not interaction.user.guild_permissions.moderate_members:
+            await reply(interaction, "❌ You don't have permission to timeout members!", ephemeral=True)
+            return
+        if duration <= 0 or duration > 40320:  # Max 28 days
+            await reply(interaction, "❌ Duration must be between 1 minute and 28 days (40320 minutes)!", ephemeral=True)
+            return
+        if not (ids or joined_within or account_age):
+            await reply(interaction, "❌ Provide IDs or at least one filter!", ephemeral=True)
+            return
+
+        targets, skipped = await resolve_mass_targets(interaction, ids, joined_within, account_age)
+        until = discord.utils.utcnow() + datetime.timedelta(minutes=duration)
+
+        async def action(target):
+            user_id, member = target
+            if member is None:
+                member = await interaction.guild.fetch_member(user_id)
+            await member.timeout(until, reason=reason)
+
+        await run_mass_action(interaction, "🔇 Mass Timeout", targets, skipped, action, dry_run, 0x808080, "timeouts")
+
+    # Clear messages command
+    @app_commands.command(name="clear", description="Clear messages from a channel", extras={"ephemeral": True})
+    @app_commands.describe(
+        amount=f"Number of messages to delete (1-{CLEAR_MAX_MESSAGES})",
+        user="Only delete messages from this member",
+        contains="Only delete messages containing this text",
+        bots_only="Only delete messages sent by bots",
+        before="Only delete messages before this message ID",
+        after="Only delete messages after this message ID"
+    )
+    async def clear(self, interaction: discord.Interaction, amount: int, user: discord.Member = None, contains: str = None,
+                    bots_only: bool = False, before: str = None, after: str = None):
+        if not interaction.user.guild_permissions.manage_messages:
+            await reply(interaction, "❌ You don't have permission to manage messages!", ephemeral=True)
+            return
+
+        if amount <= 0 or amount > CLEAR_MAX_MESSAGES:
+            await reply(interaction, f"❌ Amount must be between 1-{CLEAR_MAX_MESSAGES}!", ephemeral=True)
+            return
+
+        try:
+            check = PurgeFilter(user, contains, bots_only, parse_snowflake(before), parse_snowflake(after))
+        except ValueError as e:
+            await reply(interaction, f"❌ {e}!", ephemeral=True)
+            return
+
+        await defer(interaction, ephemeral=True)
+
+        async def report_progress(totals):
+            embed = discord.Embed(title="🧹 Clearing Messages...", color=0xffa500)
+            embed.add_field(name="Deleted", value=f"{totals['deleted']}/{amount}", inline=True)
+            embed.add_field(name="Scanned", value=totals["scanned"], inline=True)
+            try:
+                await interaction.edit_original_response(embed=embed)
+            except discord.HTTPException:
+                pass  # Progress is best effort; the interaction token may have expired
+
+        try:
+            totals = await stream_purge(interaction.channel, amount, check, report_progress)
+            await guild_counters.incr(interaction.guild.id, "messages_purged", totals["deleted"])
+            embed = discord.Embed(title="Messages Cleared", color=0x00ff00)
+            embed.add_field(name="Amount", value=f"{totals['deleted']} messages", inline=False)
+            embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
+            embed.add_field(name="Channel", value=interaction.channel.mention, inline=False)
+            if totals["failed"]:
+                embed.add_field(name="Failed", value=f"{totals['failed']} messages", inline=False)
+
+            await send_result(interaction, embed=embed)
+        except discord.Forbidden:
+            await send_result(interaction, content="❌ I don't have permission to delete messages!")
+        except Exception as e:
+            await send_result(interaction, content=f"❌ An error occurred: {e}")
+
+    # Warnings check command
+    @app_commands.command(name="warnings", description="Check warnings for a member", extras={"ephemeral": True})
+    @app_commands.describe(member="The member to check warnings for")
+    async def warnings(self, interaction: discord.Interaction, member: discord.Member):
+        if not interaction.user.guild_permissions.moderate_members:
+            await reply(interaction, "❌ You don't have permission to view warnings!", ephemeral=True)
+            return
+
+        total_warnings = await bot_store.count_warnings(interaction.guild.id, member.id)
+        if total_warnings == 0:
+            await reply(interaction, f"✅ {member.mention} has no warnings!", ephemeral=True)
+            return
+
+        view = WarningsView(interaction.guild.id, member, total_warnings)
+        embed = await view.render_page()
+        await reply(interaction, embed=embed, view=view, ephemeral=True)
+
+    # Lock channel command
+    @app_commands.command(name="lock", description="Lock a channel")
+    @app_commands.describe(reason="Reason for locking the channel")
+    async def lock(self, interaction: discord.Interaction, reason: str = "No reason provided"):
+        if not interaction.user.guild_permissions.manage_channels:
+            await reply(interaction, "❌ You don't have permission to manage channels!", ephemeral=True)
+            return
+
+        try:
+            await bot_store.save_overwrites(interaction.guild.id, [snapshot_overwrite(interaction.channel)])
+            await lock_channel(interaction.channel, reason=reason)
+
+            embed = discord.Embed(title="🔒 Channel Locked", color=0xff0000)
+            embed.add_field(name="Channel", value=interaction.channel.mention, inline=False)
+            embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
+            embed.add_field(name="Reason", value=reason, inline=False)
+
+            await reply(interaction, embed=embed)
+        except Exception as e:
+            await reply(interaction, f"❌ An error occurred: {e}", ephemeral=True)
+
+    # Unlock channel command
+    @app_commands.command(name="unlock", description="Unlock a channel")
+    @app_commands.describe(reason="Reason for unlocking the channel")
+    async def unlock(self, interaction: discord.Interaction, reason: str = "No reason provided"):
+        if not interaction.user.guild_permissions.manage_channels:
+            await reply(interaction, "❌ You don't have permission to manage channels!", ephemeral=True)
+            return
+
+        try:
+            snapshot = await bot_store.load_overwrites(interaction.guild.id, interaction.channel.id)
+            if snapshot:
+                await restore_overwrite(interaction.channel, *snapshot[interaction.channel.id], reason=reason)
+                await bot_store.delete_overwrites(interaction.guild.id, [interaction.channel.id])
+            else:
+                overwrite = interaction.channel.overwrites_for(interaction.guild.default_role)
+                overwrite.send_messages = None
+                await interaction.channel.set_permissions(interaction.guild.default_role, overwrite=overwrite)
+
+            embed = discord.Embed(title="🔓 Channel Unlocked", color=0x00ff00)
+            embed.add_field(name="Channel", value=interaction.channel.mention, inline=False)
+            embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
+            embed.add_field(name="Reason", value=reason, inline=False)
+
+            await reply(interaction, embed=embed)
+        except Exception as e:
+            await reply(interaction, f"❌ An error occurred: {e}", ephemeral=True)
+
+    # Lockdown commands
+    @app_commands.command(name="lockdown", description="Lock every text channel in the server")
+    @app_commands.describe(reason="Reason for the lockdown")
+    async def lockdown(self, interaction: discord.Interaction, reason: str = "No reason provided"):
+        if not interaction.user.guild_permissions.manage_channels:
+            await reply(interaction, "❌ You don't have permission to manage channels!", ephemeral=True)
+            return
+
+        await defer(interaction)
+        guild = interaction.guild
+        channels = [channel for channel in guild.text_channels if channel.permissions_for(guild.me).manage_roles]
+        skipped = len(guild.text_channels) - len(channels)
+
+        # Snapshot before touching anything; channels already locked with /lock keep their original
+        await bot_store.save_overwrites(guild.id, [snapshot_overwrite(channel) for channel in channels])
+        totals = await run_bulk_actions(
+            channels, lambda channel: lock_channel(channel, reason=f"Lockdown by {interaction.user}: {reason}"),
+            progress=progress_reporter(interaction, "🔒 Server Lockdown")
+        )
+
+        embed = discord.Embed(title="🔒 Server Locked Down", color=0xff0000)
+        embed.add_field(name="Locked", value=totals["succeeded"], inline=True)
+        embed.add_field(name="Failed", value=totals["failed"], inline=True)
+        embed.add_field(name="Skipped", value=skipped, inline=True)
+        embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
+        embed.add_field(name="Reason", value=reason, inline=False)
+        embed.set_footer(text="Use /unlockdown to restore every channel's previous permissions")
+        await interaction.edit_original_response(embed=embed)
+
+    @app_commands.command(name="unlockdown", description="Restore every channel locked by /lockdown or /lock")
+    @app_commands.describe(reason="Reason for lifting the lockdown")
+    async def unlockdown(self, interaction: discord.Interaction, reason: str = "No reason provided"):
+        if not interaction.user.guild_permissions.manage_channels:
+            await reply(interaction, "❌ You don't have permission to manage channels!", ephemeral=True)
+            return
+
+        await defer(interaction)
+        guild = interaction.guild
+        snapshots = await bot_store.load_overwrites(guild.id)
+        if not snapshots:
+            await interaction.edit_original_response(content="❌ No locked channels to restore!")
+            return
+
+        restored = []
+        deleted = []
+
+        async def restore(channel_id):
+            channel = guild.get_channel(channel_id)
+            if channel is None:
+                # Missing from the cache isn't proof it's gone; only drop the snapshot if it is
+                try:
+                    channel = await guild.fetch_channel(channel_id)
+                except discord.NotFound:
+                    deleted.append(channel_id)
+                    return
+            await restore_overwrite(channel, *snapshots[channel_id], reason=f"Lockdown lifted by {interaction.user}: {reason}")
+            restored.append(channel_id)
+
+        totals = await run_bulk_actions(list(snapshots), restore, progress=progress_reporter(interaction, "🔓 Lifting Lockdown"))
+        await bot_store.delete_overwrites(guild.id, restored + deleted)
+
+        embed = discord.Embed(title="🔓 Lockdown Lifted", color=0x00ff00)
+        embed.add_field(name="Restored", value=len(restored), inline=True)
+        embed.add_field(name="Failed", value=totals["failed"], inline=True)
+        embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
+        embed.add_field(name="Reason", value=reason, inline=False)
+        if totals["failed"]:
+            embed.set_footer(text="Run /unlockdown again to retry the channels that failed")
+        await interaction.edit_original_response(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(Moderation(bot))
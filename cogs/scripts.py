@@ -0,0 +1,178 @@
+# ScriptBlox search with paged results and autocomplete.
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from main import (
+    defer,
+    http_client,
+    interaction_expires_at,
+    normalize_query,
+    rate_limiter,
+    reply,
+    script_index,
+    script_search_cache,
+    setting,
+)
+
+SCRIPTBLOX_SEARCH_URL = setting("SCRIPTBLOX_SEARCH_URL", "https://scriptblox.com/api/script/search")
+
+SCRIPTBLOX_PAGE_SIZE = 20  # results requested per API page
+
+SCRIPTS_PER_PAGE = 5  # results shown per embed page
+
+class ScriptBloxError(Exception):
+    pass
+
+
+async def fetch_scripts(query, api_page=1, deadline=None):
+    params = {"q": query, "page": api_page, "max": SCRIPTBLOX_PAGE_SIZE}
+    status, data = await http_client.get_json(SCRIPTBLOX_SEARCH_URL, params=params, deadline=deadline)
+    if status != 200 or data is None:
+        raise ScriptBloxError(f"ScriptBlox API returned status {status}")
+    result = data.get('result') or {}
+    scripts = result.get('scripts') or []
+    total_pages = result.get('totalPages')
+    if total_pages is None:
+        # Without a page count, a full page means there may be more
+        total_pages = api_page + 1 if len(scripts) >= SCRIPTBLOX_PAGE_SIZE else api_page
+    script_index.add_results(scripts)
+    return {"scripts": scripts, "totalPages": total_pages}
+
+async def search_scripts_cached(query, api_page=1, deadline=None):
+    key = normalize_query(query)
+    return await script_search_cache.get_or_fetch((key, api_page), lambda: fetch_scripts(key, api_page, deadline))
+
+async def build_script_page(query, page, deadline=None):
+    """Render one page of results for `query`, fetching the backing API page on demand.
+
+    Returns (embed, view), or (None, None) if the page is past the end of the results.
+    """
+    start_idx = page * SCRIPTS_PER_PAGE
+    api_index, offset = divmod(start_idx, SCRIPTBLOX_PAGE_SIZE)
+    result = await search_scripts_cached(query, api_index + 1, deadline)
+    scripts = result["scripts"]
+    page_scripts = scripts[offset:offset + SCRIPTS_PER_PAGE]
+    
+    if not page_scripts:
+        return None, None
+    
+    end_idx = start_idx + len(page_scripts)
+    is_last_api_page = api_index + 1 >= result["totalPages"]
+    has_next = offset + SCRIPTS_PER_PAGE < len(scripts) or not is_last_api_page
+    
+    description = f"Search query: **{query}**\nShowing {start_idx + 1}-{end_idx}"
+    if is_last_api_page:
+        description += f" of {api_index * SCRIPTBLOX_PAGE_SIZE + len(scripts)} results"
+    
+    embed = discord.Embed(
+        title=f"🔍 Script Search Results - Page {page + 1}",
+        description=description,
+        color=0x0099ff
+    )
+    
+    for i, script in enumerate(page_scripts, start_idx + 1):
+        title = script.get('title', 'Untitled Script')[:100]
+        game = script.get('game', {}).get('name', 'Unknown Game')
+        views = script.get('views', 0)
+        verified = "✅" if script.get('isVerified') else "❌"
+        
+        script_info = f"**Game:** {game}\n**Views:** {views:,}\n**Verified:** {verified}"
+        embed.add_field(name=f"{i}. {title}", value=script_info, inline=False)
+    
+    view = discord.ui.View(timeout=None)
+    view.add_item(ScriptPageButton(query, max(0, page - 1), '◀️ Previous', discord.ButtonStyle.secondary, disabled=page == 0))
+    view.add_item(ScriptPageButton(query, page + 1, 'Next ▶️', discord.ButtonStyle.primary, disabled=not has_next))
+    # The buttons are dispatched through the registered dynamic item, so the view itself
+    # never needs to be tracked per message; stopping it keeps it out of the view store.
+    view.stop()
+    return embed, view
+
+async def send_script_results(interaction, query, page=0):
+    embed, view = await build_script_page(query, page, interaction_expires_at(interaction))
+    
+    if embed is None:
+        embed = discord.Embed(title="📄 No More Results", description="You've reached the end of the search results.", color=0x808080)
+        await reply(interaction, embed=embed)
+        return
+    
+    await reply(interaction, embed=embed, view=view)
+
+class ScriptPageButton(discord.ui.DynamicItem[discord.ui.Button], template=r'scripts:(?P<page>[0-9]+):(?P<query>.*)'):
+    # All paging state lives in the custom_id, so buttons survive restarts and hold no result data
+    def __init__(self, query, page, label='Next ▶️', style=discord.ButtonStyle.primary, disabled=False):
+        super().__init__(
+            discord.ui.Button(label=label, style=style, disabled=disabled, custom_id=f"scripts:{page}:{query}")
+        )
+        self.query = query
+        self.page = page
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match['query'], int(match['page']))
+    
+    async def callback(self, interaction: discord.Interaction):
+        # Page turns can hit ScriptBlox too, so they share /search-scripts' rate limits
+        limited = rate_limiter.acquire("search-scripts", interaction.user.id, interaction.guild_id)
+        if limited is not None:
+            await reply(interaction, f"❌ Command is on cooldown. Try again in {limited[2]:.2f} seconds.", ephemeral=True)
+            return
+        
+        await defer(interaction)
+        try:
+            embed, view = await build_script_page(self.query, self.page, interaction_expires_at(interaction))
+        except ScriptBloxError:
+            embed = discord.Embed(title="❌ Error", description="Failed to fetch scripts from ScriptBlox API", color=0xff0000)
+            await reply(interaction, embed=embed, ephemeral=True)
+            return
+        
+        if embed is None:
+            embed = discord.Embed(title="📄 No More Results", description="You've reached the end of the search results.", color=0x808080)
+            await reply(interaction, embed=embed, ephemeral=True)
+            return
+        
+        await interaction.edit_original_response(embed=embed, view=view)
+
+
+class Scripts(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        self.bot.add_dynamic_items(ScriptPageButton)
+
+    async def cog_unload(self):
+        # A reload registers the new module's class, so the old one has to go first
+        self.bot.remove_dynamic_items(ScriptPageButton)
+
+    # Search scripts command
+    @app_commands.command(name="search-scripts", description="Search for scripts on ScriptBlox")
+    @app_commands.describe(query="Search query for scripts")
+    async def search_scripts(self, interaction: discord.Interaction, query: str):
+        await defer(interaction)
+
+        try:
+            query = normalize_query(query)
+            result = await search_scripts_cached(query, deadline=interaction_expires_at(interaction))
+            if not result["scripts"]:
+                embed = discord.Embed(title="🔍 Script Search", description=f"No scripts found for: **{query}**", color=0xff0000)
+                await reply(interaction, embed=embed)
+                return
+
+            await send_script_results(interaction, query, 0)
+
+        except ScriptBloxError:
+            embed = discord.Embed(title="❌ Error", description="Failed to fetch scripts from ScriptBlox API", color=0xff0000)
+            await reply(interaction, embed=embed)
+        except Exception as e:
+            embed = discord.Embed(title="❌ Error", description=f"An error occurred: {str(e)}", color=0xff0000)
+            await reply(interaction, embed=embed)
+
+    @search_scripts.autocomplete("query")
+    async def search_scripts_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [app_commands.Choice(name=term, value=term) for term in script_index.suggest(current)]
+
+
+async def setup(bot):
+    await bot.add_cog(Scripts(bot))
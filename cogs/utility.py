@@ -0,0 +1,143 @@
+# Utility commands: /help, /invite, /ping and /uptime.
+import datetime
+import math
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from main import (
+    bot_start_time,
+    fetch_cluster_status,
+    reply,
+)
+
+def format_uptime(uptime_delta):
+    days = uptime_delta.days
+    hours, remainder = divmod(uptime_delta.seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    
+    uptime_str = ""
+    if days > 0:
+        uptime_str += f"{days}d "
+    if hours > 0:
+        uptime_str += f"{hours}h "
+    if minutes > 0:
+        uptime_str += f"{minutes}m "
+    uptime_str += f"{seconds}s"
+    return uptime_str
+
+
+class Utility(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # Help command
+    @app_commands.command(name="help", description="Show all available commands")
+    async def help_command(self, interaction: discord.Interaction):
+        embed = discord.Embed(title="🤖 Bot Commands", description="Here are all available moderation commands:", color=0x0099ff)
+
+        embed.add_field(
+            name="🔨 Moderation Commands",
+            value="`/kick` - Kick a member\n`/ban` - Ban a member\n`/warn` - Warn a member\n`/timeout` - Timeout a member\n`/temprole` - Give a role for a limited time\n`/clear` - Clear messages\n`/massban` `/masskick` `/masstimeout` - Act on many members at once",
+            inline=False
+        )
+
+        embed.add_field(
+            name="🔒 Channel Management",
+            value="`/lock` - Lock a channel\n`/unlock` - Unlock a channel\n`/lockdown` `/unlockdown` - Lock or restore every channel",
+            inline=False
+        )
+
+        embed.add_field(
+            name="📊 Information Commands",
+            value="`/userinfo` - Get user information\n`/serverinfo` - Get server information\n`/warnings` - Check member warnings\n`/stats` - Bot statistics",
+            inline=False
+        )
+
+        embed.add_field(
+            name="💤 Utility Commands",
+            value="`/afk` - Set AFK status\n`/search-scripts` - Search ScriptBlox scripts\n`/invite` - Get bot invite link\n`/ping` - Check bot latency\n`/uptime` - Check bot uptime\n`/help` - Show this help menu\n`/reload` `/debug` - Reload modules and diagnose slowdowns (bot owner)",
+            inline=False
+        )
+
+        embed.set_footer(text="Use these commands responsibly!")
+        await reply(interaction, embed=embed)
+
+    # Invite command
+    @app_commands.command(name="invite", description="Get the bot invite link")
+    async def invite(self, interaction: discord.Interaction):
+        permissions = discord.Permissions(
+            kick_members=True,
+            ban_members=True,
+            manage_messages=True,
+            manage_channels=True,
+            moderate_members=True,
+            read_messages=True,
+            send_messages=True,
+            embed_links=True,
+            read_message_history=True
+        )
+
+        invite_url = discord.utils.oauth_url(self.bot.user.id, permissions=permissions)
+
+        embed = discord.Embed(title="🤖 Invite Bot", color=0x0099ff)
+        embed.add_field(name="Invite Link", value=f"[Click here to invite me!]({invite_url})", inline=False)
+        embed.add_field(name="Permissions Needed", value="• Kick Members\n• Ban Members\n• Manage Messages\n• Manage Channels\n• Moderate Members\n• Send Messages & Embeds", inline=False)
+        embed.set_footer(text="Thank you for using our bot!")
+
+        await reply(interaction, embed=embed)
+
+    # Ping command
+    @app_commands.command(name="ping", description="Check bot latency")
+    async def ping(self, interaction: discord.Interaction):
+        latency = self.bot.latency * 1000
+
+        # Determine latency status
+        if math.isnan(latency):
+            status = "⚪ No gateway (HTTP mode)"
+            color = 0x808080
+        elif latency < 100:
+            status = "🟢 Excellent"
+            color = 0x00ff00
+        elif latency < 200:
+            status = "🟡 Good"
+            color = 0xffff00
+        elif latency < 300:
+            status = "🟠 Fair"
+            color = 0xff8000
+        else:
+            status = "🔴 Poor"
+            color = 0xff0000
+
+        embed = discord.Embed(title="🏓 Pong!", color=color)
+        embed.add_field(name="Bot Latency", value="n/a" if math.isnan(latency) else f"{round(latency)}ms", inline=True)
+        embed.add_field(name="Status", value=status, inline=True)
+        cluster = await fetch_cluster_status()
+        if cluster and cluster["latency"] is not None:
+            embed.add_field(name="Cluster Latency", value=f"{round(cluster['latency'] * 1000)}ms avg", inline=True)
+        embed.set_footer(text="Response time to Discord API")
+
+        await reply(interaction, embed=embed)
+
+    # Uptime command
+    @app_commands.command(name="uptime", description="Check bot uptime")
+    async def uptime(self, interaction: discord.Interaction):
+        current_time = datetime.datetime.now()
+        uptime_str = format_uptime(current_time - bot_start_time)
+
+        embed = discord.Embed(title="⏰ Bot Uptime", color=0x00ff00)
+        embed.add_field(name="Current Uptime", value=uptime_str, inline=False)
+        embed.add_field(name="Started At", value=bot_start_time.strftime("%B %d, %Y at %H:%M:%S UTC"), inline=False)
+        cluster = await fetch_cluster_status()
+        if cluster:
+            cluster_started = datetime.datetime.fromtimestamp(cluster["started_at"])
+            embed.add_field(name="Cluster Uptime", value=format_uptime(current_time - cluster_started), inline=False)
+        embed.add_field(name="Status", value="🟢 Online & Running", inline=False)
+        embed.set_footer(text="Bot has been running continuously")
+
+        await reply(interaction, embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(Utility(bot))
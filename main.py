@@ -2,11 +2,470 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+import abc
 import asyncio
 import datetime
 import json
 import os
+import sys
+import math
+import argparse
+import bisect
+import hashlib
+import logging
+import functools
+import heapq
+import itertools
+import sqlite3
+import time
+import collections
+import concurrent.futures
 import aiohttp
+import yarl
+from aiohttp import web
+
+try:
+    # Optional: only the HTTP interactions endpoint needs it (pip install pynacl)
+    import nacl.exceptions
+    import nacl.signing
+except ImportError:
+    nacl = None
+
+PROCESS_START = time.perf_counter()
+
+# Run as a script this module is __main__, while the cogs import it as "main"; alias it so they
+# share this module's state instead of executing the file a second time.
+sys.modules.setdefault("main", sys.modules[__name__])
+
+# Configuration
+# Every setting is read from the environment first, then from the JSON object in BOT_CONFIG
+# (default config.json, optional), then falls back to the default given in code. Cluster
+# plumbing (CLUSTER_ID, SHARD_IDS, ...) is set by the launcher and only read from the environment.
+CONFIG_FILE = os.getenv("BOT_CONFIG", "config.json")
+
+def load_config_file(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+config = load_config_file(CONFIG_FILE)
+
+def setting(name, default=None):
+    value = os.environ.get(name)
+    if value is not None:
+        return value
+    return config.get(name, default)
+
+# Metrics
+# Latency histograms keep Prometheus-style cumulative buckets plus a window of recent samples
+# for exact p50/p99 in /stats.
+class Histogram:
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, window=1024):
+        self.bucket_counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = collections.deque(maxlen=window)
+
+    def observe(self, value):
+        self.bucket_counts[bisect.bisect_left(self.BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantile(self, q):
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Metrics:
+    def __init__(self):
+        self.command_latency = collections.defaultdict(Histogram)
+        self.command_errors = collections.Counter()
+        self.all_commands = Histogram()
+        self.event_latency = collections.defaultdict(Histogram)
+        self.event_errors = collections.Counter()
+        self.loop_lag = Histogram()
+        self.http_responses = collections.Counter()  # status code -> count
+        self.rate_limits = collections.Counter()  # "http" / "gateway" -> count
+        self.interaction_deadlines = collections.Counter()  # "auto_deferred" / "missed" -> count
+        self.slow_callbacks = collections.Counter()  # handler name -> callbacks over the threshold
+        self.http_interactions = collections.Counter()  # "accepted" / "ping" / "rejected" -> count
+        self.spam_detections = collections.Counter()  # spam or raid check -> times it fired
+        self.gauges = {}  # metric name -> callable returning a number or {labels: number}
+
+    def observe_command(self, name, elapsed, failed=False):
+        self.command_latency[name].observe(elapsed)
+        self.all_commands.observe(elapsed)
+        if failed:
+            self.command_errors[name] += 1
+
+    def observe_event(self, name, elapsed, failed=False):
+        self.event_latency[name].observe(elapsed)
+        if failed:
+            self.event_errors[name] += 1
+
+    def http_trace_config(self):
+        async def on_request_end(session, context, params):
+            status = params.response.status
+            self.http_responses[status] += 1
+            if status == 429:
+                self.rate_limits["http"] += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
+
+    @staticmethod
+    def _render_histogram(lines, name, label, histograms):
+        lines.append(f"# TYPE {name} histogram")
+        for key, histogram in sorted(histograms.items()):
+            labels = f'{label}="{key}",' if label else ""
+            cumulative = 0
+            for bound, count in zip(Histogram.BUCKETS + ("+Inf",), histogram.bucket_counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels}le="{bound}"}} {cumulative}')
+            labels = f"{{{labels.rstrip(',')}}}" if labels else ""
+            lines.append(f"{name}_sum{labels} {histogram.sum}")
+            lines.append(f"{name}_count{labels} {histogram.count}")
+
+    @staticmethod
+    def _render_counter(lines, name, label, counter):
+        lines.append(f"# TYPE {name} counter")
+        for key, value in sorted(counter.items(), key=lambda item: str(item[0])):
+            lines.append(f'{name}{{{label}="{key}"}} {value}')
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        self._render_histogram(lines, "bot_command_latency_seconds", "command", self.command_latency)
+        self._render_counter(lines, "bot_command_errors_total", "command", self.command_errors)
+        self._render_histogram(lines, "bot_event_latency_seconds", "event", self.event_latency)
+        self._render_counter(lines, "bot_event_errors_total", "event", self.event_errors)
+        self._render_histogram(lines, "bot_event_loop_lag_seconds", None, {"": self.loop_lag})
+        self._render_counter(lines, "bot_http_responses_total", "status", self.http_responses)
+        self._render_counter(lines, "bot_rate_limits_total", "source", self.rate_limits)
+        self._render_counter(lines, "bot_interaction_deadline_total", "outcome", self.interaction_deadlines)
+        self._render_counter(lines, "bot_slow_callbacks_total", "handler", self.slow_callbacks)
+        self._render_counter(lines, "bot_http_interactions_total", "outcome", self.http_interactions)
+        self._render_counter(lines, "bot_spam_detections_total", "check", self.spam_detections)
+        for name, read in sorted(self.gauges.items()):
+            value = read()
+            lines.append(f"# TYPE {name} gauge")
+            if isinstance(value, dict):
+                for label, item in sorted(value.items()):
+                    lines.append(f'{name}{{key="{label}"}} {item}')
+            else:
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+# discord.py logs gateway rate limits rather than raising an event, so count them from the logs
+class RateLimitLogCounter(logging.Handler):
+    def emit(self, record):
+        message = record.getMessage().lower()
+        if "rate limit" in message or "ratelimit" in message:
+            metrics.rate_limits["gateway" if record.name.startswith("discord.gateway") else "http_logged"] += 1
+
+for _logger_name in ("discord.gateway", "discord.http"):
+    logging.getLogger(_logger_name).addHandler(RateLimitLogCounter(logging.WARNING))
+
+def instrument_event(coro):
+    @functools.wraps(coro)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        failed = False
+        try:
+            return await coro(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            metrics.observe_event(coro.__name__, time.perf_counter() - started, failed)
+    return wrapper
+
+async def sample_loop_lag(interval=0.5):
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        metrics.loop_lag.observe(max(0.0, loop.time() - started - interval))
+
+async def start_metrics_server():
+    """Serve /metrics on METRICS_HOST:METRICS_PORT; METRICS_PORT=0 turns it off."""
+    port = int(setting("METRICS_PORT", "9091"))
+    if not port:
+        return None
+    port += CLUSTER_ID  # one port per cluster worker
+    
+    async def handle_metrics(request):
+        return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
+    
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, setting("METRICS_HOST", "127.0.0.1"), port).start()
+    print(f"Metrics available on port {port}")
+    return runner
+
+# Slow callback detector
+# While enabled, every event loop callback is timed, and any that holds the loop for longer
+# than the threshold is logged with the bot function it ran in (or was suspended in when the
+# step finished). asyncio's own detector needs debug mode, which slows the whole loop, so this
+# swaps in a timed Handle._run instead and restores the original when disabled: off, it costs
+# nothing. SLOW_CALLBACK_MS turns it on at startup.
+BOT_SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def code_name(code):
+    # co_qualname only exists on Python 3.11+
+    return getattr(code, "co_qualname", code.co_name)
+
+def describe_callback(handle):
+    callback = handle._callback
+    task = getattr(callback, "__self__", None)
+    if not isinstance(task, asyncio.Task):
+        code = getattr(callback, "__code__", None)
+        if code is not None and code.co_filename.startswith(BOT_SOURCE_DIR):
+            return code_name(code), f"{os.path.relpath(code.co_filename, BOT_SOURCE_DIR)}:{code.co_firstlineno}"
+        return getattr(callback, "__qualname__", repr(callback)), None
+    # Walk the task's await chain to the innermost frame of the bot's own code. A task that
+    # finished in this step has no frames left; discord.py names event tasks after the event.
+    coro = task.get_coro()
+    name, where = task.get_name(), None
+    if name.startswith("Task-"):
+        name = getattr(coro, "__qualname__", name)
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is not None and frame.f_code.co_filename.startswith(BOT_SOURCE_DIR):
+            name, where = code_name(frame.f_code), f"{os.path.relpath(frame.f_code.co_filename, BOT_SOURCE_DIR)}:{frame.f_lineno}"
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return name, where
+
+class SlowCallbackDetector:
+    def __init__(self, threshold=0.1, history=100):
+        self.threshold = threshold
+        self.counts = collections.Counter()  # handler name -> slow callbacks
+        self.recent = collections.deque(maxlen=history)  # (epoch, seconds, name, where)
+        self._original_run = None
+
+    @property
+    def enabled(self):
+        return self._original_run is not None
+
+    def enable(self, threshold=None):
+        if threshold is not None:
+            self.threshold = threshold
+        if self.enabled:
+            return
+        original_run = self._original_run = asyncio.events.Handle._run
+        detector = self
+
+        def timed_run(handle):
+            started = time.perf_counter()
+            try:
+                return original_run(handle)
+            finally:
+                elapsed = time.perf_counter() - started
+                if elapsed >= detector.threshold:
+                    detector.report(handle, elapsed)
+
+        asyncio.events.Handle._run = timed_run
+
+    def disable(self):
+        if self.enabled:
+            asyncio.events.Handle._run = self._original_run
+            self._original_run = None
+
+    def report(self, handle, elapsed):
+        name, where = describe_callback(handle)
+        self.counts[name] += 1
+        metrics.slow_callbacks[name] += 1
+        self.recent.append((time.time(), elapsed, name, where))
+        print(f"Slow callback: {name}{f' ({where})' if where else ''} held the event loop for {elapsed * 1000:.0f}ms")
+
+
+SLOW_CALLBACK_MS = float(setting("SLOW_CALLBACK_MS", "0"))  # 0 leaves it off until /debug slow-callbacks
+slow_callbacks = SlowCallbackDetector(threshold=(SLOW_CALLBACK_MS or 100) / 1000)
+
+# Only one profile can run at a time; cProfile and the stack sampler would skew each other
+profile_lock = asyncio.Lock()
+
+# Local stand-ins (see benchmarks/fake_discord.py) can replace Discord's REST API and gateway
+if setting("DISCORD_API_BASE"):
+    discord.http.Route.BASE = setting("DISCORD_API_BASE")
+if setting("DISCORD_GATEWAY_URL"):
+    discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(setting("DISCORD_GATEWAY_URL"))
+
+# Sharding
+# In cluster mode the launcher starts one worker process per shard range and passes it
+# CLUSTER_ID, SHARD_IDS, SHARD_COUNT and CLUSTER_IPC_URL. A guild's events and interactions
+# always arrive on the shard that owns it, so per-guild state such as the AFK registry stays
+# local to one worker; warnings and counters live in the shared SQLite database.
+CLUSTER_ID = int(os.getenv("CLUSTER_ID", "0"))
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv("SHARD_IDS", "").split(",") if shard_id.strip()] or None
+SHARD_COUNT = int(os.getenv("SHARD_COUNT")) if os.getenv("SHARD_COUNT") else None
+CLUSTER_IPC_URL = os.getenv("CLUSTER_IPC_URL")
+CLUSTER_HEARTBEAT_INTERVAL = 5.0
+
+def owns_guild(guild_id):
+    """Whether this process runs the shard that receives `guild_id`'s events."""
+    if guild_id is None or SHARD_IDS is None:
+        return True
+    return (guild_id >> 22) % SHARD_COUNT in SHARD_IDS
+
+# Command rate limits
+# Token buckets per user, per guild and globally, configured per command as {scope: [rate, per]}
+# ("*" covers commands without an entry). COMMAND_RATE_LIMITS (JSON) overrides entries. A bucket
+# is only a (tokens, updated_at) tuple, and buckets that have refilled completely are the same
+# as no bucket, so they are swept periodically.
+DEFAULT_COMMAND_RATE_LIMITS = {
+    "*": {"user": [10, 10]},
+    "search-scripts": {"user": [3, 10], "guild": [10, 10], "global": [30, 10]},
+    "clear": {"user": [2, 30], "guild": [4, 30]},
+    "serverinfo": {"user": [3, 10], "guild": [10, 10]},
+    "massban": {"guild": [2, 60]},
+    "masskick": {"guild": [2, 60]},
+    "masstimeout": {"guild": [2, 60]},
+    "lockdown": {"guild": [2, 60]},
+    "unlockdown": {"guild": [2, 60]},
+}
+
+class CommandRateLimiter:
+    def __init__(self, limits, gc_interval=60):
+        self.limits = limits
+        self.gc_interval = gc_interval
+        self._buckets = {}  # (command, scope, scope_id) -> (tokens, updated_at)
+        self._last_gc = time.monotonic()
+        self.rejections = collections.Counter()  # (command, scope) -> count
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def limits_for(self, command):
+        return self.limits.get(command, self.limits.get("*", {}))
+
+    def acquire(self, command, user_id, guild_id=None):
+        """Take a token from each of the command's buckets.
+
+        Returns None if the call is allowed, otherwise (scope, (rate, per), retry_after) for the
+        bucket that stays empty longest. Nothing is consumed from any bucket on a rejection.
+        """
+        now = time.monotonic()
+        if now - self._last_gc >= self.gc_interval:
+            self.collect(now)
+        scope_ids = {"user": user_id, "guild": guild_id, "global": 0}
+        updates = []
+        rejected = None
+        for scope, (rate, per) in self.limits_for(command).items():
+            if scope_ids.get(scope) is None:
+                continue
+            key = (command, scope, scope_ids[scope])
+            tokens, updated_at = self._buckets.get(key, (rate, now))
+            tokens = min(rate, tokens + (now - updated_at) * rate / per)
+            if tokens < 1:
+                retry_after = (1 - tokens) * per / rate
+                if rejected is None or retry_after > rejected[2]:
+                    rejected = (scope, (rate, per), retry_after)
+            updates.append((key, tokens))
+        if rejected is not None:
+            self.rejections[(command, rejected[0])] += 1
+            return rejected
+        for key, tokens in updates:
+            self._buckets[key] = (tokens - 1, now)
+        return None
+
+    def collect(self, now=None):
+        """Drop buckets that have refilled to capacity."""
+        now = time.monotonic() if now is None else now
+        self._last_gc = now
+        for key, (tokens, updated_at) in list(self._buckets.items()):
+            limit = self.limits_for(key[0]).get(key[1])
+            if limit is None or tokens + (now - updated_at) * limit[0] / limit[1] >= limit[0]:
+                del self._buckets[key]
+
+    def stats(self):
+        return {f"{command}/{scope}": count for (command, scope), count in self.rejections.items()}
+
+
+_rate_limit_overrides = setting("COMMAND_RATE_LIMITS", {})
+if isinstance(_rate_limit_overrides, str):
+    _rate_limit_overrides = json.loads(_rate_limit_overrides)  # JSON when set in the environment
+rate_limiter = CommandRateLimiter(dict(DEFAULT_COMMAND_RATE_LIMITS, **_rate_limit_overrides))
+
+# Interaction responses
+# Commands answer through reply(), which sends the interaction response or, once it has been
+# answered or deferred, a followup. A timer armed in interaction_check defers any command that
+# hasn't responded within AUTO_DEFER_AFTER seconds, inside Discord's 3 second window, and a
+# per-interaction lock stops the timer and a reply from both trying to answer. Commands that
+# answer privately declare extras={"ephemeral": True} so the timer defers them privately too;
+# a public "thinking..." message would make their later edit_original_response calls public.
+INTERACTION_DEADLINE = 3.0
+AUTO_DEFER_AFTER = float(setting("AUTO_DEFER_AFTER", "2.0"))
+INTERACTION_TOKEN_TTL = 15 * 60  # seconds followups and edits are accepted for
+
+def interaction_expires_at(interaction):
+    """Epoch seconds at which the interaction's token stops accepting followups and edits."""
+    return interaction.created_at.timestamp() + INTERACTION_TOKEN_TTL
+
+def _response_lock(interaction):
+    lock = interaction.extras.get("response_lock")
+    if lock is None:
+        lock = interaction.extras["response_lock"] = asyncio.Lock()
+    return lock
+
+def _check_deadline(interaction):
+    started_at = interaction.extras.get("started_at")
+    if started_at is not None and time.perf_counter() - started_at > INTERACTION_DEADLINE:
+        metrics.interaction_deadlines["missed"] += 1
+
+async def reply(interaction, content=None, **kwargs):
+    """Respond to the interaction, or send a followup if it was already answered or deferred."""
+    async with _response_lock(interaction):
+        if not interaction.response.is_done():
+            _check_deadline(interaction)
+            return await interaction.response.send_message(content, **kwargs)
+        if interaction.extras.pop("auto_deferred", False) and kwargs.get("ephemeral"):
+            # The first followup would replace the public "thinking..." message and ignore
+            # the ephemeral flag, so remove that message first
+            await interaction.delete_original_response()
+    return await interaction.followup.send(content, **kwargs)
+
+async def defer(interaction, ephemeral=False):
+    """Acknowledge the interaction now, unless it already has been."""
+    async with _response_lock(interaction):
+        if not interaction.response.is_done():
+            _check_deadline(interaction)
+            await interaction.response.defer(ephemeral=ephemeral)
+
+async def _auto_defer(interaction):
+    await asyncio.sleep(AUTO_DEFER_AFTER)
+    async with _response_lock(interaction):
+        if interaction.response.is_done():
+            return
+        ephemeral = interaction.command.extras.get("ephemeral", False)
+        try:
+            await interaction.response.defer(ephemeral=ephemeral)
+            interaction.extras["auto_deferred"] = not ephemeral
+            metrics.interaction_deadlines["auto_deferred"] += 1
+        except discord.HTTPException as e:
+            metrics.interaction_deadlines["missed"] += 1
+            print(f"Failed to auto-defer /{interaction.command.qualified_name}: {e}")
+
+def arm_auto_defer(interaction):
+    interaction.extras["auto_defer"] = asyncio.create_task(_auto_defer(interaction))
+
+def disarm_auto_defer(interaction):
+    task = interaction.extras.pop("auto_defer", None)
+    if task is not None:
+        task.cancel()
 
 # Bot setup
 intents = discord.Intents.default()
@@ -14,608 +473,1935 @@ intents.message_content = True
 intents.members = True
 intents.guilds = True
 
-bot = commands.Bot(command_prefix='!', intents=intents)
+# Member cache profile
+# "full" (default) chunks every guild at startup and caches all members. "lean" skips chunking
+# and caches no members beyond the bot itself: commands get members from the interaction
+# payload, and anything else goes through get_member() and its small LRU.
+LEAN_MEMBER_CACHE = setting("BOT_MEMBER_CACHE", "full").lower() == "lean"
+
+class ModCommandTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction):
+        interaction.extras["started_at"] = time.perf_counter()
+        if interaction.type is discord.InteractionType.application_command and interaction.command is not None:
+            limited = rate_limiter.acquire(interaction.command.qualified_name, interaction.user.id, interaction.guild_id)
+            if limited is not None:
+                _, (rate, per), retry_after = limited
+                raise app_commands.CommandOnCooldown(app_commands.Cooldown(rate, per), retry_after)
+            arm_auto_defer(interaction)
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        disarm_auto_defer(interaction)
+        started_at = interaction.extras.get("started_at")
+        # Rate-limit rejections are counted by the limiter, not as command failures
+        if started_at is not None and interaction.command is not None and not isinstance(error, app_commands.CommandOnCooldown):
+            metrics.observe_command(interaction.command.qualified_name, time.perf_counter() - started_at, failed=True)
+        self.client.dispatch("app_command_error", interaction, error)
+
+class ModBot(commands.AutoShardedBot):
+    def event(self, coro):
+        # Every @bot.event handler is timed for the metrics endpoint
+        return super().event(instrument_event(coro))
+
+    async def before_identify_hook(self, shard_id, *, initial=False):
+        # Identifies are rate limited per bot, so cluster workers queue them through the launcher
+        if CLUSTER_IPC_URL:
+            await wait_for_identify_slot(shard_id)
+        else:
+            await super().before_identify_hook(shard_id, initial=initial)
+
+    async def setup_hook(self):
+        await http_client.start()
+        await bot_store.open()
+        await guild_counters.rebuild()
+        notification_sender.start()
+        await dm_dispatcher.start()
+        await scheduler.start()
+        await sync_afk()
+        if WARNING_DECAY_DAYS:
+            await expire_warnings()
+        if SLOW_CALLBACK_MS:
+            slow_callbacks.enable()
+        self.loop_lag_task = asyncio.create_task(sample_loop_lag())
+        self.metrics_runner = await start_metrics_server()
+        if CLUSTER_IPC_URL:
+            self.heartbeat_task = asyncio.create_task(send_cluster_heartbeats())
+        await load_extensions(self)
+        if CLUSTER_ID == 0:
+            await sync_command_tree(self.tree)
+        startup_timings["setup"] = time.perf_counter() - PROCESS_START
+        print(f"Setup finished in {startup_timings['setup']:.2f}s")
 
-# Store for temporary data (in production, use a database)
-warned_users = {}
-muted_users = {}
+    async def close(self):
+        # Disconnect first, so no event handler is still writing when the store closes
+        await super().close()
+        if getattr(self, "metrics_runner", None) is not None:
+            await self.metrics_runner.cleanup()
+        for task_name in ("loop_lag_task", "heartbeat_task"):
+            if getattr(self, task_name, None) is not None:
+                getattr(self, task_name).cancel()
+        await notification_sender.close()
+        await dm_dispatcher.close()
+        await scheduler.close()
+        await bot_store.close()
+        await http_client.close()
+        slow_callbacks.disable()
+
+bot = ModBot(
+    command_prefix='!',
+    intents=intents,
+    tree_cls=ModCommandTree,
+    http_trace=metrics.http_trace_config(),
+    shard_ids=SHARD_IDS,
+    shard_count=SHARD_COUNT,
+    chunk_guilds_at_startup=not LEAN_MEMBER_CACHE,
+    member_cache_flags=discord.MemberCacheFlags.none() if LEAN_MEMBER_CACHE else discord.MemberCacheFlags.from_intents(intents)
+)
 
 @bot.event
-async def on_ready():
-    print(f'{bot.user} has connected to Discord!')
-    try:
-        synced = await bot.tree.sync()
-        print(f"Synced {len(synced)} command(s)")
-    except Exception as e:
-        print(f"Failed to sync commands: {e}")
+async def on_app_command_completion(interaction: discord.Interaction, command):
+    disarm_auto_defer(interaction)
+    started_at = interaction.extras.get("started_at")
+    if started_at is not None:
+        metrics.observe_command(command.qualified_name, time.perf_counter() - started_at)
+
+# Bot storage
+# Everything the bot persists goes through one BotStore: warnings, the per-guild moderation
+# counters behind /stats, pending moderation DMs, scheduler jobs, lockdown overwrite snapshots
+# and AFK statuses. Any backend implementing it can be plugged in; SQLite (WAL) is the default.
+# Warnings are returned as dicts with "id", "reason", "moderator" and "timestamp" (UTC epoch seconds).
+class BotStore(abc.ABC):
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abc.abstractmethod
+    async def add_warning(self, guild_id, user_id, reason, moderator, timestamp=None):
+        ...
+
+    @abc.abstractmethod
+    async def count_warnings(self, guild_id, user_id):
+        ...
+
+    @abc.abstractmethod
+    async def count_guild_warnings(self, guild_id):
+        ...
+
+    @abc.abstractmethod
+    async def list_warnings(self, guild_id, user_id, limit=10, before=None):
+        """Return up to `limit` warnings older than the `before` cursor, newest first.
+
+        A cursor is the (timestamp, id) pair of the last warning on the previous page.
+        """
+
+    @abc.abstractmethod
+    async def add_to_counter(self, guild_id, name, amount=1):
+        ...
+
+    @abc.abstractmethod
+    async def load_counters(self):
+        """Return {guild_id: {counter_name: value}}, including a "warnings" count per guild."""
+
+    @abc.abstractmethod
+    async def load_guild_counters(self, guild_id):
+        """Return one guild's {counter_name: value}, including "warnings" and "afk" counts."""
+
+    @abc.abstractmethod
+    async def add_dm_notice(self, key, cluster_id, user_id, payload, created_at):
+        ...
+
+    @abc.abstractmethod
+    async def remove_dm_notice(self, key):
+        ...
+
+    @abc.abstractmethod
+    async def load_dm_notices(self, cluster_id, since, limit):
+        """Return this cluster's undelivered DM notices created after `since`, oldest first.
+
+        Older notices are discarded.
+        """
+
+    @abc.abstractmethod
+    async def expire_warnings(self, before, shard_ids=None, shard_count=None):
+        """Delete warnings older than `before`, optionally only in guilds on the given shards.
+
+        Returns ({guild_id: removed}, timestamp of the oldest remaining warning or None).
+        """
+
+    @abc.abstractmethod
+    async def save_job(self, key, kind, guild_id, due, data):
+        ...
+
+    @abc.abstractmethod
+    async def delete_job(self, key):
+        ...
+
+    @abc.abstractmethod
+    async def load_jobs(self):
+        """Return every persisted scheduler job as a dict."""
+
+    @abc.abstractmethod
+    async def save_overwrites(self, guild_id, snapshots):
+        """Record (channel_id, allow, deny) @everyone overwrites, keeping any already recorded.
+
+        allow and deny are None when the channel had no overwrite.
+        """
+
+    @abc.abstractmethod
+    async def load_overwrites(self, guild_id, channel_id=None):
+        """Return {channel_id: (allow, deny)} for the guild, or only for `channel_id`."""
+
+    @abc.abstractmethod
+    async def delete_overwrites(self, guild_id, channel_ids):
+        ...
+
+    @abc.abstractmethod
+    async def set_afk(self, guild_id, user_id, reason, since):
+        ...
+
+    @abc.abstractmethod
+    async def delete_afk(self, guild_id, user_id):
+        ...
+
+    @abc.abstractmethod
+    async def load_afk(self, since=0.0):
+        """Return AFK statuses set after `since` (epoch seconds) as dicts."""
+
+
+class SQLiteBotStore(BotStore):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS warnings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            reason TEXT NOT NULL,
+            moderator TEXT NOT NULL,
+            timestamp REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_warnings_guild_user_time
+            ON warnings (guild_id, user_id, timestamp);
+        CREATE TABLE IF NOT EXISTS guild_counters (
+            guild_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            value INTEGER NOT NULL,
+            PRIMARY KEY (guild_id, name)
+        );
+        CREATE TABLE IF NOT EXISTS dm_backlog (
+            key TEXT PRIMARY KEY,
+            cluster_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            payload TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS scheduled_jobs (
+            key TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            guild_id INTEGER,
+            due REAL NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS overwrite_snapshots (
+            guild_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            allow INTEGER,
+            deny INTEGER,
+            PRIMARY KEY (guild_id, channel_id)
+        );
+        CREATE TABLE IF NOT EXISTS afk_statuses (
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            reason TEXT NOT NULL,
+            since REAL NOT NULL,
+            PRIMARY KEY (guild_id, user_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_afk_statuses_since ON afk_statuses (since);
+    """
+    INSERT_WARNING = "INSERT INTO warnings (guild_id, user_id, reason, moderator, timestamp) VALUES (?, ?, ?, ?, ?)"
+    ADD_TO_COUNTER = (
+        "INSERT INTO guild_counters (guild_id, name, value) VALUES (?, ?, ?) "
+        "ON CONFLICT (guild_id, name) DO UPDATE SET value = value + excluded.value"
+    )
+    INSERT_DM_NOTICE = "INSERT OR REPLACE INTO dm_backlog (key, cluster_id, user_id, payload, created_at) VALUES (?, ?, ?, ?, ?)"
+    DELETE_DM_NOTICE = "DELETE FROM dm_backlog WHERE key = ?"
+    SAVE_JOB = "INSERT OR REPLACE INTO scheduled_jobs (key, kind, guild_id, due, data) VALUES (?, ?, ?, ?, ?)"
+    DELETE_JOB = "DELETE FROM scheduled_jobs WHERE key = ?"
+    SAVE_OVERWRITE = "INSERT OR IGNORE INTO overwrite_snapshots (guild_id, channel_id, allow, deny) VALUES (?, ?, ?, ?)"
+    DELETE_OVERWRITE = "DELETE FROM overwrite_snapshots WHERE guild_id = ? AND channel_id = ?"
+    SET_AFK = "INSERT OR REPLACE INTO afk_statuses (guild_id, user_id, reason, since) VALUES (?, ?, ?, ?)"
+    DELETE_AFK = "DELETE FROM afk_statuses WHERE guild_id = ? AND user_id = ?"
+
+    def __init__(self, path, batch_size=100, max_pending=10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._db = None
+        self._queue = None
+        self._writer = None
+        # All SQLite access goes through one thread so the connection is never shared concurrently
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="bot-store")
+        # Warnings queued but not yet committed, so counts stay exact without waiting on disk
+        self._pending_users = collections.Counter()
+        self._pending_guilds = collections.Counter()
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(self.SCHEMA)
+        return db
+
+    async def open(self):
+        if self._db is not None:
+            return
+        self._db = await self._run(self._connect)
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._writer = asyncio.create_task(self._write_loop())
 
-# Kick command
-@bot.tree.command(name="kick", description="Kick a member from the server")
-@app_commands.describe(member="The member to kick", reason="Reason for kicking")
-async def kick(interaction: discord.Interaction, member: discord.Member, reason: str = "No reason provided"):
-    if not interaction.user.guild_permissions.kick_members:
-        await interaction.response.send_message("❌ You don't have permission to kick members!", ephemeral=True)
+    async def close(self):
+        if self._db is None:
+            return
+        await self.flush()
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        await self._run(self._db.close)
+        self._db = None
+        self._executor.shutdown(wait=True)
+
+    async def flush(self):
+        """Wait until every queued write has been committed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    def _write_batch(self, batch):
+        # One transaction per batch, with consecutive writes of the same statement grouped
+        with self._db:
+            start = 0
+            while start < len(batch):
+                statement = batch[start][0]
+                end = start
+                while end < len(batch) and batch[end][0] == statement:
+                    end += 1
+                self._db.executemany(statement, [params for _, params in batch[start:end]])
+                start = end
+
+    async def _write_loop(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._run(self._write_batch, batch)
+            except Exception as e:
+                print(f"Failed to write {len(batch)} queued row(s): {e}")
+            finally:
+                for statement, params in batch:
+                    if statement == self.INSERT_WARNING:
+                        self._pending_users[(params[0], params[1])] -= 1
+                        self._pending_guilds[params[0]] -= 1
+                    self._queue.task_done()
+                self._pending_users += collections.Counter()  # drop zero entries
+                self._pending_guilds += collections.Counter()
+
+    async def add_warning(self, guild_id, user_id, reason, moderator, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        self._pending_users[(guild_id, user_id)] += 1
+        self._pending_guilds[guild_id] += 1
+        await self._queue.put((self.INSERT_WARNING, (guild_id, user_id, reason, moderator, timestamp)))
+
+    def _count(self, query, params):
+        return self._db.execute(query, params).fetchone()[0]
+
+    async def count_warnings(self, guild_id, user_id):
+        stored = await self._run(
+            self._count,
+            "SELECT COUNT(*) FROM warnings WHERE guild_id = ? AND user_id = ?",
+            (guild_id, user_id)
+        )
+        return stored + self._pending_users[(guild_id, user_id)]
+
+    async def count_guild_warnings(self, guild_id):
+        stored = await self._run(self._count, "SELECT COUNT(*) FROM warnings WHERE guild_id = ?", (guild_id,))
+        return stored + self._pending_guilds[guild_id]
+
+    def _select_page(self, guild_id, user_id, limit, before):
+        if before is None:
+            rows = self._db.execute(
+                "SELECT id, reason, moderator, timestamp FROM warnings "
+                "WHERE guild_id = ? AND user_id = ? "
+                "ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (guild_id, user_id, limit)
+            ).fetchall()
+        else:
+            rows = self._db.execute(
+                "SELECT id, reason, moderator, timestamp FROM warnings "
+                "WHERE guild_id = ? AND user_id = ? AND (timestamp, id) < (?, ?) "
+                "ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (guild_id, user_id, before[0], before[1], limit)
+            ).fetchall()
+        return [{"id": r[0], "reason": r[1], "moderator": r[2], "timestamp": r[3]} for r in rows]
+
+    async def list_warnings(self, guild_id, user_id, limit=10, before=None):
+        if self._pending_users[(guild_id, user_id)]:
+            await self.flush()
+        return await self._run(self._select_page, guild_id, user_id, limit, before)
+
+    async def add_to_counter(self, guild_id, name, amount=1):
+        await self._queue.put((self.ADD_TO_COUNTER, (guild_id, name, amount)))
+
+    def _select_counters(self):
+        counters = collections.defaultdict(dict)
+        for guild_id, name, value in self._db.execute("SELECT guild_id, name, value FROM guild_counters"):
+            counters[guild_id][name] = value
+        for guild_id, count in self._db.execute("SELECT guild_id, COUNT(*) FROM warnings GROUP BY guild_id"):
+            counters[guild_id]["warnings"] = count
+        return dict(counters)
+
+    async def load_counters(self):
+        await self.flush()
+        return await self._run(self._select_counters)
+
+    def _select_guild_counters(self, guild_id):
+        counters = dict(self._db.execute("SELECT name, value FROM guild_counters WHERE guild_id = ?", (guild_id,)))
+        counters["warnings"] = self._db.execute("SELECT COUNT(*) FROM warnings WHERE guild_id = ?", (guild_id,)).fetchone()[0]
+        counters["afk"] = self._db.execute("SELECT COUNT(*) FROM afk_statuses WHERE guild_id = ?", (guild_id,)).fetchone()[0]
+        return counters
+
+    async def load_guild_counters(self, guild_id):
+        await self.flush()
+        return await self._run(self._select_guild_counters, guild_id)
+
+    async def add_dm_notice(self, key, cluster_id, user_id, payload, created_at):
+        await self._queue.put((self.INSERT_DM_NOTICE, (key, cluster_id, user_id, json.dumps(payload), created_at)))
+
+    async def remove_dm_notice(self, key):
+        await self._queue.put((self.DELETE_DM_NOTICE, (key,)))
+
+    def _select_dm_notices(self, cluster_id, since, limit):
+        with self._db:
+            self._db.execute("DELETE FROM dm_backlog WHERE cluster_id = ? AND created_at < ?", (cluster_id, since))
+        rows = self._db.execute(
+            "SELECT key, user_id, payload, created_at FROM dm_backlog WHERE cluster_id = ? "
+            "ORDER BY created_at LIMIT ?",
+            (cluster_id, limit)
+        ).fetchall()
+        return [{"key": r[0], "user_id": r[1], "payload": json.loads(r[2]), "created_at": r[3]} for r in rows]
+
+    async def load_dm_notices(self, cluster_id, since, limit):
+        await self.flush()
+        return await self._run(self._select_dm_notices, cluster_id, since, limit)
+
+    def _expire_warnings(self, before, shard_ids, shard_count):
+        where, params = "", ()
+        if shard_ids is not None:
+            where = f" AND ((guild_id >> 22) % ?) IN ({', '.join('?' * len(shard_ids))})"
+            params = (shard_count, *shard_ids)
+        with self._db:
+            removed = dict(self._db.execute(
+                "SELECT guild_id, COUNT(*) FROM warnings WHERE timestamp < ?" + where + " GROUP BY guild_id",
+                (before, *params)
+            ).fetchall())
+            if removed:
+                self._db.execute("DELETE FROM warnings WHERE timestamp < ?" + where, (before, *params))
+        oldest = self._db.execute(
+            "SELECT MIN(timestamp) FROM warnings WHERE 1" + where, params
+        ).fetchone()[0]
+        return removed, oldest
+
+    async def expire_warnings(self, before, shard_ids=None, shard_count=None):
+        await self.flush()
+        return await self._run(self._expire_warnings, before, shard_ids, shard_count)
+
+    async def save_job(self, key, kind, guild_id, due, data):
+        await self._queue.put((self.SAVE_JOB, (key, kind, guild_id, due, json.dumps(data))))
+
+    async def delete_job(self, key):
+        await self._queue.put((self.DELETE_JOB, (key,)))
+
+    def _select_jobs(self):
+        rows = self._db.execute("SELECT key, kind, guild_id, due, data FROM scheduled_jobs").fetchall()
+        return [{"key": r[0], "kind": r[1], "guild_id": r[2], "due": r[3], "data": json.loads(r[4])} for r in rows]
+
+    async def load_jobs(self):
+        await self.flush()
+        return await self._run(self._select_jobs)
+
+    async def save_overwrites(self, guild_id, snapshots):
+        for channel_id, allow, deny in snapshots:
+            await self._queue.put((self.SAVE_OVERWRITE, (guild_id, channel_id, allow, deny)))
+
+    def _select_overwrites(self, guild_id, channel_id):
+        if channel_id is None:
+            rows = self._db.execute(
+                "SELECT channel_id, allow, deny FROM overwrite_snapshots WHERE guild_id = ?", (guild_id,)
+            ).fetchall()
+        else:
+            rows = self._db.execute(
+                "SELECT channel_id, allow, deny FROM overwrite_snapshots WHERE guild_id = ? AND channel_id = ?",
+                (guild_id, channel_id)
+            ).fetchall()
+        return {r[0]: (r[1], r[2]) for r in rows}
+
+    async def load_overwrites(self, guild_id, channel_id=None):
+        await self.flush()
+        return await self._run(self._select_overwrites, guild_id, channel_id)
+
+    async def delete_overwrites(self, guild_id, channel_ids):
+        for channel_id in channel_ids:
+            await self._queue.put((self.DELETE_OVERWRITE, (guild_id, channel_id)))
+
+    async def set_afk(self, guild_id, user_id, reason, since):
+        await self._queue.put((self.SET_AFK, (guild_id, user_id, reason, since)))
+
+    async def delete_afk(self, guild_id, user_id):
+        await self._queue.put((self.DELETE_AFK, (guild_id, user_id)))
+
+    def _select_afk(self, since):
+        rows = self._db.execute(
+            "SELECT guild_id, user_id, reason, since FROM afk_statuses WHERE since > ?", (since,)
+        ).fetchall()
+        return [{"guild_id": r[0], "user_id": r[1], "reason": r[2], "since": r[3]} for r in rows]
+
+    async def load_afk(self, since=0.0):
+        await self.flush()
+        return await self._run(self._select_afk, since)
+
+
+bot_store = SQLiteBotStore(setting("BOT_DATABASE", "bot.db"))
+
+# Per-guild counters
+# Maintained as events happen so /stats and /serverinfo read them in O(1). "warnings" is
+# derived from the warnings table on rebuild; every other counter is persisted as it changes.
+# In HTTP mode (shared set) each replica only sees its own increments, so fetch() reads the
+# totals from the store instead, along with the guild's AFK count.
+class GuildCounters:
+    DERIVED = {"warnings"}
+
+    def __init__(self, store):
+        self.store = store
+        self.shared = False
+        self._counts = collections.defaultdict(collections.Counter)
+
+    def get(self, guild_id, name):
+        counts = self._counts.get(guild_id)
+        return counts[name] if counts else 0
+
+    def snapshot(self, guild_id):
+        return dict(self._counts.get(guild_id, {}))
+
+    async def fetch(self, guild_id):
+        if self.shared:
+            return await self.store.load_guild_counters(guild_id)
+        return self.snapshot(guild_id)
+
+    async def incr(self, guild_id, name, amount=1):
+        if not amount:
+            return
+        self._counts[guild_id][name] += amount
+        if name not in self.DERIVED:
+            await self.store.add_to_counter(guild_id, name, amount)
+
+    async def rebuild(self):
+        self._counts.clear()
+        for guild_id, counts in (await self.store.load_counters()).items():
+            self._counts[guild_id].update(counts)
+
+
+guild_counters = GuildCounters(bot_store)
+
+# Scheduled jobs
+# A single task sleeps until the earliest deadline in a heap instead of polling. Scheduling a
+# key again replaces its deadline (stale heap entries are skipped and compacted away), and
+# persistent jobs are written to the database so they resume after a restart; anything that
+# came due while the bot was down runs as soon as it is ready. With poll_interval set, the
+# database is also re-read that often for jobs other processes (HTTP interaction replicas) saved.
+class Scheduler:
+    def __init__(self, client, store, max_jobs=100000, retry_delay=60, max_attempts=3, poll_interval=0):
+        self.client = client
+        self.store = store
+        self.max_jobs = max_jobs
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.handlers = {}  # kind -> async handler(job)
+        self._jobs = {}  # key -> job
+        self._heap = []  # (due, seq, key)
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.fired = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def __contains__(self, key):
+        return key in self._jobs
+
+    async def start(self):
+        if self._task is not None:
+            return
+        await self._load_jobs()
+        self._task = asyncio.create_task(self._run())
+
+    async def _load_jobs(self):
+        for job in await self.store.load_jobs():
+            if owns_guild(job["guild_id"]) and job["key"] not in self._jobs:
+                self._push(dict(job, persist=True, attempts=0))
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _push(self, job):
+        self._jobs[job["key"]] = job
+        heapq.heappush(self._heap, (job["due"], next(self._seq), job["key"]))
+        if len(self._heap) > 2 * len(self._jobs) + 64:
+            self._heap = [(item["due"], next(self._seq), key) for key, item in self._jobs.items()]
+            heapq.heapify(self._heap)
+        if self._heap[0][2] == job["key"]:
+            self._wakeup.set()
+
+    async def schedule(self, kind, key, due, guild_id=None, data=None, persist=True):
+        """Run `handlers[kind]` at `due` (epoch seconds), replacing any job with the same key.
+
+        Returns False if the scheduler is full.
+        """
+        if key not in self._jobs and len(self._jobs) >= self.max_jobs:
+            self.dropped += 1
+            return False
+        job = {"key": key, "kind": kind, "guild_id": guild_id, "due": due, "data": data or {},
+               "persist": persist, "attempts": 0}
+        if persist:
+            await self.store.save_job(key, kind, guild_id, due, job["data"])
+        self._push(job)
+        return True
+
+    async def cancel(self, key):
+        job = self._jobs.pop(key, None)
+        if job is not None and job["persist"]:
+            await self.store.delete_job(key)
+        return job is not None
+
+    async def _fire(self, job):
+        if job["kind"] not in self.handlers:
+            # Left in the database for a process (or a later version) that can run it
+            print(f"No handler for scheduled {job['kind']} job {job['key']}, leaving it")
+            return
+        try:
+            await self.handlers[job["kind"]](job)
+            self.fired += 1
+        except Exception as e:
+            job["attempts"] += 1
+            if job["attempts"] < self.max_attempts and job["key"] not in self._jobs:
+                print(f"Scheduled {job['kind']} job {job['key']} failed, retrying: {e}")
+                job["due"] = time.time() + self.retry_delay
+                if job["persist"]:
+                    await self.store.save_job(job["key"], job["kind"], job["guild_id"], job["due"], job["data"])
+                self._push(job)
+                return
+            self.failed += 1
+            print(f"Scheduled {job['kind']} job {job['key']} failed: {e}")
+        # A handler may have rescheduled its own key
+        if job["persist"] and job["key"] not in self._jobs:
+            await self.store.delete_job(job["key"])
+
+    async def _run(self):
+        await self.client.wait_until_ready()
+        next_poll = time.monotonic() + self.poll_interval
+        while True:
+            self._wakeup.clear()
+            while self._heap:
+                due, _, key = self._heap[0]
+                job = self._jobs.get(key)
+                if job is None or job["due"] != due:
+                    heapq.heappop(self._heap)
+                    continue
+                if due > time.time():
+                    break
+                heapq.heappop(self._heap)
+                del self._jobs[key]
+                await self._fire(job)
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            if self.poll_interval:
+                until_poll = next_poll - time.monotonic()
+                timeout = until_poll if timeout is None else min(timeout, until_poll)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            if self.poll_interval and time.monotonic() >= next_poll:
+                next_poll = time.monotonic() + self.poll_interval
+                await self._load_jobs()
+
+    def stats(self):
+        return {"scheduled": len(self._jobs), "fired": self.fired, "failed": self.failed, "dropped": self.dropped}
+
+
+scheduler = Scheduler(bot, bot_store, poll_interval=float(setting("SCHEDULER_POLL_SECONDS", "0")))
+
+# Warning decay
+# With WARNING_DECAY_DAYS set, warnings older than that are deleted. A single non-persistent
+# job is kept at the expiry time of the oldest remaining warning on this process's shards.
+# When none are left and SCHEDULER_POLL_SECONDS is set, it checks again that often instead,
+# since warnings given through HTTP interaction replicas only show up in the database.
+WARNING_DECAY_DAYS = float(setting("WARNING_DECAY_DAYS", "0"))
+
+async def expire_warnings(job=None):
+    decay = WARNING_DECAY_DAYS * 86400
+    removed, oldest = await bot_store.expire_warnings(time.time() - decay, SHARD_IDS, SHARD_COUNT)
+    for guild_id, count in removed.items():
+        await guild_counters.incr(guild_id, "warnings", -count)
+    if oldest is not None:
+        await scheduler.schedule("warning_decay", "warning_decay", oldest + decay, persist=False)
+    elif scheduler.poll_interval:
+        await scheduler.schedule("warning_decay", "warning_decay", time.time() + scheduler.poll_interval, persist=False)
+
+async def schedule_warning_decay(timestamp):
+    if WARNING_DECAY_DAYS and "warning_decay" not in scheduler:
+        await scheduler.schedule("warning_decay", "warning_decay", timestamp + WARNING_DECAY_DAYS * 86400, persist=False)
+
+scheduler.handlers["warning_decay"] = expire_warnings
+
+# Expiry of temporary bans and roles
+# Registered here rather than in the moderation cog, which may not be loaded yet (or at all)
+# when its jobs come due.
+async def expire_ban(job):
+    guild = bot.get_guild(job["guild_id"])
+    if guild is None:
         return
-    
     try:
-        await member.kick(reason=reason)
-        embed = discord.Embed(title="Member Kicked", color=0xff6b6b)
-        embed.add_field(name="Member", value=f"{member.mention} ({member})", inline=False)
-        embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
-        embed.add_field(name="Reason", value=reason, inline=False)
-        await interaction.response.send_message(embed=embed)
-    except discord.Forbidden:
-        await interaction.response.send_message("❌ I don't have permission to kick this member!", ephemeral=True)
-    except Exception as e:
-        await interaction.response.send_message(f"❌ An error occurred: {e}", ephemeral=True)
-
-# Ban command
-@bot.tree.command(name="ban", description="Ban a member from the server")
-@app_commands.describe(member="The member to ban", reason="Reason for banning", delete_messages="Days of messages to delete (0-7)")
-async def ban(interaction: discord.Interaction, member: discord.Member, reason: str = "No reason provided", delete_messages: int = 0):
-    if not interaction.user.guild_permissions.ban_members:
-        await interaction.response.send_message("❌ You don't have permission to ban members!", ephemeral=True)
-        return
-    
-    if delete_messages < 0 or delete_messages > 7:
-        await interaction.response.send_message("❌ Delete messages days must be between 0-7!", ephemeral=True)
+        await guild.unban(discord.Object(job["data"]["user_id"]), reason="Temporary ban expired")
+    except discord.NotFound:
+        pass  # Already unbanned
+
+async def expire_role(job):
+    guild = bot.get_guild(job["guild_id"])
+    if guild is None:
         return
-    
     try:
-        await member.ban(reason=reason, delete_message_days=delete_messages)
-        embed = discord.Embed(title="Member Banned", color=0xff0000)
-        embed.add_field(name="Member", value=f"{member.mention} ({member})", inline=False)
-        embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
-        embed.add_field(name="Reason", value=reason, inline=False)
-        await interaction.response.send_message(embed=embed)
-    except discord.Forbidden:
-        await interaction.response.send_message("❌ I don't have permission to ban this member!", ephemeral=True)
-    except Exception as e:
-        await interaction.response.send_message(f"❌ An error occurred: {e}", ephemeral=True)
-
-# Warn command
-@bot.tree.command(name="warn", description="Warn a member")
-@app_commands.describe(member="The member to warn", reason="Reason for warning")
-async def warn(interaction: discord.Interaction, member: discord.Member, reason: str = "No reason provided"):
-    if not interaction.user.guild_permissions.moderate_members:
-        await interaction.response.send_message("❌ You don't have permission to warn members!", ephemeral=True)
-        return
-    
-    user_id = str(member.id)
-    guild_id = str(interaction.guild.id)
-    
-    if guild_id not in warned_users:
-        warned_users[guild_id] = {}
-    if user_id not in warned_users[guild_id]:
-        warned_users[guild_id][user_id] = []
-    
-    warning = {
-        "reason": reason,
-        "moderator": str(interaction.user),
-        "timestamp": datetime.datetime.now().isoformat()
-    }
-    warned_users[guild_id][user_id].append(warning)
-    
-    embed = discord.Embed(title="Member Warned", color=0xffa500)
-    embed.add_field(name="Member", value=f"{member.mention} ({member})", inline=False)
-    embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
-    embed.add_field(name="Reason", value=reason, inline=False)
-    embed.add_field(name="Total Warnings", value=len(warned_users[guild_id][user_id]), inline=False)
-    
-    await interaction.response.send_message(embed=embed)
-    
-    # Send DM to warned user
+        member = await get_member(guild, job["data"]["user_id"])
+        if member is not None:
+            await member.remove_roles(discord.Object(job["data"]["role_id"]), reason="Temporary role expired")
+    except discord.NotFound:
+        pass  # Role was deleted
+
+scheduler.handlers["unban"] = expire_ban
+scheduler.handlers["remove_role"] = expire_role
+
+# Shared HTTP client
+# One pooled session for the bot's lifetime so outbound calls reuse keep-alive connections
+# instead of paying a fresh TCP + TLS handshake per command.
+class HTTPClient:
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, max_retries=3, backoff=0.5, max_retry_after=30.0, limit=100, limit_per_host=10):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_retry_after = max_retry_after
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.session = None
+
+    async def start(self):
+        if self.session is not None:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        )
+        timeout = aiohttp.ClientTimeout(total=15, connect=5, sock_read=10)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _retry_delay(self, attempt, response=None):
+        if response is not None and "Retry-After" in response.headers:
+            try:
+                # A misbehaving server can ask for hours; never sleep longer than max_retry_after
+                return min(float(response.headers["Retry-After"]), self.max_retry_after)
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt)
+
+    async def get_json(self, url, params=None, timeout=None, max_retries=None, deadline=None):
+        """GET `url` and return (status, json_data); json_data is None for non-200 responses.
+
+        429 and 5xx responses, timeouts and connection errors are retried with exponential backoff,
+        unless the wait would run past `deadline` (epoch seconds), such as an interaction's expiry.
+        """
+        if max_retries is None:
+            max_retries = self.max_retries
+        options = {"timeout": aiohttp.ClientTimeout(total=timeout)} if timeout is not None else {}
+        for attempt in range(max_retries + 1):
+            last_attempt = attempt == max_retries
+            try:
+                async with self.session.get(url, params=params, **options) as response:
+                    if response.status == 200:
+                        return response.status, await response.json(content_type=None)
+                    if response.status not in self.RETRY_STATUSES or last_attempt:
+                        return response.status, None
+                    delay = self._retry_delay(attempt, response)
+                    if deadline is not None and time.time() + delay > deadline:
+                        return response.status, None
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                delay = self._retry_delay(attempt)
+                if last_attempt or (deadline is not None and time.time() + delay > deadline):
+                    raise
+            await asyncio.sleep(delay)
+
+
+http_client = HTTPClient()
+
+# Result cache
+# LRU + TTL cache with entry and approximate memory caps. Concurrent misses for the same key
+# share a single in-flight fetch instead of each hitting the remote API.
+_MISSING = object()
+
+class ResultCache:
+    def __init__(self, ttl=300, max_entries=512, max_bytes=8 * 1024 * 1024, sizeof=None):
+        if sizeof is not None:
+            self._sizeof = sizeof
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()  # key -> (expires_at, size, value)
+        self._inflight = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def _sizeof(value):
+        return len(json.dumps(value, separators=(",", ":"), default=str))
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if entry[0] <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def set(self, key, value):
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, size, value)
+        self.total_bytes += size
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _finish(self, key, task):
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self.set(key, task.result())
+
+    async def get_or_fetch(self, key, fetch):
+        """Return the cached value for `key`, calling `fetch()` at most once per concurrent miss."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        # Shield so one cancelled caller does not cancel the fetch other callers are waiting on
+        return await asyncio.shield(task)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
+
+
+script_search_cache = ResultCache(
+    ttl=float(setting("SCRIPT_CACHE_TTL", "300")),
+    max_entries=int(setting("SCRIPT_CACHE_MAX_ENTRIES", "512")),
+    max_bytes=int(setting("SCRIPT_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+)
+
+# Member lookups
+# Members missing from discord.py's cache (always, in the lean profile) are fetched on demand
+# and kept briefly so repeated lookups don't each cost a REST call.
+member_cache = ResultCache(
+    ttl=float(setting("MEMBER_CACHE_TTL", "300")),
+    max_entries=int(setting("MEMBER_CACHE_SIZE", "1000")),
+    sizeof=lambda member: 0
+)
+
+async def get_member(guild, user_id):
+    """Return a guild member from the cache or the API, or None if they are not in the guild."""
+    member = guild.get_member(user_id)
+    if member is not None:
+        return member
     try:
-        dm_embed = discord.Embed(title="You've been warned", color=0xffa500)
-        dm_embed.add_field(name="Server", value=interaction.guild.name, inline=False)
-        dm_embed.add_field(name="Reason", value=reason, inline=False)
-        await member.send(embed=dm_embed)
-    except:
-        pass  # Ignore if DM fails
-
-# Timeout command
-@bot.tree.command(name="timeout", description="Timeout a member")
-@app_commands.describe(member="The member to timeout", duration="Duration in minutes", reason="Reason for timeout")
-async def timeout(interaction: discord.Interaction, member: discord.Member, duration: int, reason: str = "No reason provided"):
-    if not interaction.user.guild_permissions.moderate_members:
-        await interaction.response.send_message("❌ You don't have permission to timeout members!", ephemeral=True)
-        return
-    
-    if duration <= 0 or duration > 40320:  # Max 28 days
-        await interaction.response.send_message("❌ Duration must be between 1 minute and 28 days (40320 minutes)!", ephemeral=True)
-        return
-    
+        return await member_cache.get_or_fetch((guild.id, user_id), lambda: guild.fetch_member(user_id))
+    except discord.NotFound:
+        return None
+
+async def get_all_members(guild):
+    """Return every member of `guild`, requesting them from the gateway when they aren't cached."""
+    if guild.chunked:
+        return guild.members
+    if HTTP_INTERACTIONS:
+        # An interactions replica has no gateway shard to chunk through, so page them over REST
+        return [member async for member in guild.fetch_members(limit=None)]
+    return await guild.chunk(cache=not LEAN_MEMBER_CACHE)
+
+# Command tree sync
+# Syncing is a rate-limited API call, so it only happens from setup_hook and only when the
+# fingerprint of the serialized command tree differs from the last one synced.
+COMMAND_SYNC_STATE = setting("COMMAND_SYNC_STATE", ".command_sync.json")
+
+def command_tree_fingerprint(tree, guild=None):
+    payload = [command.to_dict(tree) for command in tree.get_commands(guild=guild)]
+    payload.sort(key=lambda command: (command.get("type", 1), command["name"]))
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+def load_sync_state():
     try:
-        until = discord.utils.utcnow() + datetime.timedelta(minutes=duration)
-        await member.timeout(until, reason=reason)
-        
-        embed = discord.Embed(title="Member Timed Out", color=0x808080)
-        embed.add_field(name="Member", value=f"{member.mention} ({member})", inline=False)
-        embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
-        embed.add_field(name="Duration", value=f"{duration} minutes", inline=False)
-        embed.add_field(name="Reason", value=reason, inline=False)
-        
-        await interaction.response.send_message(embed=embed)
-    except discord.Forbidden:
-        await interaction.response.send_message("❌ I don't have permission to timeout this member!", ephemeral=True)
-    except Exception as e:
-        await interaction.response.send_message(f"❌ An error occurred: {e}", ephemeral=True)
-
-# Clear messages command
-@bot.tree.command(name="clear", description="Clear messages from a channel")
-@app_commands.describe(amount="Number of messages to delete (1-100)")
-async def clear(interaction: discord.Interaction, amount: int):
-    if not interaction.user.guild_permissions.manage_messages:
-        await interaction.response.send_message("❌ You don't have permission to manage messages!", ephemeral=True)
-        return
-    
-    if amount <= 0 or amount > 100:
-        await interaction.response.send_message("❌ Amount must be between 1-100!", ephemeral=True)
-        return
+        with open(COMMAND_SYNC_STATE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_sync_state(state):
+    tmp_path = f"{COMMAND_SYNC_STATE}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, COMMAND_SYNC_STATE)
+
+async def sync_command_tree(tree, force=None):
+    # DEV_GUILD_ID syncs to a single guild instead, where changes show up instantly
+    dev_guild_id = setting("DEV_GUILD_ID")
+    guild = discord.Object(id=int(dev_guild_id)) if dev_guild_id else None
+    if guild is not None:
+        tree.copy_global_to(guild=guild)
+    if force is None:
+        force = str(setting("FORCE_COMMAND_SYNC", "0")) == "1"
+    
+    scope = "global" if guild is None else f"guild:{guild.id}"
+    fingerprint = command_tree_fingerprint(tree, guild=guild)
+    state = load_sync_state()
+    if not force and state.get(scope) == fingerprint:
+        print(f"Command tree unchanged ({scope}), skipping sync")
+        return None
     
     try:
-        deleted = await interaction.channel.purge(limit=amount)
-        embed = discord.Embed(title="Messages Cleared", color=0x00ff00)
-        embed.add_field(name="Amount", value=f"{len(deleted)} messages", inline=False)
-        embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
-        embed.add_field(name="Channel", value=interaction.channel.mention, inline=False)
-        
-        await interaction.response.send_message(embed=embed, ephemeral=True)
-    except discord.Forbidden:
-        await interaction.response.send_message("❌ I don't have permission to delete messages!", ephemeral=True)
+        synced = await tree.sync(guild=guild)
     except Exception as e:
-        await interaction.response.send_message(f"❌ An error occurred: {e}", ephemeral=True)
-
-# Warnings check command
-@bot.tree.command(name="warnings", description="Check warnings for a member")
-@app_commands.describe(member="The member to check warnings for")
-async def warnings(interaction: discord.Interaction, member: discord.Member):
-    if not interaction.user.guild_permissions.moderate_members:
-        await interaction.response.send_message("❌ You don't have permission to view warnings!", ephemeral=True)
-        return
-    
-    user_id = str(member.id)
-    guild_id = str(interaction.guild.id)
-    
-    if guild_id not in warned_users or user_id not in warned_users[guild_id]:
-        await interaction.response.send_message(f"✅ {member.mention} has no warnings!", ephemeral=True)
-        return
-    
-    warnings_list = warned_users[guild_id][user_id]
-    embed = discord.Embed(title=f"Warnings for {member.display_name}", color=0xffa500)
-    
-    for i, warning in enumerate(warnings_list[-10:], 1):  # Show last 10 warnings
-        embed.add_field(
-            name=f"Warning {i}",
-            value=f"**Reason:** {warning['reason']}\n**Moderator:** {warning['moderator']}\n**Date:** {warning['timestamp'][:10]}",
-            inline=False
-        )
-    
-    embed.add_field(name="Total Warnings", value=len(warnings_list), inline=False)
-    await interaction.response.send_message(embed=embed, ephemeral=True)
-
-# Server info command
-@bot.tree.command(name="serverinfo", description="Get server information")
-async def serverinfo(interaction: discord.Interaction):
-    guild = interaction.guild
-    embed = discord.Embed(title=f"Server Info - {guild.name}", color=0x0099ff)
-    
-    embed.add_field(name="Owner", value=guild.owner.mention if guild.owner else "Unknown", inline=True)
-    embed.add_field(name="Members", value=guild.member_count, inline=True)
-    embed.add_field(name="Created", value=guild.created_at.strftime("%B %d, %Y"), inline=True)
-    embed.add_field(name="Channels", value=len(guild.channels), inline=True)
-    embed.add_field(name="Roles", value=len(guild.roles), inline=True)
-    embed.add_field(name="Boost Level", value=guild.premium_tier, inline=True)
-    
-    if guild.icon:
-        embed.set_thumbnail(url=guild.icon.url)
-    
-    await interaction.response.send_message(embed=embed)
-
-# User info command
-@bot.tree.command(name="userinfo", description="Get user information")
-@app_commands.describe(member="The member to get info about")
-async def userinfo(interaction: discord.Interaction, member: discord.Member = None):
-    if member is None:
-        member = interaction.user
-    
-    embed = discord.Embed(title=f"User Info - {member.display_name}", color=member.color)
-    
-    embed.add_field(name="Username", value=str(member), inline=True)
-    embed.add_field(name="ID", value=member.id, inline=True)
-    embed.add_field(name="Joined Server", value=member.joined_at.strftime("%B %d, %Y") if member.joined_at else "Unknown", inline=True)
-    embed.add_field(name="Account Created", value=member.created_at.strftime("%B %d, %Y"), inline=True)
-    embed.add_field(name="Top Role", value=member.top_role.mention, inline=True)
-    embed.add_field(name="Status", value=str(member.status).title(), inline=True)
-    
-    if member.avatar:
-        embed.set_thumbnail(url=member.avatar.url)
-    
-    await interaction.response.send_message(embed=embed)
-
-# Lock channel command
-@bot.tree.command(name="lock", description="Lock a channel")
-@app_commands.describe(reason="Reason for locking the channel")
-async def lock(interaction: discord.Interaction, reason: str = "No reason provided"):
-    if not interaction.user.guild_permissions.manage_channels:
-        await interaction.response.send_message("❌ You don't have permission to manage channels!", ephemeral=True)
+        print(f"Failed to sync commands: {e}")
+        return None
+    state[scope] = fingerprint
+    save_sync_state(state)
+    print(f"Synced {len(synced)} command(s) ({scope})")
+    return synced
+
+@bot.event
+async def on_ready():
+    print(f'{bot.user} has connected to Discord!')
+    if "ready" not in startup_timings:
+        startup_timings["ready"] = time.perf_counter() - PROCESS_START
+        print(f"Ready in {startup_timings['ready']:.2f}s")
+
+# Extensions
+# Commands live in cogs/ and a module is only imported once setup_hook loads it. BOT_EXTENSIONS
+# (comma separated, or a list in the config file) loads a subset. Shared state such as the
+# stores, caches, scheduler and AFK registry stays in this module, so /reload swaps a cog's
+# code in place without reconnecting or losing any of it.
+EXTENSIONS = ("cogs.moderation", "cogs.info", "cogs.afk", "cogs.scripts", "cogs.utility", "cogs.debug", "cogs.antispam")
+
+# Seconds from process start to the end of each startup phase, and per-extension load times
+startup_timings = {}
+extension_load_times = {}
+
+def enabled_extensions():
+    names = setting("BOT_EXTENSIONS")
+    if names is None:
+        return list(EXTENSIONS)
+    if isinstance(names, str):
+        names = names.split(",")
+    return [name.strip() for name in names if name.strip()]
+
+async def load_extensions(client):
+    for name in enabled_extensions():
+        started = time.perf_counter()
+        try:
+            await client.load_extension(name)
+        except commands.ExtensionError as e:
+            print(f"Failed to load extension {name}: {e.__cause__ or e}")
+            continue
+        extension_load_times[name] = time.perf_counter() - started
+    startup_timings["extensions"] = time.perf_counter() - PROCESS_START
+    loaded = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in extension_load_times.items())
+    print(f"Loaded {len(extension_load_times)} extension(s) in {sum(extension_load_times.values()):.2f}s: {loaded}")
+
+def resolve_extension(name):
+    name = name.strip()
+    return name if name.startswith("cogs.") else f"cogs.{name}"
+
+# Reload command
+@bot.tree.command(name="reload", description="Reload command modules without reconnecting (bot owner only)", extras={"ephemeral": True})
+@app_commands.describe(extension="Extension to reload, or \"all\" for every loaded one")
+@app_commands.default_permissions(administrator=True)
+async def reload(interaction: discord.Interaction, extension: str = "all"):
+    if not await bot.is_owner(interaction.user):
+        await reply(interaction, "❌ Only the bot owner can reload extensions.", ephemeral=True)
         return
     
-    try:
-        overwrite = interaction.channel.overwrites_for(interaction.guild.default_role)
-        overwrite.send_messages = False
-        await interaction.channel.set_permissions(interaction.guild.default_role, overwrite=overwrite)
-        
-        embed = discord.Embed(title="🔒 Channel Locked", color=0xff0000)
-        embed.add_field(name="Channel", value=interaction.channel.mention, inline=False)
-        embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
-        embed.add_field(name="Reason", value=reason, inline=False)
-        
-        await interaction.response.send_message(embed=embed)
-    except Exception as e:
-        await interaction.response.send_message(f"❌ An error occurred: {e}", ephemeral=True)
-
-# Unlock channel command
-@bot.tree.command(name="unlock", description="Unlock a channel")
-@app_commands.describe(reason="Reason for unlocking the channel")
-async def unlock(interaction: discord.Interaction, reason: str = "No reason provided"):
-    if not interaction.user.guild_permissions.manage_channels:
-        await interaction.response.send_message("❌ You don't have permission to manage channels!", ephemeral=True)
+    names = list(bot.extensions) if extension == "all" else [resolve_extension(extension)]
+    unknown = [name for name in names if name not in EXTENSIONS and name not in bot.extensions]
+    if unknown:
+        await reply(interaction, f"❌ Unknown extension: `{unknown[0]}`", ephemeral=True)
         return
     
-    try:
-        overwrite = interaction.channel.overwrites_for(interaction.guild.default_role)
-        overwrite.send_messages = None
-        await interaction.channel.set_permissions(interaction.guild.default_role, overwrite=overwrite)
-        
-        embed = discord.Embed(title="🔓 Channel Unlocked", color=0x00ff00)
-        embed.add_field(name="Channel", value=interaction.channel.mention, inline=False)
-        embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
-        embed.add_field(name="Reason", value=reason, inline=False)
-        
-        await interaction.response.send_message(embed=embed)
-    except Exception as e:
-        await interaction.response.send_message(f"❌ An error occurred: {e}", ephemeral=True)
+    await defer(interaction, ephemeral=True)
+    lines = []
+    failed = False
+    for name in names:
+        started = time.perf_counter()
+        try:
+            # A failed reload leaves the previous version of the module loaded
+            if name in bot.extensions:
+                await bot.reload_extension(name)
+            else:
+                await bot.load_extension(name)
+        except commands.ExtensionError as e:
+            failed = True
+            lines.append(f"❌ `{name}`: {e.__cause__ or e}")
+        else:
+            lines.append(f"✅ `{name}` ({(time.perf_counter() - started) * 1000:.0f}ms)")
+    if CLUSTER_ID == 0:
+        await sync_command_tree(bot.tree)
+    
+    embed = discord.Embed(title="🔄 Reload", description="\n".join(lines) or "No extensions loaded", color=0xff0000 if failed else 0x00ff00)
+    if CLUSTER_IPC_URL:
+        embed.set_footer(text=f"Applied to cluster worker {CLUSTER_ID} only")
+    await reply(interaction, embed=embed, ephemeral=True)
+
+@reload.autocomplete("extension")
+async def reload_autocomplete(interaction: discord.Interaction, current: str):
+    names = ["all", *sorted(set(EXTENSIONS) | set(bot.extensions))]
+    return [app_commands.Choice(name=name, value=name) for name in names if current.lower() in name.lower()][:25]
 
 # Store for AFK users
-afk_users = {}
+# Entries are keyed by integer (guild_id, user_id) and stamped with time.time(), and a
+# per-guild count lets on_message skip guilds with nobody AFK after a single dict lookup.
+class AFKRegistry:
+    __slots__ = ("_entries", "_guild_counts")
 
-# Search scripts command
-@bot.tree.command(name="search-scripts", description="Search for scripts on ScriptBlox")
-@app_commands.describe(query="Search query for scripts")
-async def search_scripts(interaction: discord.Interaction, query: str):
-    await interaction.response.defer()
-    
-    try:
-        async with aiohttp.ClientSession() as session:
-            url = f"https://scriptblox.com/api/script/search?q={query}"
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    if not data.get('result') or not data['result'].get('scripts'):
-                        embed = discord.Embed(title="🔍 Script Search", description=f"No scripts found for: **{query}**", color=0xff0000)
-                        await interaction.followup.send(embed=embed)
-                        return
-                    
-                    scripts = data['result']['scripts']
-                    await send_script_results(interaction, scripts, query, 0)
-                    
-                else:
-                    embed = discord.Embed(title="❌ Error", description="Failed to fetch scripts from ScriptBlox API", color=0xff0000)
-                    await interaction.followup.send(embed=embed)
-                    
-    except Exception as e:
-        embed = discord.Embed(title="❌ Error", description=f"An error occurred: {str(e)}", color=0xff0000)
-        await interaction.followup.send(embed=embed)
-
-async def send_script_results(interaction, scripts, query, page=0):
-    scripts_per_page = 5
-    start_idx = page * scripts_per_page
-    end_idx = start_idx + scripts_per_page
-    page_scripts = scripts[start_idx:end_idx]
-    
-    if not page_scripts:
-        embed = discord.Embed(title="📄 No More Results", description="You've reached the end of the search results.", color=0x808080)
-        await interaction.followup.send(embed=embed)
-        return
-    
-    embed = discord.Embed(
-        title=f"🔍 Script Search Results - Page {page + 1}",
-        description=f"Search query: **{query}**\nShowing {start_idx + 1}-{min(end_idx, len(scripts))} of {len(scripts)} results",
-        color=0x0099ff
-    )
-    
-    for i, script in enumerate(page_scripts, start_idx + 1):
-        title = script.get('title', 'Untitled Script')[:100]
-        game = script.get('game', {}).get('name', 'Unknown Game')
-        views = script.get('views', 0)
-        verified = "✅" if script.get('isVerified') else "❌"
-        
-        script_info = f"**Game:** {game}\n**Views:** {views:,}\n**Verified:** {verified}"
-        embed.add_field(name=f"{i}. {title}", value=script_info, inline=False)
-    
-    view = ScriptSearchView(scripts, query, page)
-    
-    if interaction.response.is_done():
-        await interaction.followup.send(embed=embed, view=view)
-    else:
-        await interaction.response.send_message(embed=embed, view=view)
-
-class ScriptSearchView(discord.ui.View):
-    def __init__(self, scripts, query, current_page):
-        super().__init__(timeout=300)
-        self.scripts = scripts
-        self.query = query
-        self.current_page = current_page
-        self.scripts_per_page = 5
-        
-        # Disable buttons if at boundaries
-        if current_page == 0:
-            self.previous_button.disabled = True
-        
-        max_pages = (len(scripts) - 1) // self.scripts_per_page
-        if current_page >= max_pages:
-            self.next_button.disabled = True
-    
-    @discord.ui.button(label='◀️ Previous', style=discord.ButtonStyle.secondary)
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        new_page = max(0, self.current_page - 1)
-        await self.update_page(interaction, new_page)
-    
-    @discord.ui.button(label='Next ▶️', style=discord.ButtonStyle.primary)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        max_pages = (len(self.scripts) - 1) // self.scripts_per_page
-        new_page = min(max_pages, self.current_page + 1)
-        await self.update_page(interaction, new_page)
-    
-    async def update_page(self, interaction, new_page):
-        start_idx = new_page * self.scripts_per_page
-        end_idx = start_idx + self.scripts_per_page
-        page_scripts = self.scripts[start_idx:end_idx]
-        
-        embed = discord.Embed(
-            title=f"🔍 Script Search Results - Page {new_page + 1}",
-            description=f"Search query: **{self.query}**\nShowing {start_idx + 1}-{min(end_idx, len(self.scripts))} of {len(self.scripts)} results",
-            color=0x0099ff
+    def __init__(self):
+        self._entries = {}  # (guild_id, user_id) -> (reason, since)
+        self._guild_counts = {}  # guild_id -> number of AFK users
+
+    def __len__(self):
+        return len(self._entries)
+
+    def set(self, guild_id, user_id, reason, since=None):
+        key = (guild_id, user_id)
+        if key not in self._entries:
+            self._guild_counts[guild_id] = self._guild_counts.get(guild_id, 0) + 1
+        self._entries[key] = (reason, time.time() if since is None else since)
+
+    def get(self, guild_id, user_id):
+        return self._entries.get((guild_id, user_id))
+
+    def pop(self, guild_id, user_id):
+        entry = self._entries.pop((guild_id, user_id), None)
+        if entry is not None:
+            remaining = self._guild_counts[guild_id] - 1
+            if remaining:
+                self._guild_counts[guild_id] = remaining
+            else:
+                del self._guild_counts[guild_id]
+        return entry
+
+    def has_guild(self, guild_id):
+        return guild_id in self._guild_counts
+
+    def count_guild(self, guild_id):
+        return self._guild_counts.get(guild_id, 0)
+
+
+afk_registry = AFKRegistry()
+
+# AFK statuses are cleared after AFK_EXPIRY_HOURS (0 keeps them until the user speaks). The
+# registry is on_message's in-memory view of the afk_statuses table, which the store shares
+# between processes: it is loaded at startup, and with SCHEDULER_POLL_SECONDS set, statuses
+# that other processes (HTTP interaction replicas) set are read back in that often.
+AFK_EXPIRY_HOURS = float(setting("AFK_EXPIRY_HOURS", "24"))
+
+AFK_SYNC_OVERLAP = 60  # seconds of statuses re-read on every sync, for writes committed late
+
+async def set_afk(guild_id, user_id, reason):
+    since = time.time()
+    afk_registry.set(guild_id, user_id, reason, since)
+    await bot_store.set_afk(guild_id, user_id, reason, since)
+    if AFK_EXPIRY_HOURS:
+        await scheduler.schedule(
+            "afk_expire", f"afk:{guild_id}:{user_id}", since + AFK_EXPIRY_HOURS * 3600,
+            guild_id=guild_id, data={"user_id": user_id}
         )
-        
-        for i, script in enumerate(page_scripts, start_idx + 1):
-            title = script.get('title', 'Untitled Script')[:100]
-            game = script.get('game', {}).get('name', 'Unknown Game')
-            views = script.get('views', 0)
-            verified = "✅" if script.get('isVerified') else "❌"
-            
-            script_info = f"**Game:** {game}\n**Views:** {views:,}\n**Verified:** {verified}"
-            embed.add_field(name=f"{i}. {title}", value=script_info, inline=False)
-        
-        # Update button states
-        self.previous_button.disabled = (new_page == 0)
-        max_pages = (len(self.scripts) - 1) // self.scripts_per_page
-        self.next_button.disabled = (new_page >= max_pages)
-        
-        self.current_page = new_page
-        await interaction.edit_original_response(embed=embed, view=self)
-    
-    async def on_timeout(self):
-        # Disable all buttons when view times out
-        for item in self.children:
-            item.disabled = True
-
-# Help command
-@bot.tree.command(name="help", description="Show all available commands")
-async def help_command(interaction: discord.Interaction):
-    embed = discord.Embed(title="🤖 Bot Commands", description="Here are all available moderation commands:", color=0x0099ff)
-    
-    embed.add_field(
-        name="🔨 Moderation Commands",
-        value="`/kick` - Kick a member\n`/ban` - Ban a member\n`/warn` - Warn a member\n`/timeout` - Timeout a member\n`/clear` - Clear messages",
-        inline=False
-    )
-    
-    embed.add_field(
-        name="🔒 Channel Management",
-        value="`/lock` - Lock a channel\n`/unlock` - Unlock a channel",
-        inline=False
-    )
-    
-    embed.add_field(
-        name="📊 Information Commands",
-        value="`/userinfo` - Get user information\n`/serverinfo` - Get server information\n`/warnings` - Check member warnings\n`/stats` - Bot statistics",
-        inline=False
-    )
-    
-    embed.add_field(
-        name="💤 Utility Commands",
-        value="`/afk` - Set AFK status\n`/search-scripts` - Search ScriptBlox scripts\n/invite` - Get bot invite link\n`/ping` - Check bot latency\n`/uptime` - Check bot uptime\n`/help` - Show this help menu",
-        inline=False
-    )
-    
-    embed.set_footer(text="Use these commands responsibly!")
-    await interaction.response.send_message(embed=embed)
-
-# AFK command
-@bot.tree.command(name="afk", description="Set your AFK status")
-@app_commands.describe(reason="Reason for being AFK")
-async def afk(interaction: discord.Interaction, reason: str = "No reason provided"):
-    user_id = str(interaction.user.id)
-    guild_id = str(interaction.guild.id)
-    
-    if guild_id not in afk_users:
-        afk_users[guild_id] = {}
-    
-    afk_users[guild_id][user_id] = {
-        "reason": reason,
-        "timestamp": datetime.datetime.now().isoformat()
-    }
-    
-    embed = discord.Embed(title="💤 AFK Status Set", color=0x808080)
-    embed.add_field(name="User", value=interaction.user.mention, inline=False)
-    embed.add_field(name="Reason", value=reason, inline=False)
-    embed.set_footer(text="You will be marked as back when you send a message!")
-    
-    await interaction.response.send_message(embed=embed)
 
-# AFK check on message
-@bot.event
-async def on_message(message):
-    if message.author.bot:
-        return
-    
-    guild_id = str(message.guild.id)
-    user_id = str(message.author.id)
-    
-    # Check if user was AFK and remove them
-    if guild_id in afk_users and user_id in afk_users[guild_id]:
-        afk_time = datetime.datetime.fromisoformat(afk_users[guild_id][user_id]["timestamp"])
-        time_away = datetime.datetime.now() - afk_time
-        
-        del afk_users[guild_id][user_id]
-        
-        embed = discord.Embed(title="👋 Welcome Back!", color=0x00ff00)
-        embed.add_field(name="Time Away", value=f"{time_away.seconds // 3600}h {(time_away.seconds // 60) % 60}m", inline=False)
-        
-        await message.channel.send(embed=embed, delete_after=10)
-    
-    # Check for mentions of AFK users
-    for mention in message.mentions:
-        mentioned_id = str(mention.id)
-        if guild_id in afk_users and mentioned_id in afk_users[guild_id]:
-            afk_data = afk_users[guild_id][mentioned_id]
-            afk_time = datetime.datetime.fromisoformat(afk_data["timestamp"])
-            time_away = datetime.datetime.now() - afk_time
-            
-            embed = discord.Embed(title="💤 User is AFK", color=0x808080)
-            embed.add_field(name="User", value=mention.mention, inline=False)
-            embed.add_field(name="Reason", value=afk_data["reason"], inline=False)
-            embed.add_field(name="Time Away", value=f"{time_away.seconds // 3600}h {(time_away.seconds // 60) % 60}m", inline=False)
-            
-            await message.channel.send(embed=embed, delete_after=15)
+async def clear_afk(guild_id, user_id):
+    """Remove a user's AFK status and return its (reason, since), or None if they weren't AFK."""
+    entry = afk_registry.pop(guild_id, user_id)
+    if entry is not None:
+        await bot_store.delete_afk(guild_id, user_id)
+        await scheduler.cancel(f"afk:{guild_id}:{user_id}")
+    return entry
+
+async def expire_afk(job):
+    afk_registry.pop(job["guild_id"], job["data"]["user_id"])
+    await bot_store.delete_afk(job["guild_id"], job["data"]["user_id"])
+
+_afk_synced_at = None
+
+async def sync_afk(job=None):
+    global _afk_synced_at
+    started = time.time()
+    since = 0.0 if _afk_synced_at is None else _afk_synced_at - AFK_SYNC_OVERLAP
+    for entry in await bot_store.load_afk(since):
+        if owns_guild(entry["guild_id"]):
+            afk_registry.set(entry["guild_id"], entry["user_id"], entry["reason"], entry["since"])
+    _afk_synced_at = started
+    if scheduler.poll_interval:
+        await scheduler.schedule("afk_sync", "afk_sync", started + scheduler.poll_interval, persist=False)
+
+scheduler.handlers["afk_expire"] = expire_afk
+scheduler.handlers["afk_sync"] = sync_afk
+
+# Background sender for channel notices
+# on_message only enqueues; a few workers deliver the sends so a burst of notices never
+# holds up message handling. When the queue is full new notices are dropped.
+class NotificationSender:
+    def __init__(self, workers=4, max_queue=1000):
+        self.workers = workers
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._tasks = []
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, channel, **kwargs):
+        try:
+            self._queue.put_nowait((channel, kwargs))
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+    async def _worker(self):
+        while True:
+            channel, kwargs = await self._queue.get()
+            try:
+                await channel.send(**kwargs)
+                self.sent += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Failed to send notice to channel {getattr(channel, 'id', channel)}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+notification_sender = NotificationSender()
+
+# Moderation DMs
+# Command handlers only enqueue. Workers deliver each recipient's notices in order, pace sends
+# and back off together on a 429, and retry transient failures. Notices stay in the database
+# until they are delivered or given up on, so a restart resumes the recent backlog.
+DM_BEFORE_ACTION_TIMEOUT = float(setting("DM_BEFORE_ACTION_TIMEOUT", "2"))
+
+class ModerationDMDispatcher:
+    def __init__(self, client, store, workers=4, max_pending=1000, max_retries=4, send_interval=0.25, max_age=86400):
+        self.client = client
+        self.store = store
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.send_interval = send_interval
+        self.max_age = max_age
+        self._pending = {}  # user_id -> deque of notices, oldest first
+        self._ready = asyncio.Queue()  # recipients with notices waiting and no worker on them
+        self._size = 0
+        self._tasks = []
+        self._ids = itertools.count()
+        self._next_send = 0.0
+        self._pause_until = 0.0
+        self.delivered = 0
+        self.failed = 0
+        self.retried = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self._size
+
+    async def start(self):
+        if self._tasks:
+            return
+        for notice in await self.store.load_dm_notices(CLUSTER_ID, time.time() - self.max_age, self.max_pending):
+            notice["future"] = None
+            self._push(notice)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self):
+        # Undelivered notices are left in the store for the next start
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _push(self, notice):
+        queue = self._pending.get(notice["user_id"])
+        if queue is None:
+            queue = self._pending[notice["user_id"]] = collections.deque()
+            self._ready.put_nowait(notice["user_id"])
+        queue.append(notice)
+        self._size += 1
+
+    async def enqueue(self, user_id, content=None, embed=None):
+        """Queue a DM to `user_id`.
+
+        Returns a future that resolves to True once delivered or False once given up on,
+        or None if the queue is full and the notice was dropped.
+        """
+        if self._size >= self.max_pending:
+            self.dropped += 1
+            return None
+        payload = {"content": content, "embed": embed.to_dict() if embed is not None else None}
+        notice = {
+            "key": f"{CLUSTER_ID}:{time.time_ns()}:{next(self._ids)}",
+            "user_id": user_id,
+            "payload": payload,
+            "created_at": time.time(),
+            "future": asyncio.get_running_loop().create_future(),
+        }
+        await self.store.add_dm_notice(notice["key"], CLUSTER_ID, user_id, payload, notice["created_at"])
+        self._push(notice)
+        return notice["future"]
+
+    async def notify_before_action(self, user_id, content=None, embed=None, timeout=DM_BEFORE_ACTION_TIMEOUT):
+        """Queue a DM and wait up to `timeout` seconds for it, for actions that end the shared server."""
+        future = await self.enqueue(user_id, content=content, embed=embed)
+        if future is None:
+            return False
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+    async def _wait_turn(self):
+        now = time.monotonic()
+        start = max(now, self._next_send, self._pause_until)
+        self._next_send = start + self.send_interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _send(self, notice):
+        payload = notice["payload"]
+        user = self.client.get_user(notice["user_id"]) or await self.client.fetch_user(notice["user_id"])
+        embed = discord.Embed.from_dict(payload["embed"]) if payload.get("embed") else None
+        await user.send(content=payload.get("content"), embed=embed)
+
+    async def _deliver(self, notice):
+        for attempt in range(self.max_retries + 1):
+            await self._wait_turn()
+            try:
+                await self._send(notice)
+                return True
+            except discord.HTTPException as e:
+                # 4xx other than 429 (DMs closed, no shared server, unknown user) will not get better
+                if e.status == 429:
+                    retry_after = getattr(e, "retry_after", None) or 2 ** attempt
+                    self._pause_until = max(self._pause_until, time.monotonic() + retry_after)
+                elif e.status < 500:
+                    return False
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            except Exception as e:
+                print(f"Failed to DM user {notice['user_id']}: {e}")
+                return False
+            if attempt < self.max_retries:
+                self.retried += 1
+                await asyncio.sleep(min(30, 2 ** attempt))
+        print(f"Giving up on DM to user {notice['user_id']} after {self.max_retries + 1} attempts: {error}")
+        return False
+
+    async def _worker(self):
+        while True:
+            user_id = await self._ready.get()
+            queue = self._pending[user_id]
+            while queue:
+                notice = queue[0]
+                delivered = await self._deliver(notice)
+                queue.popleft()
+                self._size -= 1
+                if delivered:
+                    self.delivered += 1
+                else:
+                    self.failed += 1
+                await self.store.remove_dm_notice(notice["key"])
+                if notice["future"] is not None and not notice["future"].done():
+                    notice["future"].set_result(delivered)
+            del self._pending[user_id]
+
+    def stats(self):
+        return {"delivered": self.delivered, "failed": self.failed, "retried": self.retried,
+                "dropped": self.dropped, "pending": self._size}
+
+
+dm_dispatcher = ModerationDMDispatcher(bot, bot_store)
+
+def bot_outranks(member, permission=None):
+    """Whether the bot's role hierarchy, and `permission` if given, allow it to act on `member`."""
+    me = member.guild.me
+    if permission is not None and not getattr(me.guild_permissions, permission):
+        return False
+    return member.id != member.guild.owner_id and me.top_role > member.top_role
+
+# Suppresses repeat "User is AFK" notices for the same user in the same channel
+class AFKNoticeDebouncer:
+    def __init__(self, window=60, max_entries=10000):
+        self.window = window
+        self.max_entries = max_entries
+        self._last = collections.OrderedDict()  # (channel_id, user_id) -> last notice, oldest first
+
+    def should_notify(self, channel_id, user_id):
+        now = time.monotonic()
+        key = (channel_id, user_id)
+        last = self._last.get(key)
+        if last is not None and now - last < self.window:
+            return False
+        self._last[key] = now
+        self._last.move_to_end(key)
+        while self._last and (len(self._last) > self.max_entries or now - next(iter(self._last.values())) >= self.window):
+            self._last.popitem(last=False)
+        return True
+
+
+afk_notice_debouncer = AFKNoticeDebouncer(window=float(setting("AFK_NOTICE_WINDOW", "60")))
+
+SCRIPT_QUERY_MAX_LENGTH = 80  # keeps "scripts:<page>:<query>" inside the 100 character custom_id limit
+
+def normalize_query(query):
+    return " ".join(query.lower().split())[:SCRIPT_QUERY_MAX_LENGTH]
+
+# Spam and raid detection
+# Guild messages are counted over sliding windows: messages per member and per channel, repeats
+# of the same content by a member, and mentions per member. The counts live in count-min
+# sketches of a fixed size, so memory stays the same however many users are seen. Unrelated
+# keys sharing a counter inflate an estimate by about (messages per window) / width, so
+# SPAM_SKETCH_WIDTH should stay above the messages a process sees in the longest window. Joins
+# are tracked exactly, in a ring buffer per guild one longer than the join limit. Limits are
+# (count, seconds) and SPAM_LIMITS (JSON) overrides entries; null turns a check off.
+DEFAULT_SPAM_LIMITS = {
+    "member_messages": [8, 10],
+    "channel_messages": [80, 10],
+    "duplicates": [4, 30],
+    "mentions": [15, 30],
+    "joins": [10, 30],
+}
+
+class WindowedCountMinSketch:
+    """Approximate per-key counts over the last `window` seconds, in fixed memory.
+
+    Every counter holds its count for the current window and the one before, and the estimate
+    weighs the previous count by how much of it still overlaps the sliding window. Counters
+    roll over when they are next touched, so nothing ever sweeps the tables.
+    """
+    def __init__(self, window, width=32768, depth=2):
+        if width & (width - 1):
+            raise ValueError("width must be a power of two")
+        self.window = window
+        self.width = width
+        self.depth = depth
+        self._offsets = tuple(range(0, width * depth, width))
+        self._current = [0] * (width * depth)
+        self._previous = [0] * (width * depth)
+        self._epochs = [0] * (width * depth)  # the window each counter's current count is for
+
+    def add(self, key, amount=1, now=None):
+        """Count `amount` for `key` (any hashable) and return its estimated total in the window."""
+        position = (time.monotonic() if now is None else now) / self.window
+        epoch = int(position)
+        overlap = 1.0 - (position - epoch)  # share of the previous window still inside this one
+        current, previous, epochs, mask = self._current, self._previous, self._epochs, self.width - 1
+        # One hash gives every row's column by double hashing; the odd step keeps rows apart
+        h = hash(key)
+        column = h & mask
+        step = (h >> 32) & mask | 1
+        estimate = None
+        for offset in self._offsets:
+            index = offset + column
+            column = (column + step) & mask
+            if epochs[index] == epoch:
+                count = current[index] = current[index] + amount
+                total = count + previous[index] * overlap
+            else:
+                last = current[index] if epochs[index] == epoch - 1 else 0
+                previous[index] = last
+                current[index] = amount
+                epochs[index] = epoch
+                total = amount + last * overlap
+            if estimate is None or total < estimate:
+                estimate = total
+        return estimate
+
+    def memory_bytes(self):
+        return 3 * self.depth * self.width * 8  # one pointer per counter
+
+
+class SpamDetector:
+    def __init__(self, limits, width=32768, cooldown=60.0, max_flagged=10000):
+        self.limits = limits
+        self.cooldown = cooldown
+        self.max_flagged = max_flagged
+        sketch = lambda check: WindowedCountMinSketch(limits[check][1], width=width) if limits.get(check) else None
+        self.member_messages = sketch("member_messages")
+        self.channel_messages = sketch("channel_messages")
+        self.duplicates = sketch("duplicates")
+        self.mentions = sketch("mentions")
+        self._joins = {}  # guild_id -> deque of (joined_at, member_id)
+        self._raids = {}  # guild_id -> time of the last join in an ongoing raid
+        self._flagged = collections.OrderedDict()  # (guild_id, user or channel ID) -> when it was last reported, oldest first
+
+    def _report(self, target, checks, now):
+        # Whoever crosses a limit stays over it for a while; report them once per cooldown
+        flagged = self._flagged.get(target)
+        if flagged is not None and now - flagged < self.cooldown:
+            return False
+        self._flagged[target] = now
+        self._flagged.move_to_end(target)
+        while self._flagged and (len(self._flagged) > self.max_flagged or now - next(iter(self._flagged.values())) >= self.cooldown):
+            self._flagged.popitem(last=False)
+        for check in checks:
+            metrics.spam_detections[check] += 1
+        return True
+
+    def check_message(self, guild_id, channel_id, user_id, content, mention_count=0, now=None):
+        """Count a message and return the checks it newly pushed over their limits.
+
+        "channel_messages" is about the channel; every other check is about the author.
+        """
+        now = time.monotonic() if now is None else now
+        limits = self.limits
+        member = (guild_id, user_id)
+        hits = []
+        if self.member_messages is not None and self.member_messages.add(member, 1, now) > limits["member_messages"][0]:
+            hits.append("member_messages")
+        if content and self.duplicates is not None and self.duplicates.add((guild_id, user_id, content), 1, now) > limits["duplicates"][0]:
+            hits.append("duplicates")
+        if mention_count and self.mentions is not None and self.mentions.add(member, mention_count, now) > limits["mentions"][0]:
+            hits.append("mentions")
+        if hits and not self._report(member, hits, now):
+            hits = []
+        channel = (guild_id, channel_id)
+        if self.channel_messages is not None and self.channel_messages.add(channel, 1, now) > limits["channel_messages"][0]:
+            if self._report(channel, ["channel_messages"], now):
+                hits.append("channel_messages")
+        return hits
+
+    def check_join(self, guild_id, member_id, now=None):
+        """Record a join and return the IDs of the members to act on if it is part of a raid."""
+        if not self.limits.get("joins"):
+            return []
+        count, per = self.limits["joins"]
+        now = time.monotonic() if now is None else now
+        # Once a raid is detected, everyone who joins before it has been quiet for `per` is part of it
+        last_join = self._raids.get(guild_id)
+        if last_join is not None and now - last_join < per:
+            self._raids[guild_id] = now
+            return [member_id]
+        self._raids.pop(guild_id, None)
+        joins = self._joins.get(guild_id)
+        if joins is None:
+            joins = self._joins[guild_id] = collections.deque(maxlen=count + 1)
+        joins.append((now, member_id))
+        if len(joins) <= count or now - joins[0][0] > per:
+            return []
+        self._raids[guild_id] = now
+        metrics.spam_detections["joins"] += 1
+        raiders = [joined_id for _, joined_id in joins]
+        joins.clear()
+        return raiders
+
+    def memory_bytes(self):
+        sketches = (self.member_messages, self.channel_messages, self.duplicates, self.mentions)
+        return sum(sketch.memory_bytes() for sketch in sketches if sketch is not None)
+
+
+_spam_limit_overrides = setting("SPAM_LIMITS", {})
+if isinstance(_spam_limit_overrides, str):
+    _spam_limit_overrides = json.loads(_spam_limit_overrides)  # JSON when set in the environment
+spam_detector = SpamDetector(
+    dict(DEFAULT_SPAM_LIMITS, **_spam_limit_overrides),
+    width=int(setting("SPAM_SKETCH_WIDTH", "32768"))
+)
+
+# Script suggestions
+# /search-scripts autocomplete is answered from game names and script titles seen in past
+# results, with no network call. Lookups bisect a sorted array of (key, term) pairs in which a
+# term is keyed by each of its first few words onward, so "fruits" also finds "blox fruits",
+# and matches are ranked by views. New terms wait in a small buffer that compact() merges in,
+# dropping the least viewed terms once the index grows past max_terms.
+class ScriptSuggestionIndex:
+    def __init__(self, max_terms=5000, buffer_size=256, max_scan=1000, max_words=4):
+        self.max_terms = max_terms
+        self.buffer_size = buffer_size
+        self.max_scan = max_scan
+        self.max_words = max_words
+        self._views = {}  # term -> highest view count seen
+        self._keys = []  # sorted (key, term) for every compacted term
+        self._pending = set()  # terms not compacted yet
+        self._top = []  # most viewed terms, for an empty query
+
+    def __len__(self):
+        return len(self._views)
+
+    def _keys_for(self, term):
+        words = term.split(" ")
+        return [" ".join(words[i:]) for i in range(min(len(words), self.max_words))]
+
+    def add(self, term, views=0):
+        term = normalize_query(term)
+        if not term:
+            return
+        if term not in self._views:
+            self._pending.add(term)
+        self._views[term] = max(views, self._views.get(term, 0))
+        if len(self._pending) >= self.buffer_size:
+            self.compact()
+
+    def add_results(self, scripts):
+        for script in scripts:
+            views = script.get('views') or 0
+            self.add(script.get('title') or "", views)
+            self.add((script.get('game') or {}).get('name') or "", views)
+
+    def compact(self):
+        if len(self._views) > self.max_terms:
+            # Trim to 90% so the next few additions don't evict again
+            keep = heapq.nlargest(int(self.max_terms * 0.9), self._views.items(), key=lambda item: item[1])
+            self._views = dict(keep)
+            self._keys = [(key, term) for key, term in self._keys if term in self._views]
+        added = sorted((key, term) for term in self._pending if term in self._views for key in self._keys_for(term))
+        self._keys = list(heapq.merge(self._keys, added))
+        self._pending.clear()
+        self._top = [term for term, _ in heapq.nlargest(25, self._views.items(), key=lambda item: item[1])]
+
+    def suggest(self, prefix, limit=25):
+        prefix = normalize_query(prefix)
+        if not prefix:
+            return self._top[:limit]
+        matches = set()
+        start = bisect.bisect_left(self._keys, (prefix,))
+        for index in range(start, min(len(self._keys), start + self.max_scan)):
+            key, term = self._keys[index]
+            if not key.startswith(prefix):
+                break
+            matches.add(term)
+        for term in self._pending:
+            if any(key.startswith(prefix) for key in self._keys_for(term)):
+                matches.add(term)
+        return heapq.nlargest(limit, matches, key=self._views.__getitem__)
+
+script_index = ScriptSuggestionIndex()
 
 # Store bot start time for uptime
 bot_start_time = datetime.datetime.now()
 
-# Invite command
-@bot.tree.command(name="invite", description="Get the bot invite link")
-async def invite(interaction: discord.Interaction):
-    permissions = discord.Permissions(
-        kick_members=True,
-        ban_members=True,
-        manage_messages=True,
-        manage_channels=True,
-        moderate_members=True,
-        read_messages=True,
-        send_messages=True,
-        embed_links=True,
-        read_message_history=True
-    )
-    
-    invite_url = discord.utils.oauth_url(bot.user.id, permissions=permissions)
-    
-    embed = discord.Embed(title="🤖 Invite Bot", color=0x0099ff)
-    embed.add_field(name="Invite Link", value=f"[Click here to invite me!]({invite_url})", inline=False)
-    embed.add_field(name="Permissions Needed", value="• Kick Members\n• Ban Members\n• Manage Messages\n• Manage Channels\n• Moderate Members\n• Send Messages & Embeds", inline=False)
-    embed.set_footer(text="Thank you for using our bot!")
-    
-    await interaction.response.send_message(embed=embed)
+metrics.gauges["bot_script_cache"] = script_search_cache.stats
+metrics.gauges["bot_member_cache"] = member_cache.stats
+metrics.gauges["bot_notifications"] = lambda: {
+    "sent": notification_sender.sent,
+    "failed": notification_sender.failed,
+    "dropped": notification_sender.dropped,
+}
+metrics.gauges["bot_afk_users"] = lambda: len(afk_registry)
+metrics.gauges["bot_moderation_dms"] = dm_dispatcher.stats
+metrics.gauges["bot_scheduler"] = scheduler.stats
+metrics.gauges["bot_rate_limited_commands"] = rate_limiter.stats
+metrics.gauges["bot_rate_limit_buckets"] = lambda: len(rate_limiter)
+metrics.gauges["bot_script_suggestions"] = lambda: len(script_index)
+metrics.gauges["bot_spam_detector_bytes"] = spam_detector.memory_bytes
+metrics.gauges["bot_startup_seconds"] = lambda: dict(startup_timings)
+metrics.gauges["bot_extension_load_seconds"] = lambda: dict(extension_load_times)
 
-# Ping command
-@bot.tree.command(name="ping", description="Check bot latency")
-async def ping(interaction: discord.Interaction):
-    latency = round(bot.latency * 1000)
-    
-    # Determine latency status
-    if latency < 100:
-        status = "🟢 Excellent"
-        color = 0x00ff00
-    elif latency < 200:
-        status = "🟡 Good"
-        color = 0xffff00
-    elif latency < 300:
-        status = "🟠 Fair"
-        color = 0xff8000
-    else:
-        status = "🔴 Poor"
-        color = 0xff0000
-    
-    embed = discord.Embed(title="🏓 Pong!", color=color)
-    embed.add_field(name="Bot Latency", value=f"{latency}ms", inline=True)
-    embed.add_field(name="Status", value=status, inline=True)
-    embed.set_footer(text="Response time to Discord API")
-    
-    await interaction.response.send_message(embed=embed)
+# Cluster mode
+def worker_status():
+    latency = bot.latency
+    return {
+        "cluster_id": CLUSTER_ID,
+        "shard_ids": sorted(bot.shards),
+        "guilds": len(bot.guilds),
+        "members": sum(guild.member_count or 0 for guild in bot.guilds),
+        "latency": latency if math.isfinite(latency) else None,
+        "started_at": bot_start_time.timestamp(),
+        "commands": metrics.all_commands.count,
+    }
 
-# Uptime command
-@bot.tree.command(name="uptime", description="Check bot uptime")
-async def uptime(interaction: discord.Interaction):
-    current_time = datetime.datetime.now()
-    uptime_delta = current_time - bot_start_time
-    
-    days = uptime_delta.days
-    hours, remainder = divmod(uptime_delta.seconds, 3600)
-    minutes, seconds = divmod(remainder, 60)
-    
-    uptime_str = ""
-    if days > 0:
-        uptime_str += f"{days}d "
-    if hours > 0:
-        uptime_str += f"{hours}h "
-    if minutes > 0:
-        uptime_str += f"{minutes}m "
-    uptime_str += f"{seconds}s"
-    
-    embed = discord.Embed(title="⏰ Bot Uptime", color=0x00ff00)
-    embed.add_field(name="Current Uptime", value=uptime_str, inline=False)
-    embed.add_field(name="Started At", value=bot_start_time.strftime("%B %d, %Y at %H:%M:%S UTC"), inline=False)
-    embed.add_field(name="Status", value="🟢 Online & Running", inline=False)
-    embed.set_footer(text="Bot has been running continuously")
-    
-    await interaction.response.send_message(embed=embed)
-
-# Stats command
-@bot.tree.command(name="stats", description="Show bot statistics")
-async def stats(interaction: discord.Interaction):
-    guild = interaction.guild
-    total_warnings = 0
-    total_afk = 0
-    
-    guild_id = str(guild.id)
-    
-    # Count warnings
-    if guild_id in warned_users:
-        for user_warnings in warned_users[guild_id].values():
-            total_warnings += len(user_warnings)
-    
-    # Count AFK users
-    if guild_id in afk_users:
-        total_afk = len(afk_users[guild_id])
-    
-    embed = discord.Embed(title="📊 Bot Statistics", color=0x0099ff)
-    embed.add_field(name="Server", value=guild.name, inline=False)
-    embed.add_field(name="Total Members", value=guild.member_count, inline=True)
-    embed.add_field(name="Bot Uptime", value="Online ✅", inline=True)
-    embed.add_field(name="Commands Available", value="19", inline=True)
-    embed.add_field(name="Total Warnings Issued", value=total_warnings, inline=True)
-    embed.add_field(name="Currently AFK Users", value=total_afk, inline=True)
-    embed.add_field(name="Bot Latency", value=f"{round(bot.latency * 1000)}ms", inline=True)
-    
-    if guild.icon:
-        embed.set_thumbnail(url=guild.icon.url)
+async def send_cluster_heartbeats():
+    while True:
+        try:
+            async with http_client.session.post(
+                f"{CLUSTER_IPC_URL}/heartbeat", json=worker_status(), timeout=aiohttp.ClientTimeout(total=2)
+            ):
+                pass
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Cluster heartbeat failed: {e}")
+        await asyncio.sleep(CLUSTER_HEARTBEAT_INTERVAL)
+
+# The launcher holds each request until the shard's turn, which behind a long queue of shards
+# can take minutes, so only a launcher that stops answering altogether times out
+IDENTIFY_WAIT_TIMEOUT = aiohttp.ClientTimeout(total=600, connect=5)
+
+async def wait_for_identify_slot(shard_id):
+    while True:
+        try:
+            async with http_client.session.post(
+                f"{CLUSTER_IPC_URL}/identify", params={"shard_id": shard_id}, timeout=IDENTIFY_WAIT_TIMEOUT
+            ) as response:
+                if response.status == 200:
+                    return
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Waiting for identify slot failed: {e or 'timed out'}")
+        await asyncio.sleep(1)
+
+async def fetch_cluster_status():
+    """Return the launcher's aggregate view of every worker, or None outside cluster mode."""
+    if not CLUSTER_IPC_URL:
+        return None
+    try:
+        status, data = await http_client.get_json(f"{CLUSTER_IPC_URL}/cluster", timeout=1.0, max_retries=0)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return None
+    return data if status == 200 else None
+
+class ClusterHub:
+    """Runs in the launcher: collects worker heartbeats and hands out identify slots."""
+
+    def __init__(self, identify_interval=5.0, max_concurrency=1):
+        self.identify_interval = identify_interval
+        self.max_concurrency = max(1, max_concurrency)
+        self.started_at = time.time()
+        self.workers = {}  # cluster_id -> last heartbeat
+        self._identify_locks = collections.defaultdict(asyncio.Lock)
+        self._last_identify = collections.defaultdict(float)
+        self._runner = None
+
+    def live_workers(self):
+        cutoff = time.monotonic() - CLUSTER_HEARTBEAT_INTERVAL * 3
+        return [worker for worker in self.workers.values() if worker["received_at"] >= cutoff]
+
+    def summary(self):
+        workers = self.live_workers()
+        latencies = [worker["latency"] for worker in workers if worker["latency"] is not None]
+        return {
+            "workers": len(workers),
+            "shards": sum(len(worker["shard_ids"]) for worker in workers),
+            "guilds": sum(worker["guilds"] for worker in workers),
+            "members": sum(worker["members"] for worker in workers),
+            "latency": sum(latencies) / len(latencies) if latencies else None,
+            "commands": sum(worker["commands"] for worker in workers),
+            "started_at": self.started_at,
+        }
+
+    async def handle_heartbeat(self, request):
+        data = await request.json()
+        data["received_at"] = time.monotonic()
+        self.workers[data["cluster_id"]] = data
+        return web.json_response({"ok": True})
+
+    async def handle_identify(self, request):
+        shard_id = int(request.query["shard_id"])
+        async with self._identify_locks[shard_id % self.max_concurrency]:
+            bucket = shard_id % self.max_concurrency
+            delay = self._last_identify[bucket] + self.identify_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last_identify[bucket] = time.monotonic()
+        return web.json_response({"ok": True})
+
+    async def handle_cluster(self, request):
+        return web.json_response(self.summary())
+
+    async def start(self, host, port):
+        app = web.Application()
+        app.router.add_post("/heartbeat", self.handle_heartbeat)
+        app.router.add_post("/identify", self.handle_identify)
+        app.router.add_get("/cluster", self.handle_cluster)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        return f"http://{host}:{port}"
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+def shard_ranges(shard_count, workers):
+    """Split shard IDs 0..shard_count-1 into `workers` contiguous, near-equal ranges."""
+    size, extra = divmod(shard_count, workers)
+    ranges, start = [], 0
+    for index in range(workers):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return [shard_ids for shard_ids in ranges if shard_ids]
+
+async def fetch_gateway_info(token):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{discord.http.Route.BASE}/gateway/bot", headers={"Authorization": f"Bot {token}"}) as response:
+            response.raise_for_status()
+            data = await response.json()
+    return data["shards"], data["session_start_limit"]["max_concurrency"]
+
+async def run_cluster(token, workers, shard_count=None, ipc_host="127.0.0.1", ipc_port=9400):
+    max_concurrency = 1
+    if shard_count is None:
+        shard_count, max_concurrency = await fetch_gateway_info(token)
+    identify_interval = float(setting("IDENTIFY_INTERVAL", "5.0"))
+    hub = ClusterHub(identify_interval=identify_interval, max_concurrency=max_concurrency)
+    ipc_url = await hub.start(ipc_host, ipc_port)
+    ranges = shard_ranges(shard_count, max(1, min(workers, shard_count)))
+    print(f"Starting {len(ranges)} worker(s) for {shard_count} shard(s), IPC on {ipc_url}")
+    processes = {}
+    
+    async def supervise(cluster_id, shard_ids):
+        backoff = 1
+        while True:
+            env = dict(
+                os.environ,
+                CLUSTER_ID=str(cluster_id),
+                SHARD_IDS=",".join(map(str, shard_ids)),
+                SHARD_COUNT=str(shard_count),
+                CLUSTER_IPC_URL=ipc_url
+            )
+            started = time.monotonic()
+            process = await asyncio.create_subprocess_exec(sys.executable, os.path.abspath(__file__), env=env)
+            processes[cluster_id] = process
+            code = await process.wait()
+            if code == 0:
+                return
+            # Restart crashed workers, backing off if they keep failing quickly
+            backoff = 1 if time.monotonic() - started > 60 else min(backoff * 2, 60)
+            print(f"Worker {cluster_id} exited with code {code}, restarting in {backoff}s")
+            await asyncio.sleep(backoff)
     
-    embed.set_footer(text=f"Bot ID: {bot.user.id}")
-    await interaction.response.send_message(embed=embed)
+    try:
+        await asyncio.gather(*(supervise(cluster_id, shard_ids) for cluster_id, shard_ids in enumerate(ranges)))
+    finally:
+        for process in processes.values():
+            if process.returncode is None:
+                process.terminate()
+        await asyncio.gather(*(process.wait() for process in processes.values()), return_exceptions=True)
+        await hub.close()
+
+# HTTP interactions endpoint
+# With --http the process answers slash commands and components from Discord's interactions
+# endpoint instead of the gateway, so stateless replicas can run behind a load balancer while
+# a gateway process keeps handling events such as on_message. It logs in over REST, which runs
+# setup_hook as usual, but never connects a shard. Each POST must carry a valid Ed25519
+# signature from the application's public key (DISCORD_PUBLIC_KEY, or the key Discord reports
+# for the application); it is acknowledged with 202 and fed to the same command tree, which
+# answers through the interaction callback exactly as it does for gateway interactions.
+# Without a guild cache, each guild is fetched over REST (roles, channels, and the bot's own
+# member for hierarchy checks) and refreshed after HTTP_GUILD_TTL seconds. Other members come
+# from the interaction payload, or are fetched when a command needs them. AFK statuses set
+# through a replica and its scheduled jobs reach the gateway process through the database once
+# SCHEDULER_POLL_SECONDS (required in this mode) picks them up, and /stats and /serverinfo
+# read guild counters from the database. Like cluster workers, each replica needs its own
+# CLUSTER_ID so that its DM backlog and metrics port are its own and only CLUSTER_ID 0 syncs
+# commands.
+INTERACTION_MAX_AGE = 300  # seconds a signed request is accepted for, against replays
+HTTP_INTERACTIONS = False  # set once this process serves the interactions endpoint
+HTTP_GUILD_TTL = float(setting("HTTP_GUILD_TTL", "300"))
+
+class InteractionVerifier:
+    def __init__(self, public_key):
+        self._key = nacl.signing.VerifyKey(bytes.fromhex(public_key))
+
+    def verify(self, signature, timestamp, body):
+        try:
+            if abs(time.time() - int(timestamp)) > INTERACTION_MAX_AGE:
+                return False
+            self._key.verify(timestamp.encode() + body, bytes.fromhex(signature))
+        except (TypeError, ValueError, nacl.exceptions.BadSignatureError):
+            return False
+        return True
+
+
+_guilds_fetched = {}  # guild_id -> time.monotonic() of the last REST fetch
+
+async def refresh_guild(client, guild_id):
+    fetched = _guilds_fetched.get(guild_id)
+    if fetched is not None and time.monotonic() - fetched < HTTP_GUILD_TTL:
+        return
+    _guilds_fetched[guild_id] = time.monotonic()  # concurrent requests use the payload meanwhile
+    try:
+        guild = await client.fetch_guild(guild_id)
+        guild._add_member(await guild.fetch_member(client.user.id))
+        # The REST guild object has no channels, which /lockdown, /unlockdown and /serverinfo need
+        for channel in await guild.fetch_channels():
+            guild._add_channel(channel)
+    except discord.HTTPException as e:
+        _guilds_fetched.pop(guild_id, None)  # retry on the next request instead of after the TTL
+        print(f"Failed to fetch guild {guild_id}: {e}")
+        return
+    client._connection._add_guild(guild)
+
+async def start_interactions_server(client, host, port, path="/interactions"):
+    global HTTP_INTERACTIONS
+    HTTP_INTERACTIONS = True
+    verifier = InteractionVerifier(setting("DISCORD_PUBLIC_KEY") or client.application.verify_key)
+    
+    async def handle_interaction(request):
+        body = await request.read()
+        signature = request.headers.get("X-Signature-Ed25519")
+        timestamp = request.headers.get("X-Signature-Timestamp")
+        if not verifier.verify(signature, timestamp, body):
+            metrics.http_interactions["rejected"] += 1
+            return web.Response(status=401, text="invalid request signature")
+        try:
+            data = json.loads(body)
+        except ValueError:
+            metrics.http_interactions["rejected"] += 1
+            return web.Response(status=400, text="invalid JSON")
+        if data.get("type") == 1:  # PING, sent when the endpoint URL is saved
+            metrics.http_interactions["ping"] += 1
+            return web.json_response({"type": 1})
+        if data.get("guild_id"):
+            await refresh_guild(client, int(data["guild_id"]))
+        client._connection.parse_interaction_create(data)
+        metrics.http_interactions["accepted"] += 1
+        return web.Response(status=202)
+    
+    app = web.Application()
+    app.router.add_post(path, handle_interaction)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    print(f"Interactions endpoint listening on http://{host}:{runner.addresses[0][1]}{path}")
+    return runner
+
+async def run_interactions_endpoint(token, host, port, path="/interactions"):
+    if nacl is None:
+        raise SystemExit("HTTP interactions mode needs PyNaCl: pip install pynacl")
+    if not scheduler.poll_interval:
+        # A replica never becomes ready, so its scheduler never runs: temporary bans and roles,
+        # AFK expiry and warning decay set up here only happen once the gateway reads them back
+        raise SystemExit("HTTP interactions mode needs SCHEDULER_POLL_SECONDS set, here and for the gateway process")
+    guild_counters.shared = True
+    async with bot:
+        await bot.login(token)
+        runner = await start_interactions_server(bot, host, port, path)
+        startup_timings["ready"] = time.perf_counter() - PROCESS_START
+        print(f"Ready in {startup_timings['ready']:.2f}s")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
 
 # Error handler
 @bot.event
 async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    send = functools.partial(reply, interaction)
     if isinstance(error, app_commands.MissingPermissions):
-        await interaction.response.send_message("❌ You don't have permission to use this command!", ephemeral=True)
+        await send("❌ You don't have permission to use this command!", ephemeral=True)
     elif isinstance(error, app_commands.CommandOnCooldown):
-        await interaction.response.send_message(f"❌ Command is on cooldown. Try again in {error.retry_after:.2f} seconds.", ephemeral=True)
+        await send(f"❌ Command is on cooldown. Try again in {error.retry_after:.2f} seconds.", ephemeral=True)
+    elif isinstance(error, app_commands.CheckFailure):
+        await send(f"❌ {error}", ephemeral=True)
     else:
-        await interaction.response.send_message("❌ An unexpected error occurred!", ephemeral=True)
-        print(f"Unhandled error: {error}")
+        # Logged first, with the traceback, in case the interaction can no longer be answered
+        command = interaction.command.qualified_name if interaction.command else None
+        logging.getLogger(__name__).error("Unhandled error in command %s", command, exc_info=error)
+        await send("❌ An unexpected error occurred!", ephemeral=True)
         
-bot.run('Token')
+TOKEN = setting("DISCORD_TOKEN", "Token")
+
+startup_timings["import"] = time.perf_counter() - PROCESS_START
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Discord moderation bot")
+    parser.add_argument("--cluster", action="store_true", help="run shard ranges in several worker processes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes in cluster mode")
+    parser.add_argument("--shards", type=int, default=None, help="total shard count (default: Discord's recommendation)")
+    parser.add_argument("--ipc-port", type=int, default=int(setting("CLUSTER_IPC_PORT", "9400")))
+    parser.add_argument("--http", action="store_true", help="serve interactions from an HTTP endpoint instead of the gateway")
+    parser.add_argument("--http-host", default=setting("INTERACTIONS_HOST", "127.0.0.1"))
+    parser.add_argument("--http-port", type=int, default=int(setting("INTERACTIONS_PORT", "8080")))
+    parser.add_argument("--http-path", default=setting("INTERACTIONS_PATH", "/interactions"))
+    args = parser.parse_args()
+    
+    if args.http:
+        discord.utils.setup_logging()
+        try:
+            asyncio.run(run_interactions_endpoint(TOKEN, args.http_host, args.http_port, args.http_path))
+        except KeyboardInterrupt:
+            pass
+    elif args.cluster:
+        try:
+            asyncio.run(run_cluster(TOKEN, args.workers, args.shards, ipc_port=args.ipc_port))
+        except KeyboardInterrupt:
+            pass
+    else:
+        bot.run(TOKEN)
+